@@ -1,15 +1,168 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Header, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Optional
-import pytesseract
-from PIL import Image
-import io
-import re
-from statistical_engine import StatisticalEngine
-from recommendation_engine import RecommendationEngine
-from scheme_profiles import SchemeProfiles
-app = FastAPI(title="Welfare Scheme AI Service", version="1.0.0")
+from typing import Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from statistical_engine import StatisticalEngine, FactorRecord
+import eligibility_service
+from catalog_manager import CatalogManager, CatalogError, CatalogNotReady
+from cache_store import LRUCache, SQLiteCache, TieredCache, VersionedCache
+from ocr_pool import OCRWorkerPool, OCRQueueFull
+from ocr_jobs import OCRJobStore, OCRJobRunner, RetryLater, WorkerCrashed
+from ocr_processing import run_ocr, run_ocr_page, count_pages, merge_page_fields, UnsupportedDocument
+from image_preprocessing import PreprocessConfig
+from record_stream import aiter_records, encode_ndjson, InvalidRecord, NDJSONStreamingResponse, RecordStreamError
+from metrics import MetricsRegistry, MetricsMiddleware, observe_stages
+from profiling import RequestProfiler, run_profiled
+from micro_batcher import MicroBatcher
+from single_flight import SingleFlight
+
+# OCR runs in its own process pool; OCR_QUEUE_SIZE bounds running + waiting jobs
+OCR_POOL = OCRWorkerPool(
+    max_workers=int(os.environ.get("OCR_WORKERS", "2")),
+    max_pending=int(os.environ.get("OCR_QUEUE_SIZE", "16"))
+)
+OCR_RETRY_AFTER = int(os.environ.get("OCR_RETRY_AFTER", "2"))
+
+# Multi-page uploads: page limit, pages of one document OCR'd at once and
+# seconds a page waits for a slot in a full OCR queue before it is failed
+OCR_MAX_PAGES = int(os.environ.get("OCR_MAX_PAGES", "50"))
+OCR_PAGE_PARALLELISM = int(os.environ.get("OCR_PAGE_PARALLELISM", os.environ.get("OCR_WORKERS", "2")))
+OCR_PAGE_QUEUE_WAIT = float(os.environ.get("OCR_PAGE_QUEUE_WAIT", "30"))
+
+logger = logging.getLogger(__name__)
+
+# Preprocessing before Tesseract (JPEG draft decode, grayscale, downscale to
+# OCR_TARGET_DPI, binarize, optional page crop). OCR_PREPROCESS=0 disables it.
+OCR_PREPROCESS = PreprocessConfig(
+    enabled=os.environ.get("OCR_PREPROCESS", "1") == "1",
+    target_dpi=int(os.environ.get("OCR_TARGET_DPI", "300")),
+    binarize=os.environ.get("OCR_BINARIZE", "1") == "1",
+    crop=os.environ.get("OCR_CROP", "0") == "1"
+)
+
+# OCR results keyed by SHA-256 of the uploaded bytes and the preprocessing settings. Set OCR_CACHE_PATH to
+# add a SQLite tier shared by all workers on the host.
+OCR_CACHE = TieredCache(
+    LRUCache(
+        max_entries=int(os.environ.get("OCR_CACHE_SIZE", "256")),
+        ttl=float(os.environ.get("OCR_CACHE_TTL", "86400"))
+    ),
+    SQLiteCache(
+        os.environ["OCR_CACHE_PATH"],
+        max_entries=int(os.environ.get("OCR_CACHE_DISK_SIZE", "10000")),
+        ttl=float(os.environ.get("OCR_CACHE_TTL", "86400"))
+    ) if os.environ.get("OCR_CACHE_PATH") else None
+)
+
+def ocr_cache_key(contents: bytes) -> str:
+    """Cache key for an upload; changes whenever the preprocessing settings do."""
+    digest = hashlib.sha256(contents).hexdigest()
+    return f"{digest}:{OCR_PREPROCESS.fingerprint()}"
+
+async def process_ocr_job(contents: bytes) -> Dict:
+    """
+    Run one queued OCR job, sharing the cache and process pool with /api/ocr.
+    A full pool puts the job back; a crashed OCR worker is retried up to the
+    store's max_attempts. Errors raised by OCR itself (e.g. an unreadable
+    image) fail the job.
+    """
+    cache_key = ocr_cache_key(contents)
+    extracted_data = await run_in_threadpool(OCR_CACHE.get, cache_key)
+    if extracted_data is None:
+        try:
+            extracted_data, timings = await OCR_POOL.run(run_ocr, contents, OCR_PREPROCESS)
+        except OCRQueueFull:
+            raise RetryLater()
+        except BrokenProcessPool as e:
+            raise WorkerCrashed(str(e) or "OCR worker process died")
+        logger.debug("OCR stage timings (ms): %s", timings)
+        if METRICS_ENABLED:
+            observe_stages(OCR_STAGES, timings)
+        await run_in_threadpool(OCR_CACHE.set, cache_key, extracted_data)
+    return extracted_data
+
+# Asynchronous OCR jobs, persisted in SQLite so they survive restarts.
+# OCR_JOB_CONCURRENCY bounds jobs in progress per service process.
+OCR_JOB_RUNNER = OCRJobRunner(
+    OCRJobStore(
+        os.environ.get("OCR_JOBS_PATH", "ocr_jobs.db"),
+        ttl=float(os.environ.get("OCR_JOB_TTL", "3600")),
+        lease=float(os.environ.get("OCR_JOB_LEASE", "300"))
+    ),
+    process_ocr_job,
+    concurrency=int(os.environ.get("OCR_JOB_CONCURRENCY", os.environ.get("OCR_WORKERS", "2")))
+)
+OCR_JOB_QUEUE_LIMIT = int(os.environ.get("OCR_JOB_QUEUE_LIMIT", "1000"))
+OCR_JOB_MAX_WAIT = float(os.environ.get("OCR_JOB_MAX_WAIT", "30"))
+
+# In-process metrics served on /metrics in the Prometheus text format:
+# request counts and latency per route, per-stage eligibility and OCR
+# timings, cache statistics and queue depths. METRICS_ENABLED=0 turns off
+# request and stage recording.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS = MetricsRegistry()
+HTTP_REQUESTS = METRICS.counter(
+    "http_requests_total", "HTTP requests by method, route and status", ("method", "route", "status")
+)
+HTTP_LATENCY = METRICS.histogram(
+    "http_request_duration_seconds", "Time until the full response is sent, by route", ("route",)
+)
+ELIGIBILITY_STAGES = METRICS.histogram(
+    "eligibility_stage_duration_seconds", "Time per /api/check-eligibility stage", ("stage",)
+)
+OCR_STAGES = METRICS.histogram(
+    "ocr_stage_duration_seconds", "Time per OCR stage for documents not served from the cache", ("stage",)
+)
+
+def _cache_stat(cache, field: str) -> Dict[Tuple[str], int]:
+    stats = cache.stats()
+    return {(tier,): stats[tier][field] for tier in ("memory", "disk") if tier in stats}
+
+def _register_cache_metrics(prefix: str, description: str, cache) -> None:
+    METRICS.gauge(f"{prefix}_entries", f"Entries in the {description}",
+                  lambda: _cache_stat(cache, "entries"), ("tier",))
+    for field in ("hits", "misses", "evictions", "expirations"):
+        METRICS.gauge(f"{prefix}_{field}_total", f"{description[0].upper()}{description[1:]} {field}",
+                      lambda field=field: _cache_stat(cache, field), ("tier",), metric_type="counter")
+
+_register_cache_metrics("ocr_cache", "OCR result cache", OCR_CACHE)
+METRICS.gauge("ocr_pool_pending", "OCR calls running or waiting in the process pool", lambda: OCR_POOL.pending)
+METRICS.gauge("ocr_pool_capacity", "OCR calls the pool accepts before returning 503", lambda: OCR_POOL.max_pending)
+METRICS.gauge("ocr_jobs", "Asynchronous OCR jobs by status",
+              lambda: {(status,): count for status, count in OCR_JOB_RUNNER.store.counts().items()}, ("status",))
+METRICS.gauge("scheme_catalog_schemes", "Schemes in the catalog being served", lambda: len(CATALOG.snapshot.schemes))
+METRICS.gauge("scheme_catalog_reloads_total", "Catalog reloads that changed the catalog",
+              lambda: CATALOG.reload_count, metric_type="counter")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    OCR_JOB_RUNNER.start()
+    catalog_watcher = None
+    if CATALOG.source is not None and CATALOG_WATCH_INTERVAL > 0:
+        catalog_watcher = asyncio.ensure_future(CATALOG.watch(CATALOG_WATCH_INTERVAL))
+    yield
+    if catalog_watcher is not None:
+        catalog_watcher.cancel()
+    await OCR_JOB_RUNNER.stop()
+    OCR_JOB_RUNNER.store.close()
+    OCR_POOL.shutdown()
+    OCR_CACHE.close()
+    if ELIGIBILITY_CACHE is not None:
+        ELIGIBILITY_CACHE.close()
+
+app = FastAPI(title="Welfare Scheme AI Service", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -17,6 +170,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, requests=HTTP_REQUESTS, latency=HTTP_LATENCY)
 class EligibilityRequest(BaseModel):
     age: int
     income: float
@@ -31,123 +186,136 @@ class SchemeMatch(BaseModel):
     benefits: str
     match_score: int
     eligibility_reason: str
-SAMPLE_SCHEMES = [
-    {
-        "name": "PM Kisan Samman Nidhi",
-        "description": "Financial assistance to small and marginal farmers",
-        "category": "Agriculture",
-        "benefits": "₹6,000 per year in three installments",
-        "duration": "Ongoing",
-        "criteria": {
-            "min_age": 18,
-            "max_age": 100,
-            "max_income": 200000,
-            "categories": ["All"],
-            "states": ["All"]
-        },
-        "requirements": [
-            "Land ownership documents",
-            "Aadhaar card",
-            "Bank account details"
-        ]
-    },
-    {
-        "name": "Ayushman Bharat",
-        "description": "Health insurance scheme for economically vulnerable families",
-        "category": "Healthcare",
-        "benefits": "₹5 Lakh per family per year",
-        "duration": "Ongoing",
-        "criteria": {
-            "min_age": 0,
-            "max_age": 120,
-            "max_income": 100000,
-            "categories": ["All"],
-            "states": ["All"]
-        },
-        "requirements": [
-            "Ration card",
-            "Income certificate",
-            "Aadhaar card"
-        ]
-    },
-    {
-        "name": "Pradhan Mantri Awas Yojana",
-        "description": "Affordable housing for economically weaker sections",
-        "category": "Housing",
-        "benefits": "Subsidy up to ₹2.5 Lakh",
-        "duration": "Till 2026",
-        "criteria": {
-            "min_age": 18,
-            "max_age": 70,
-            "max_income": 300000,
-            "categories": ["All"],
-            "states": ["All"]
-        },
-        "requirements": [
-            "Income certificate",
-            "Aadhaar card",
-            "Property documents"
-        ]
-    },
-    {
-        "name": "National Scholarship Portal",
-        "description": "Scholarships for students from minority communities and economically weaker sections",
-        "category": "Education",
-        "benefits": "₹10,000 to ₹50,000 per year",
-        "duration": "Academic year",
-        "criteria": {
-            "min_age": 5,
-            "max_age": 30,
-            "max_income": 250000,
-            "categories": ["SC", "ST", "OBC", "EWS"],
-            "states": ["All"]
-        },
-        "requirements": [
-            "School/College ID",
-            "Income certificate",
-            "Caste certificate (if applicable)"
-        ]
-    },
-    {
-        "name": "Pradhan Mantri Mudra Yojana",
-        "description": "Loans for small businesses and entrepreneurs",
-        "category": "Finance",
-        "benefits": "Loans up to ₹10 Lakh",
-        "duration": "Ongoing",
-        "criteria": {
-            "min_age": 18,
-            "max_age": 65,
-            "max_income": 500000,
-            "categories": ["All"],
-            "states": ["All"]
-        },
-        "requirements": [
-            "Business plan",
-            "Aadhaar card",
-            "Bank statements"
-        ]
-    },
-    {
-        "name": "Beti Bachao Beti Padhao",
-        "description": "Scheme to save and educate girl children",
-        "category": "Social Welfare",
-        "benefits": "Education support and savings scheme",
-        "duration": "Ongoing",
-        "criteria": {
-            "min_age": 0,
-            "max_age": 21,
-            "max_income": 500000,
-            "categories": ["All"],
-            "states": ["All"],
-            "gender": "Female"
-        },
-        "requirements": [
-            "Birth certificate",
-            "Aadhaar card",
-            "Bank account"
-        ]
-    }
-]
+
+# Scheme catalog from SCHEME_CATALOG_PATH (JSON or SQLite; built-in schemes if
+# unset), compiled into a versioned snapshot (kernels + eligibility index, plus
+# the response table with PRECOMPUTE_RESPONSES=1). The file is polled every
+# CATALOG_WATCH_INTERVAL seconds and reloads swap in a new snapshot. Under
+# serve.py, SHARED_CATALOG_DIR points at the parent's compiled exports: workers
+# memory-map them and never compile a copy themselves, so a new version is
+# served once the parent has exported it (startup waits up to
+# SHARED_CATALOG_WAIT seconds for it).
+CATALOG = CatalogManager(
+    os.environ.get("SCHEME_CATALOG_PATH") or None,
+    precompute=os.environ.get("PRECOMPUTE_RESPONSES", "0") == "1",
+    shared_dir=os.environ.get("SHARED_CATALOG_DIR") or None,
+    attach_timeout=float(os.environ.get("SHARED_CATALOG_WAIT", "120"))
+)
+CATALOG_WATCH_INTERVAL = float(os.environ.get("CATALOG_WATCH_INTERVAL", "5"))
+
+# Admin endpoints require this token in X-Admin-Token when it is set
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+# Live request profiling for /api/check-eligibility and /api/ocr. A request is
+# profiled when it sends X-Profile: 1 (with X-Admin-Token when ADMIN_TOKEN is
+# set) or is sampled at PROFILE_SAMPLE_RATE (adjustable per process via
+# /api/admin/profiles/sample-rate). pstats files go to PROFILE_DIR; the newest
+# PROFILE_KEEP are kept and listed on /api/admin/profiles.
+PROFILER = RequestProfiler(
+    os.environ.get("PROFILE_DIR", "profiles"),
+    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    keep=int(os.environ.get("PROFILE_KEEP", "50"))
+)
+
+def profile_requested(x_profile: Optional[str] = Header(None),
+                      x_admin_token: Optional[str] = Header(None)) -> bool:
+    if x_profile is not None and (not ADMIN_TOKEN or x_admin_token == ADMIN_TOKEN):
+        return x_profile not in ("", "0")
+    return PROFILER.sample()
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float
+
+# Records scored per batched pass on /api/check-eligibility/batch
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "256"))
+
+# Optional /api/check-eligibility result cache, keyed by a hash of the profile
+# and scoped to the catalog version (a reload invalidates it). Enabled by
+# ELIGIBILITY_CACHE_SIZE > 0; ELIGIBILITY_CACHE_PATH adds a SQLite tier shared
+# by all workers on the host (use a file of its own, not OCR_CACHE_PATH).
+ELIGIBILITY_CACHE = VersionedCache(
+    LRUCache(
+        max_entries=int(os.environ.get("ELIGIBILITY_CACHE_SIZE", "0")),
+        ttl=float(os.environ.get("ELIGIBILITY_CACHE_TTL", "3600"))
+    ),
+    SQLiteCache(
+        os.environ["ELIGIBILITY_CACHE_PATH"],
+        max_entries=int(os.environ.get("ELIGIBILITY_CACHE_DISK_SIZE", "100000")),
+        ttl=float(os.environ.get("ELIGIBILITY_CACHE_TTL", "3600"))
+    ) if os.environ.get("ELIGIBILITY_CACHE_PATH") else None,
+    current_version=lambda: CATALOG.snapshot.version
+) if int(os.environ.get("ELIGIBILITY_CACHE_SIZE", "0")) > 0 else None
+if ELIGIBILITY_CACHE is not None:
+    _register_cache_metrics("eligibility_cache", "eligibility result cache", ELIGIBILITY_CACHE)
+    METRICS.gauge("eligibility_cache_invalidations_total", "Eligibility result cache flushes after a catalog change",
+                  lambda: ELIGIBILITY_CACHE.invalidations, metric_type="counter")
+
+def eligibility_cache_key(user_data: Dict) -> str:
+    """Hash of the normalized profile fields the result depends on."""
+    profile = [int(user_data['age']), float(user_data['income']), user_data['category'],
+               user_data['state'], user_data.get('gender')]
+    return hashlib.sha256(json.dumps(profile).encode()).hexdigest()
+
+async def eligibility_cache_call(method, *args):
+    """Memory-only lookups run inline; with the SQLite tier they go to the thread pool."""
+    if ELIGIBILITY_CACHE.disk is None:
+        return method(*args)
+    return await run_in_threadpool(method, *args)
+
+def score_eligibility_batch(users: List[Dict]) -> List[bytes]:
+    """
+    Score concurrent /api/check-eligibility requests collected by the
+    micro-batcher in one vectorized pass, against one catalog snapshot.
+    """
+    snapshot = CATALOG.snapshot
+    timings = {} if METRICS_ENABLED else None
+    bodies = snapshot.service.check_many_json(users, {"catalogVersion": snapshot.version}, timings)
+    if timings is not None:
+        # Stage times are per batch here, not per request
+        observe_stages(ELIGIBILITY_STAGES, timings)
+        ELIGIBILITY_BATCH_SIZE.observe(len(users))
+    return bodies
+
+# Optional micro-batching of /api/check-eligibility: requests arriving within
+# ELIGIBILITY_BATCH_WINDOW_MS of each other (up to ELIGIBILITY_BATCH_MAX) are
+# scored together off the event loop. 0 (the default) scores each inline.
+ELIGIBILITY_BATCH_WINDOW_MS = float(os.environ.get("ELIGIBILITY_BATCH_WINDOW_MS", "0"))
+ELIGIBILITY_BATCHER = MicroBatcher(
+    score_eligibility_batch,
+    max_batch=int(os.environ.get("ELIGIBILITY_BATCH_MAX", "64")),
+    window=ELIGIBILITY_BATCH_WINDOW_MS / 1000
+) if ELIGIBILITY_BATCH_WINDOW_MS > 0 else None
+ELIGIBILITY_BATCH_SIZE = METRICS.histogram(
+    "eligibility_batch_size", "Requests per micro-batched /api/check-eligibility pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+
+# Optional coalescing of concurrent /api/check-eligibility requests with the
+# same profile and catalog version into one scoring pass. Scoring then runs
+# off the event loop (batcher or thread pool) so duplicates can overlap.
+ELIGIBILITY_COALESCER = SingleFlight() if os.environ.get("ELIGIBILITY_COALESCE", "0") == "1" else None
+if ELIGIBILITY_COALESCER is not None:
+    METRICS.gauge("eligibility_scoring_flights_total", "Eligibility scoring passes started by coalesced requests",
+                  lambda: ELIGIBILITY_COALESCER.calls, metric_type="counter")
+    METRICS.gauge("eligibility_coalesced_requests_total", "Eligibility requests served by another request's pass",
+                  lambda: ELIGIBILITY_COALESCER.shared, metric_type="counter")
+
+async def score_eligibility_off_loop(user_data: Dict) -> bytes:
+    """Score one request through the micro-batcher if enabled, else in the thread pool."""
+    if ELIGIBILITY_BATCHER is not None:
+        return await ELIGIBILITY_BATCHER.submit(user_data)
+    snapshot = CATALOG.snapshot
+    timings = {} if METRICS_ENABLED else None
+    body = await run_in_threadpool(
+        snapshot.service.check_json, user_data, {"catalogVersion": snapshot.version}, timings
+    )
+    if timings is not None:
+        observe_stages(ELIGIBILITY_STAGES, timings)
+    return body
 
 @app.get("/")
 async def root():
@@ -156,40 +324,245 @@ async def root():
         "version": "1.0.0",
         "endpoints": [
             "/api/ocr - Extract text from documents",
-            "/api/check-eligibility - Check scheme eligibility"
+            "/api/ocr/pages - Extract text from multi-page TIFF/PDF documents, streamed per page",
+            "/api/ocr/jobs - Submit a document for asynchronous OCR",
+            "/api/ocr/jobs/{job_id}?wait=N - Poll or long-poll an OCR job",
+            "/api/ocr/cache/stats - OCR result cache statistics",
+            "/api/check-eligibility - Check scheme eligibility",
+            "/api/check-eligibility/batch - Check eligibility for a JSON array or NDJSON stream of profiles",
+            "/api/check-eligibility/cache/stats - Eligibility result cache statistics",
+            "/api/admin/catalog - Current scheme catalog version",
+            "/api/admin/catalog/reload - Reload the scheme catalog",
+            "/api/admin/profiles - List and download request profiles",
+            "/metrics - Prometheus metrics"
         ]
     }
 
 @app.post("/api/ocr")
-async def extract_text_from_image(file: UploadFile = File(...)):
+async def extract_text_from_image(response: Response, file: UploadFile = File(...),
+                                  profiled: bool = Depends(profile_requested)):
     """
-    Extract text from uploaded document using OCR
+    Extract text from uploaded document using OCR.
+    Decoding and Tesseract run in the OCR process pool; returns 503 with
+    Retry-After when the pool's queue is full.
     """
     try:
 
         contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-
-        text = pytesseract.image_to_string(image)
         
-        extracted_data = {
-            "raw_text": text,
-            "email": re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text),
-            "phone": re.findall(r'\b\d{10}\b', text),
-            "aadhaar": re.findall(r'\b\d{4}\s?\d{4}\s?\d{4}\b', text),
-            "pan": re.findall(r'\b[A-Z]{5}\d{4}[A-Z]\b', text)
-        }
+        # Identical uploads (retries, web -> kiosk) are served from the cache
+        cache_key = ocr_cache_key(contents)
+        extracted_data = await run_in_threadpool(OCR_CACHE.get, cache_key)
+        if extracted_data is None:
+            if profiled:
+                # Profiled in the pool worker, where decoding and Tesseract run
+                profile_path = PROFILER.profile_path("ocr")
+                extracted_data, timings = await OCR_POOL.run(
+                    run_profiled, profile_path, run_ocr, contents, OCR_PREPROCESS
+                )
+                PROFILER.trim()
+                response.headers["X-Profile-Id"] = os.path.basename(profile_path)
+            else:
+                extracted_data, timings = await OCR_POOL.run(run_ocr, contents, OCR_PREPROCESS)
+            logger.debug("OCR stage timings (ms): %s", timings)
+            if METRICS_ENABLED:
+                observe_stages(OCR_STAGES, timings)
+            await run_in_threadpool(OCR_CACHE.set, cache_key, extracted_data)
         
         return {
             "success": True,
             "data": extracted_data
         }
         
+    except OCRQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="OCR service is busy, please retry shortly",
+            headers={"Retry-After": str(OCR_RETRY_AFTER)}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
+
+def spool_document(contents: bytes) -> str:
+    """Write an upload to a temporary file for the OCR workers and return its path."""
+    fd, path = tempfile.mkstemp(prefix="ocr-document-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(contents)
+    return path
+
+def discard_spooled_document(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+@app.post("/api/ocr/pages")
+async def extract_text_from_pages(file: UploadFile = File(...)):
+    """
+    Extract text from a multi-page document (TIFF frames or PDF pages).
+    Pages are OCR'd in parallel on the OCR pool and streamed back as NDJSON
+    as each one finishes (completion order, not page order):
+
+        {"type": "document", "pages": N}
+        {"type": "page", "page": 2, "success": true, "data": {...}}
+        ...
+        {"type": "summary", "success": true, "pages": N, "failedPages": [], "data": {...merged fields}}
+    """
+    contents = await file.read()
+    try:
+        page_count = await run_in_threadpool(count_pages, contents)
+    except UnsupportedDocument as e:
+        raise HTTPException(status_code=415, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 
+    if page_count > OCR_MAX_PAGES:
+        raise HTTPException(status_code=413, detail=f"Document has {page_count} pages (limit {OCR_MAX_PAGES})")
+    if OCR_POOL.pending >= OCR_POOL.max_pending:
+        raise HTTPException(
+            status_code=503,
+            detail="OCR service is busy, please retry shortly",
+            headers={"Retry-After": str(OCR_RETRY_AFTER)}
+        )
+
+    document_key = ocr_cache_key(contents)
+    try:
+        document_path = await run_in_threadpool(spool_document, contents)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
+
+    async def ocr_page(page: int) -> Dict:
+        cache_key = f"{document_key}:p{page}"
+        extracted_data = await run_in_threadpool(OCR_CACHE.get, cache_key)
+        if extracted_data is None:
+            deadline = time.monotonic() + OCR_PAGE_QUEUE_WAIT
+            while True:
+                try:
+                    # Workers read the page from the spooled file instead of
+                    # receiving the whole document pickled with every page
+                    extracted_data, timings = await OCR_POOL.run(run_ocr_page, document_path, page, OCR_PREPROCESS)
+                    break
+                except OCRQueueFull:
+                    # Other requests hold the queue; wait a bounded time for a slot
+                    if time.monotonic() >= deadline:
+                        raise OCRQueueFull(f"OCR service is busy, no slot within {OCR_PAGE_QUEUE_WAIT:g}s")
+                    await asyncio.sleep(0.05)
+            logger.debug("OCR page %d stage timings (ms): %s", page + 1, timings)
+            if METRICS_ENABLED:
+                observe_stages(OCR_STAGES, timings)
+            await run_in_threadpool(OCR_CACHE.set, cache_key, extracted_data)
+        return extracted_data
+
+    async def results():
+        yield encode_ndjson({"type": "document", "pages": page_count})
+
+        pages: List[Optional[Dict]] = [None] * page_count
+        failed = []
+        next_page = 0
+        running = {}
+        try:
+            while next_page < page_count or running:
+                # Keep a bounded window of this document's pages in flight
+                while next_page < page_count and len(running) < max(1, OCR_PAGE_PARALLELISM):
+                    running[asyncio.ensure_future(ocr_page(next_page))] = next_page
+                    next_page += 1
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page = running.pop(task)
+                    try:
+                        pages[page] = task.result()
+                        line = {"type": "page", "page": page + 1, "success": True, "data": pages[page]}
+                    except Exception as e:
+                        failed.append(page + 1)
+                        line = {"type": "page", "page": page + 1, "success": False,
+                                "error": f"OCR processing failed: {str(e)}"}
+                    yield encode_ndjson(line)
+
+            yield encode_ndjson({
+                "type": "summary",
+                "success": len(failed) < page_count,
+                "pages": page_count,
+                "failedPages": sorted(failed),
+                "data": merge_page_fields(pages)
+            })
+        finally:
+            # Client went away: stop queueing this document's remaining pages
+            for task in running:
+                task.cancel()
+            # Pages still queued in a worker then fail to open it; their results are dropped
+            await run_in_threadpool(discard_spooled_document, document_path)
+
+    # The body is already read, so the plain response can watch for disconnects.
+    # The background task removes the spooled file if the stream never started.
+    return StreamingResponse(results(), media_type="application/x-ndjson",
+                             background=BackgroundTask(discard_spooled_document, document_path))
+
+@app.post("/api/ocr/jobs", status_code=202)
+async def submit_ocr_job(file: UploadFile = File(...)):
+    """
+    Queue a document for OCR and return a job ID right away.
+    Poll /api/ocr/jobs/{job_id} (optionally with ?wait=seconds) for the result.
+    """
+    contents = await file.read()
+    store = OCR_JOB_RUNNER.store
+
+    cached = await run_in_threadpool(OCR_CACHE.get, ocr_cache_key(contents))
+    if cached is not None:
+        job_id = await run_in_threadpool(store.submit_finished, cached)
+    else:
+        counts = await run_in_threadpool(store.counts)
+        if counts["queued"] >= OCR_JOB_QUEUE_LIMIT:
+            raise HTTPException(
+                status_code=503,
+                detail="OCR job queue is full, please retry shortly",
+                headers={"Retry-After": str(OCR_RETRY_AFTER)}
+            )
+        job_id = await run_in_threadpool(store.submit, contents)
+        OCR_JOB_RUNNER.notify()
+
+    return {
+        "success": True,
+        "jobId": job_id,
+        "status": "done" if cached is not None else "queued",
+        "statusUrl": f"/api/ocr/jobs/{job_id}"
+    }
+
+@app.get("/api/ocr/jobs/{job_id}")
+async def get_ocr_job(job_id: str, wait: float = 0):
+    """
+    Status of an OCR job. With wait > 0, holds the request until the job
+    finishes or the wait (capped at OCR_JOB_MAX_WAIT seconds) runs out.
+    """
+    job = await OCR_JOB_RUNNER.wait(job_id, min(max(wait, 0), OCR_JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="OCR job not found or expired")
+    return {"success": True, **job}
+
+@app.get("/api/ocr/cache/stats")
+async def ocr_cache_stats():
+    """
+    Hit/miss/eviction counters for the OCR result cache
+    """
+    return {
+        "success": True,
+        "data": await run_in_threadpool(OCR_CACHE.stats)
+    }
+
+@app.get("/api/check-eligibility/cache/stats")
+async def eligibility_cache_stats():
+    """
+    Hit/miss/eviction counters for the eligibility result cache
+    """
+    if ELIGIBILITY_CACHE is None:
+        raise HTTPException(status_code=404, detail="Eligibility result cache is disabled")
+    return {
+        "success": True,
+        "data": await run_in_threadpool(ELIGIBILITY_CACHE.stats)
+    }
+
 @app.post("/api/check-eligibility")
-async def check_eligibility(request: EligibilityRequest):
+async def check_eligibility(request: EligibilityRequest, profiled: bool = Depends(profile_requested)):
     """
     Check eligibility for welfare schemes based on user criteria.
     Uses advanced probability and statistical analysis.
@@ -203,165 +576,200 @@ async def check_eligibility(request: EligibilityRequest):
             'state': request.state,
             'gender': request.gender
         }
-   
-        vulnerability_index = StatisticalEngine.calculate_vulnerability_index(user_data)
-        eligible_schemes = []
-        
-        for scheme in SAMPLE_SCHEMES:
-            criteria = scheme["criteria"]
         
-            if request.age < criteria["min_age"] or request.age > criteria["max_age"]:
-                continue
-
-            if request.income > criteria["max_income"]:
-                continue
-            
- 
-            if "All" not in criteria["categories"] and request.category not in criteria["categories"]:
-                continue
-            
-  
-            if "gender" in criteria and request.gender:
-                if criteria["gender"] != request.gender:
-                    continue
-            
-
-            if "All" not in criteria["states"] and request.state not in criteria["states"]:
-                continue
-            
+        # One snapshot per request, even if the catalog is reloaded meanwhile.
+        # The body is encoded by the service (static scheme fields come from
+        # pre-encoded fragments), bypassing FastAPI's generic encoder.
+        snapshot = CATALOG.snapshot
+        profile_name = None
 
-            probability = StatisticalEngine.calculate_overall_probability(
-                user_data, 
-                criteria, 
-                scheme["category"]
-            )
-            
+        cache_key = None
+        if ELIGIBILITY_CACHE is not None and not profiled:
+            cache_key = eligibility_cache_key(user_data)
+            cached = await eligibility_cache_call(ELIGIBILITY_CACHE.get, cache_key)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json")
 
-            if probability < 0.3:
-                continue
-            
-
-            confidence_interval = StatisticalEngine.calculate_confidence_interval(probability)
-            
+        if ELIGIBILITY_COALESCER is not None and not profiled:
+            key = (snapshot.version, *user_data.values())
+            body = await ELIGIBILITY_COALESCER.do(key, lambda: score_eligibility_off_loop(user_data))
+        elif ELIGIBILITY_BATCHER is not None and not profiled:
+            # Scored with other concurrent requests; stages are recorded per batch
+            body = await ELIGIBILITY_BATCHER.submit(user_data)
+        else:
+            timings = {} if METRICS_ENABLED else None
+            if profiled:
+                with PROFILER.profile("check-eligibility") as profile_name:
+                    body = snapshot.service.check_json(user_data, {"catalogVersion": snapshot.version}, timings)
+            else:
+                body = snapshot.service.check_json(user_data, {"catalogVersion": snapshot.version}, timings)
+            if timings is not None:
+                observe_stages(ELIGIBILITY_STAGES, timings)
 
-            match_score = calculate_match_score(request, criteria)
-            
+        if cache_key is not None:
+            # Batched or coalesced scoring may have used a newer snapshot; then this is not stored
+            await eligibility_cache_call(ELIGIBILITY_CACHE.set, cache_key, body.decode("utf-8"), snapshot.version)
+        response = Response(content=body, media_type="application/json")
+        if profile_name is not None:
+            response.headers["X-Profile-Id"] = profile_name
+        return response
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Eligibility check failed: {str(e)}")
 
-            statistical_analysis = StatisticalEngine.get_statistical_breakdown(
-                user_data,
-                criteria,
-                scheme["category"],
-                probability
-            )
+@app.post("/api/check-eligibility/batch")
+async def check_eligibility_batch(request: Request):
+    """
+    Check eligibility for many profiles in one call.
+    Accepts a JSON array or NDJSON body of EligibilityRequest records and
+    streams one NDJSON result line per record, in input order, as each
+    chunk of BATCH_CHUNK_SIZE records is scored.
+    """
+    async def results():
+        pending = []  # (index, user_data or None, error)
+        index = 0
+        try:
+            async for record in aiter_records(request.stream()):
+                try:
+                    if isinstance(record, InvalidRecord):
+                        raise ValueError(record.message)
+                    pending.append((index, EligibilityRequest.model_validate(record).model_dump(), None))
+                except ValueError as e:
+                    pending.append((index, None, f"Invalid record: {e}"))
+                index += 1
+                
+                if len(pending) >= BATCH_CHUNK_SIZE:
+                    yield await run_in_threadpool(score_batch_chunk, pending)
+                    pending = []
             
+            if pending:
+                yield await run_in_threadpool(score_batch_chunk, pending)
+        except RecordStreamError as e:
+            if pending:
+                yield await run_in_threadpool(score_batch_chunk, pending)
+            yield encode_ndjson({"index": index, "success": False, "error": f"Malformed batch body: {e}"})
+    
+    return NDJSONStreamingResponse(results())
 
-            impact_score = SchemeProfiles.get_impact_score(scheme["name"])
-            
+def score_batch_chunk(pending: List[Tuple[int, Optional[Dict], Optional[str]]]) -> bytes:
+    """
+    Score one chunk of batch records and encode the results as NDJSON lines.
+    """
+    users = [user_data for _, user_data, _ in pending if user_data is not None]
+    snapshot = CATALOG.snapshot
+    try:
+        scored = iter(snapshot.service.check_many(users))
+        failure = None
+    except Exception as e:
+        scored = None
+        failure = f"Eligibility check failed: {str(e)}"
+    
+    lines = []
+    for index, user_data, error in pending:
+        if user_data is None:
+            lines.append(encode_ndjson({"index": index, "success": False, "error": error}))
+        elif failure is not None:
+            lines.append(encode_ndjson({"index": index, "success": False, "error": failure}))
+        else:
+            lines.append(encode_ndjson({"index": index, **next(scored), "catalogVersion": snapshot.version}))
+    return b"".join(lines)
 
-            expected_benefit = SchemeProfiles.format_expected_benefit(scheme["name"])
-            statistical_analysis["expectedBenefit"] = expected_benefit
-            
+def calculate_match_score(request: EligibilityRequest, criteria: dict) -> int:
+    """
+    Calculate how well the user matches the scheme criteria
+    """
+    return StatisticalEngine.calculate_match_score(
+        request.age,
+        request.income,
+        criteria["min_age"],
+        criteria["max_age"],
+        criteria["max_income"]
+    )
 
-            reason = generate_eligibility_reason(request, criteria, scheme["category"])
-            
+def generate_eligibility_reason(request: EligibilityRequest, criteria: dict, category: str,
+                                factors: Optional[FactorRecord] = None) -> str:
+    """
+    Explain why the user qualifies for a scheme
+    """
+    return eligibility_service.generate_eligibility_reason(
+        request.model_dump(), criteria, category, factors
+    )
 
-            eligible_schemes.append({
-                "name": scheme["name"],
-                "description": scheme["description"],
-                "category": scheme["category"],
-                "benefits": scheme["benefits"],
-                "duration": scheme.get("duration", "Ongoing"),
-                "matchScore": match_score,
-                "probabilityScore": round(probability, 3),
-                "confidenceInterval": confidence_interval,
-                "eligibilityReason": reason,
-                "requirements": scheme.get("requirements", []),
-                "statisticalAnalysis": statistical_analysis,
-                "impactScore": impact_score
-            })
+@app.get("/api/admin/catalog", dependencies=[Depends(require_admin)])
+async def catalog_info():
+    """
+    Version, source and size of the scheme catalog currently served
+    """
+    return {"success": True, **CATALOG.info()}
 
-        ranked_schemes = RecommendationEngine.rank_schemes(
-            eligible_schemes, 
-            vulnerability_index
-        )
-        
+@app.post("/api/admin/catalog/reload", dependencies=[Depends(require_admin)])
+async def reload_catalog():
+    """
+    Re-read the catalog source and atomically swap in the new snapshot.
+    Requests already running finish on the snapshot they started with.
+    """
+    try:
+        snapshot, changed = await run_in_threadpool(CATALOG.reload)
+    except CatalogNotReady as e:
+        raise HTTPException(status_code=503, detail=f"Catalog reload pending: {str(e)}",
+                            headers={"Retry-After": str(max(1, int(CATALOG_WATCH_INTERVAL)))})
+    except CatalogError as e:
+        raise HTTPException(status_code=422, detail=f"Catalog reload failed: {str(e)}")
+    return {
+        "success": True,
+        "changed": changed,
+        "catalogVersion": snapshot.version,
+        "schemeCount": len(snapshot.schemes)
+    }
 
-        for scheme in ranked_schemes:
-            scheme["personalizedExplanation"] = RecommendationEngine.get_personalized_explanation(
-                scheme,
-                user_data,
-                vulnerability_index
-            )
-        
+@app.get("/api/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """
+    Recent request profiles (newest first) and this process's sample rate
+    """
+    return {
+        "success": True,
+        "sampleRate": PROFILER.sample_rate,
+        "profiles": await run_in_threadpool(PROFILER.list)
+    }
 
-        user_profile = RecommendationEngine.generate_user_profile_summary(
-            user_data,
-            vulnerability_index,
-            ranked_schemes
-        )
-        
-  
-        top_recommendations = RecommendationEngine.filter_top_recommendations(ranked_schemes)
-        
-        return {
-            "success": True,
-            "count": len(top_recommendations),
-            "totalEligible": len(ranked_schemes),
-            "schemes": top_recommendations,
-            "userProfile": user_profile
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Eligibility check failed: {str(e)}")
+@app.post("/api/admin/profiles/sample-rate", dependencies=[Depends(require_admin)])
+async def set_profile_sample_rate(settings: ProfilingSettings):
+    """
+    Change the share of requests profiled by this worker process (0 turns sampling off)
+    """
+    try:
+        PROFILER.set_sample_rate(settings.sample_rate)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"success": True, "sampleRate": PROFILER.sample_rate}
 
-def calculate_match_score(request: EligibilityRequest, criteria: dict) -> int:
+@app.get("/api/admin/profiles/{name}", dependencies=[Depends(require_admin)])
+async def download_profile(name: str):
     """
-    Calculate how well the user matches the scheme criteria
+    Download one profile as a pstats file
     """
-    score = 85  # Base score
-    
-    
-    age_range = criteria["max_age"] - criteria["min_age"]
-    age_position = (request.age - criteria["min_age"]) / age_range if age_range > 0 else 0.5
-    if 0.3 <= age_position <= 0.7:  # Sweet spot
-        score += 5
-    
-    # Income matching.....
-    income_ratio = request.income / criteria["max_income"] if criteria["max_income"] > 0 else 0
-    if income_ratio < 0.5:
-        score += 10
-    elif income_ratio < 0.75:
-        score += 5
-    
-    return min(score, 100)
+    path = PROFILER.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
 
-def generate_eligibility_reason(request: EligibilityRequest, criteria: dict, category: str) -> str:
-    
-    reasons = []
-    
-    if request.age >= criteria["min_age"] and request.age <= criteria["max_age"]:
-        reasons.append(f"Your age ({request.age}) falls within the eligible range")
-    
-    if request.income <= criteria["max_income"]:
-        reasons.append(f"Your income (₹{request.income:,.0f}) meets the criteria")
-    
-    if request.category in criteria["categories"] or "All" in criteria["categories"]:
-        if request.category != "General":
-            reasons.append(f"Priority given to {request.category} category")
-        else:
-            reasons.append("Available for all categories")
-    
-    if not reasons:
-        reasons.append(f"You meet the basic requirements for {category} schemes")
-    
-    return ". ".join(reasons)
+@app.get("/metrics")
+async def metrics():
+    """
+    Metrics for this process in the Prometheus text format
+    """
+    # Cache and job gauges query SQLite, so render off the event loop
+    body = await run_in_threadpool(METRICS.render)
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/api/health")
 async def health_check():
     return {
         "status": "ok",
         "service": "AI Service",
-        "ocr_available": True
+        "ocr_available": True,
+        "catalog_version": CATALOG.snapshot.version
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,438 @@
+"""
+Engine Benchmark
+Times every StatisticalEngine and RecommendationEngine function, the
+compiled EligibilityService at several catalog sizes, batch throughput over
+synthetic populations and the end-to-end /api/check-eligibility path through
+an in-process test client. Catalogs and populations are generated from a
+fixed seed, so runs on the same machine are comparable.
+
+Results are written as JSON; pass --baseline to compare against a stored
+run and exit with status 1 when any metric regresses by more than
+--threshold. Each metric is the median over --runs runs of the whole
+suite. Expect noise: on one machine single runs differ by ~30%, and the
+sub-microsecond function timings drift by up to 2x between invocations on
+a shared host even as medians, so the default threshold is loose; pass a
+tighter one on dedicated hardware.
+
+Usage:
+    python benchmarks/bench_engines.py
+    python benchmarks/bench_engines.py --output results.json
+    python benchmarks/bench_engines.py --baseline benchmarks/baseline_engines.json --runs 5
+    python benchmarks/bench_engines.py --full     # 10/1k/100k schemes, 1/1k/1M users
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statistical_engine import StatisticalEngine
+from recommendation_engine import RecommendationEngine, TopKRanker
+from eligibility_service import EligibilityService
+
+
+DEFAULT_SCHEMES = [10, 1000]
+DEFAULT_USERS = [1, 1000]
+FULL_SCHEMES = [10, 1000, 100000]
+FULL_USERS = [1, 1000, 1000000]
+
+USER_CATEGORIES = ["General", "SC", "ST", "OBC", "EWS", "Minority"]
+SCHEME_CATEGORIES = ["Agriculture", "Healthcare", "Housing", "Education", "Business", "Social Welfare",
+                     "Employment", "Pension"]
+STATES = ["Bihar", "Uttar Pradesh", "Maharashtra", "Kerala", "Tamil Nadu", "Rajasthan", "Odisha", "Assam"]
+
+# Profiles scored per catalog size for latency percentiles / HTTP requests per catalog size
+CHECK_SAMPLE = 500
+ENDPOINT_REQUESTS = 200
+
+
+def make_catalog(size: int, seed: int = 11) -> List[Dict]:
+    """Synthetic catalog in the SAMPLE_SCHEMES shape."""
+    rng = random.Random(seed)
+    schemes = []
+    for i in range(size):
+        min_age = rng.choice([0, 0, 10, 18, 18, 21, 25, 40, 60])
+        criteria = {
+            "min_age": min_age,
+            "max_age": rng.choice([max_age for max_age in (18, 25, 40, 60, 65, 100, 120) if max_age > min_age]),
+            "max_income": rng.choice([50000, 100000, 200000, 250000, 300000, 500000, 1000000]),
+            "categories": rng.choice([["All"], ["All"], ["SC", "ST"], ["SC", "ST", "OBC", "EWS"], ["General"]]),
+            "states": rng.choice([["All"], ["All"], ["All"], rng.sample(STATES, 1), rng.sample(STATES, 3)])
+        }
+        if rng.random() < 0.15:
+            criteria["gender"] = rng.choice(["Female", "Male"])
+        schemes.append({
+            "name": f"Synthetic Scheme {i}",
+            "description": f"Synthetic welfare scheme number {i} for benchmarking",
+            "category": rng.choice(SCHEME_CATEGORIES),
+            "benefits": f"₹{rng.randint(1, 500) * 1000:,} support",
+            "duration": rng.choice(["Ongoing", "One-time", "Annual", "5 years"]),
+            "requirements": rng.sample(["Aadhaar Card", "Income Certificate", "Bank Account", "Caste Certificate",
+                                        "Land Records", "Residence Proof"], 3),
+            "criteria": criteria
+        })
+    return schemes
+
+
+def iter_population(size: int, seed: int = 13, chunk_size: int = 10000) -> Iterator[List[Dict]]:
+    """Synthetic user profiles in chunks, so large populations are never held in memory at once."""
+    rng = random.Random(seed)
+    remaining = size
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        remaining -= count
+        yield [{
+            "age": rng.randint(0, 100),
+            "income": float(rng.choice([0, rng.randint(0, 150000), rng.randint(0, 600000)])),
+            "category": rng.choice(USER_CATEGORIES),
+            "state": rng.choice(STATES),
+            "gender": rng.choice(["Female", "Male", None])
+        } for _ in range(count)]
+
+
+def make_population(size: int, seed: int = 13) -> List[Dict]:
+    return [user for chunk in iter_population(size, seed) for user in chunk]
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def metric(value: float, unit: str, higher_is_better: bool = False) -> Dict:
+    return {"value": round(value, 3), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def bench_functions(repeat: int, seed: int) -> Dict[str, Dict]:
+    """Nanoseconds per call of each engine function over a seeded set of arguments."""
+    users = make_population(200, seed)
+    schemes = make_catalog(50, seed)
+    pairs = [(user, scheme) for user, scheme in zip(users, schemes * 4)]
+    factors = [StatisticalEngine.evaluate_factors(user, scheme["criteria"], scheme["category"])
+               for user, scheme in pairs]
+    probabilities = [record.probability for record in factors]
+    vulnerability = [StatisticalEngine.calculate_vulnerability_index(user) for user in users]
+    scored = [{
+        "name": scheme["name"],
+        "category": scheme["category"],
+        "probabilityScore": round(probability, 3),
+        "impactScore": 0.8,
+        "statisticalAnalysis": StatisticalEngine.breakdown_from_factors(record)
+    } for (_, scheme), record, probability in zip(pairs, factors, probabilities)]
+    for entry, index in zip(scored, vulnerability):
+        entry["recommendationScore"] = RecommendationEngine.calculate_recommendation_score(
+            entry["probabilityScore"], entry["category"], index
+        )
+    ranked = RecommendationEngine.rank_schemes([dict(entry) for entry in scored[:50]], vulnerability[0])
+
+    def ranker_run():
+        ranker = TopKRanker()
+        for entry in scored[:50]:
+            ranker.push(entry["recommendationScore"], entry["category"], entry)
+        return ranker
+
+    ranker = ranker_run()
+    cases = {
+        "StatisticalEngine.calculate_age_probability": [
+            lambda u=u, s=s: StatisticalEngine.calculate_age_probability(
+                u["age"], s["criteria"]["min_age"], s["criteria"]["max_age"]) for u, s in pairs],
+        "StatisticalEngine.get_income_decay_rate": [
+            lambda s=s: StatisticalEngine.get_income_decay_rate(s["category"]) for s in schemes],
+        "StatisticalEngine.calculate_income_probability": [
+            lambda u=u, s=s: StatisticalEngine.calculate_income_probability(
+                u["income"], s["criteria"]["max_income"], s["category"]) for u, s in pairs],
+        "StatisticalEngine.calculate_category_match_probability": [
+            lambda u=u, s=s: StatisticalEngine.calculate_category_match_probability(
+                u["category"], s["criteria"]["categories"]) for u, s in pairs],
+        "StatisticalEngine.calculate_gender_probability": [
+            lambda u=u, s=s: StatisticalEngine.calculate_gender_probability(
+                u["gender"], s["criteria"].get("gender")) for u, s in pairs],
+        "StatisticalEngine.calculate_overall_probability": [
+            lambda u=u, s=s: StatisticalEngine.calculate_overall_probability(
+                u, s["criteria"], s["category"]) for u, s in pairs],
+        "StatisticalEngine.calculate_confidence_interval": [
+            lambda p=p: StatisticalEngine.calculate_confidence_interval(p) for p in probabilities],
+        "StatisticalEngine.calculate_vulnerability_index": [
+            lambda u=u: StatisticalEngine.calculate_vulnerability_index(u) for u in users],
+        "StatisticalEngine.get_statistical_breakdown": [
+            lambda u=u, s=s, p=p: StatisticalEngine.get_statistical_breakdown(u, s["criteria"], s["category"], p)
+            for (u, s), p in zip(pairs, probabilities)],
+        "StatisticalEngine.get_priority_band": [
+            lambda p=p: StatisticalEngine.get_priority_band(p) for p in probabilities],
+        "StatisticalEngine.get_age_match_bonus": [
+            lambda u=u, s=s: StatisticalEngine.get_age_match_bonus(
+                u["age"], s["criteria"]["min_age"], s["criteria"]["max_age"]) for u, s in pairs],
+        "StatisticalEngine.get_income_match_bonus": [
+            lambda u=u, s=s: StatisticalEngine.get_income_match_bonus(
+                u["income"] / s["criteria"]["max_income"]) for u, s in pairs],
+        "StatisticalEngine.calculate_match_score": [
+            lambda u=u, s=s: StatisticalEngine.calculate_match_score(
+                u["age"], u["income"], s["criteria"]["min_age"], s["criteria"]["max_age"],
+                s["criteria"]["max_income"]) for u, s in pairs],
+        "StatisticalEngine.evaluate_factors": [
+            lambda u=u, s=s: StatisticalEngine.evaluate_factors(u, s["criteria"], s["category"]) for u, s in pairs],
+        "StatisticalEngine.combine_factors": [
+            lambda f=f: StatisticalEngine.combine_factors(
+                f.age_probability, f.income_probability, f.category_probability, f.gender_probability)
+            for f in factors],
+        "StatisticalEngine.breakdown_from_factors": [
+            lambda f=f: StatisticalEngine.breakdown_from_factors(f) for f in factors],
+        "RecommendationEngine.calculate_recommendation_score": [
+            lambda e=e, v=v: RecommendationEngine.calculate_recommendation_score(
+                e["probabilityScore"], e["category"], v) for e, v in zip(scored, vulnerability)],
+        "RecommendationEngine.get_personalized_explanation": [
+            lambda e=e, u=u, v=v: RecommendationEngine.get_personalized_explanation(e, u, v)
+            for e, u, v in zip(scored, users, vulnerability)],
+        "RecommendationEngine.rank_schemes[50]": [
+            lambda: RecommendationEngine.rank_schemes([dict(entry) for entry in scored[:50]], vulnerability[0])],
+        "RecommendationEngine.filter_top_recommendations[50]": [
+            lambda: RecommendationEngine.filter_top_recommendations(ranked)],
+        "RecommendationEngine.generate_user_profile_summary[50]": [
+            lambda: RecommendationEngine.generate_user_profile_summary(users[0], vulnerability[0], ranked)],
+        "RecommendationEngine.summarize_ranking": [
+            lambda: RecommendationEngine.summarize_ranking(users[0], vulnerability[0], ranker)],
+        "TopKRanker.push+results[50]": [lambda: ranker_run().results()]
+    }
+
+    results = {}
+    for name, calls in cases.items():
+        def run_all(calls=calls):
+            for call in calls:
+                call()
+        seconds = best_of(run_all, repeat)
+        results[f"function/{name}"] = metric(seconds / len(calls) * 1e9, "ns/call")
+    return results
+
+
+def compile_catalogs(scheme_sizes: Sequence[int], seed: int, results: Dict[str, Dict]) -> Dict[int, Dict]:
+    """Build each synthetic catalog's EligibilityService once (recording compile time) for reuse."""
+    catalogs = {}
+    for size in scheme_sizes:
+        schemes = make_catalog(size, seed)
+        start = time.perf_counter()
+        service = EligibilityService(schemes)
+        results[f"catalog/{size}/compile"] = metric((time.perf_counter() - start) * 1000, "ms")
+        catalogs[size] = {"schemes": schemes, "service": service}
+    return catalogs
+
+
+def bench_catalogs(catalogs: Dict[int, Dict], users: int, repeat: int, seed: int) -> Dict[str, Dict]:
+    """Scheme matrix build, single-profile check() latency and batch probability time per catalog size."""
+    results = {}
+    profiles = make_population(min(users, CHECK_SAMPLE), seed)
+    for size, catalog in catalogs.items():
+        schemes, service = catalog["schemes"], catalog["service"]
+        seconds = best_of(lambda: StatisticalEngine.compile_scheme_matrix(schemes), repeat)
+        results[f"catalog/{size}/compile_scheme_matrix"] = metric(seconds * 1000, "ms")
+
+        latencies = []
+        for user in profiles:
+            start = time.perf_counter()
+            service.check(user)
+            latencies.append(time.perf_counter() - start)
+        results[f"catalog/{size}/check_p50"] = metric(percentile(latencies, 0.5) * 1e6, "us")
+        results[f"catalog/{size}/check_p99"] = metric(percentile(latencies, 0.99) * 1e6, "us")
+
+        matrix = service.kernels.matrix
+        encoded = matrix.encode_users(profiles)
+        seconds = best_of(lambda: StatisticalEngine.calculate_batch_probability(*encoded, matrix), repeat)
+        results[f"catalog/{size}/calculate_batch_probability"] = metric(
+            seconds / (len(profiles) * size) * 1e9, "ns/pair")
+    return results
+
+
+def bench_populations(catalogs: Dict[int, Dict], user_sizes: Sequence[int], max_pairs: float,
+                      seed: int) -> Dict[str, Dict]:
+    """check_many throughput for each (catalog, population) size within the max_pairs budget."""
+    results = {}
+    for size, catalog in catalogs.items():
+        service = catalog["service"]
+        # Keeps the users x schemes probability matrix of a chunk around 40 MB
+        chunk_size = max(1, min(10000, 5000000 // size))
+        for users in user_sizes:
+            if users * size > max_pairs:
+                continue
+            start = time.perf_counter()
+            for chunk in iter_population(users, seed, chunk_size):
+                service.check_many(chunk)
+            seconds = time.perf_counter() - start
+            results[f"population/{size}x{users}/check_many"] = metric(users / seconds, "users/s", True)
+    return results
+
+
+def bench_endpoint(catalogs: Dict[int, Dict], requests: int, seed: int) -> Dict[str, Dict]:
+    """/api/check-eligibility latency through FastAPI's in-process test client."""
+    from fastapi.testclient import TestClient
+    import app as app_module
+    from catalog_manager import CatalogManager, catalog_version
+    from ocr_jobs import OCRJobStore
+
+    results = {}
+    original = (app_module.CATALOG, app_module.OCR_JOB_RUNNER.store)
+    profiles = make_population(requests, seed)
+    state_dir = tempfile.TemporaryDirectory()
+    # The app's OCR job runner would otherwise create its database in the working directory
+    app_module.OCR_JOB_RUNNER.store = OCRJobStore(os.path.join(state_dir.name, "ocr_jobs.db"))
+    try:
+        with TestClient(app_module.app) as client:
+            for size, catalog in catalogs.items():
+                # Serve the already compiled synthetic catalog instead of compiling it again
+                manager = CatalogManager()
+                manager.snapshot = manager.snapshot._replace(
+                    version=catalog_version(catalog["schemes"]),
+                    source=f"synthetic-{size}",
+                    schemes=catalog["service"].registry,
+                    service=catalog["service"]
+                )
+                app_module.CATALOG = manager
+
+                client.post("/api/check-eligibility", json=profiles[0])  # Warm-up
+                latencies = []
+                for user in profiles:
+                    start = time.perf_counter()
+                    response = client.post("/api/check-eligibility", json=user)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"/api/check-eligibility returned {response.status_code}")
+                results[f"endpoint/{size}/check_eligibility_p50"] = metric(percentile(latencies, 0.5) * 1000, "ms")
+                results[f"endpoint/{size}/check_eligibility_p99"] = metric(percentile(latencies, 0.99) * 1000, "ms")
+    finally:
+        app_module.OCR_JOB_RUNNER.store.close()
+        app_module.CATALOG, app_module.OCR_JOB_RUNNER.store = original
+        state_dir.cleanup()
+    return results
+
+
+def median_results(runs: Sequence[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """Per-metric median over several runs (metrics missing from a run are skipped)."""
+    results = {}
+    for name, first in runs[0].items():
+        values = [run_results[name]["value"] for run_results in runs if name in run_results]
+        results[name] = metric(statistics.median(values), first["unit"], first["higher_is_better"])
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """
+    Metrics present in both runs that got worse by more than threshold
+    (a fraction, e.g. 0.25 for 25%).
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse = -change if current["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append({
+                "metric": name,
+                "baseline": previous["value"],
+                "current": current["value"],
+                "unit": current["unit"],
+                "worse_by": round(worse, 3)
+            })
+    return regressions
+
+
+def run(scheme_sizes: Sequence[int], user_sizes: Sequence[int], repeat: int, max_pairs: float,
+        requests: int, seed: int, endpoint: bool = True, runs: int = 1) -> Dict:
+    all_results = []
+    for _ in range(max(1, runs)):
+        results = {}
+        results.update(bench_functions(repeat, seed))
+        catalogs = compile_catalogs(scheme_sizes, seed, results)
+        results.update(bench_catalogs(catalogs, max(user_sizes), repeat, seed))
+        results.update(bench_populations(catalogs, user_sizes, max_pairs, seed))
+        if endpoint:
+            results.update(bench_endpoint(catalogs, requests, seed))
+        all_results.append(results)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": seed,
+            "schemes": list(scheme_sizes),
+            "users": list(user_sizes),
+            "runs": len(all_results)
+        },
+        "results": median_results(all_results)
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the statistical and recommendation engines")
+    parser.add_argument("--schemes", type=int, nargs="+", default=None,
+                        help=f"Catalog sizes (default: {DEFAULT_SCHEMES})")
+    parser.add_argument("--users", type=int, nargs="+", default=None,
+                        help=f"Population sizes (default: {DEFAULT_USERS})")
+    parser.add_argument("--full", action="store_true",
+                        help=f"Use {FULL_SCHEMES} schemes and {FULL_USERS} users")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is reported)")
+    parser.add_argument("--max-pairs", type=float, default=2e8,
+                        help="Skip population runs with more users x schemes than this")
+    parser.add_argument("--requests", type=int, default=ENDPOINT_REQUESTS,
+                        help="HTTP requests per catalog size for the endpoint benchmark")
+    parser.add_argument("--no-endpoint", action="store_true", help="Skip the test client benchmark")
+    parser.add_argument("--seed", type=int, default=11, help="Seed for catalogs and populations")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Runs of the whole suite; each metric reports the median")
+    # Measured noise between invocations on a shared host, medians of 3 runs:
+    # up to ~20% for the catalog, population and endpoint metrics, up to 2x
+    # for the function/ timings of a few hundred ns. 1.0 flags a doubling.
+    parser.add_argument("--threshold", type=float, default=1.0,
+                        help="Allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args(argv)
+
+    scheme_sizes = args.schemes or (FULL_SCHEMES if args.full else DEFAULT_SCHEMES)
+    user_sizes = args.users or (FULL_USERS if args.full else DEFAULT_USERS)
+    report = run(scheme_sizes, user_sizes, args.repeat, args.max_pairs, args.requests, args.seed,
+                 endpoint=not args.no_endpoint, runs=args.runs)
+
+    regressions: Optional[List[Dict]] = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report["results"], baseline["results"], args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold,
+                                "regressions": regressions}
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if regressions:
+        for regression in regressions:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']} -> {regression['current']} "
+                  f"{regression['unit']} ({regression['worse_by']:+.0%})", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Field Extraction Benchmark
+Times the single-pass FieldExtractor against one regex scan per field over
+a synthetic OCR corpus, varying the number of enabled fields and the corpus
+size. A single pass should grow far more slowly with the number of fields
+than separate scans, and both should scale linearly with text size.
+
+Usage:
+    python benchmarks/bench_field_extraction.py
+    python benchmarks/bench_field_extraction.py --megabytes 1 2 4 8 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Sequence
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from field_extractor import FieldExtractor, verhoeff_valid
+
+
+FILLER = ("the", "applicant", "resides", "at", "ward", "no", "of", "district", "certified", "that",
+          "annual", "family", "member", "scheme", "office", "seal", "signature", "date", "village",
+          "road", "taluk", "issued", "by", "authority", "revenue", "department", "name", "father")
+
+
+def random_aadhaar(rng: random.Random) -> str:
+    while True:
+        digits = str(rng.randint(2, 9)) + "".join(str(rng.randint(0, 9)) for _ in range(11))
+        if verhoeff_valid(digits):
+            return f"{digits[:4]} {digits[4:8]} {digits[8:]}"
+
+
+def random_field(rng: random.Random) -> str:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    kind = rng.randrange(9)
+    if kind == 0:
+        return f"Email: {rng.choice(FILLER)}{rng.randint(1, 999)}@example.in"
+    if kind == 1:
+        return f"Income Rs. {rng.randint(1, 99)},{rng.randint(10, 99)},000/-"
+    if kind == 2:
+        return f"PIN Code: {rng.randint(110000, 855999)}"
+    if kind == 3:
+        return f"Ration Card No: KA/{rng.randint(10, 99)}/{rng.randint(100000, 999999)}"
+    if kind == 4:
+        return f"Aadhaar {random_aadhaar(rng)}"
+    if kind == 5:
+        return f"Mobile +91 {rng.randint(6, 9)}{rng.randint(100000000, 999999999)}"
+    if kind == 6:
+        return "PAN " + "".join(rng.choice(letters) for _ in range(3)) + "P" + rng.choice(letters) \
+            + f"{rng.randint(1000, 9999)}" + rng.choice(letters)
+    if kind == 7:
+        return "EPIC " + "".join(rng.choice(letters) for _ in range(3)) + f"{rng.randint(1000000, 9999999)}"
+    return "IFSC " + "".join(rng.choice(letters) for _ in range(4)) + f"0{rng.randint(100000, 999999)}"
+
+
+def make_corpus(megabytes: float, seed: int = 7) -> str:
+    """OCR-like text: filler words and numbers with a field every ~20 words."""
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    parts = []
+    size = 0
+    while size < target:
+        if rng.random() < 0.05:
+            part = random_field(rng)
+        elif rng.random() < 0.1:
+            part = str(rng.randint(1, 99999))
+        else:
+            part = rng.choice(FILLER)
+        parts.append(part)
+        size += len(part) + 1
+        if rng.random() < 0.08:
+            parts.append("\n")
+    return " ".join(parts)
+
+
+def time_call(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def separate_scans(fields: Sequence[str]):
+    """Baseline: one compiled pattern and one finditer pass per field (no validation)."""
+    patterns = [FieldExtractor([field]).pattern for field in fields]
+
+    def run(text: str) -> int:
+        return sum(1 for pattern in patterns for _ in pattern.finditer(text))
+    return run
+
+
+def run(megabytes: List[float], repeat: int) -> Dict:
+    report = {"by_field_count": [], "by_corpus_size": []}
+
+    corpus = make_corpus(megabytes[0])
+    size_mb = len(corpus) / (1024 * 1024)
+    for count in range(1, len(FieldExtractor.FIELDS) + 1):
+        fields = FieldExtractor.FIELDS[:count]
+        extractor = FieldExtractor(fields)
+        baseline = separate_scans(fields)
+        single = time_call(lambda: extractor.extract(corpus), repeat)
+        separate = time_call(lambda: baseline(corpus), repeat)
+        report["by_field_count"].append({
+            "fields": count,
+            "single_pass_ms": round(single * 1000, 1),
+            "separate_scans_ms": round(separate * 1000, 1),
+            "single_pass_mb_per_s": round(size_mb / single, 1)
+        })
+
+    extractor = FieldExtractor()
+    for mb in megabytes:
+        corpus = make_corpus(mb)
+        seconds = time_call(lambda: extractor.extract(corpus), repeat)
+        report["by_corpus_size"].append({
+            "megabytes": round(len(corpus) / (1024 * 1024), 2),
+            "matches": len(extractor.extract(corpus)),
+            "single_pass_ms": round(seconds * 1000, 1),
+            "ms_per_mb": round(seconds * 1000 / (len(corpus) / (1024 * 1024)), 1)
+        })
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark single-pass OCR field extraction")
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 2, 4],
+                        help="Corpus sizes; the first is used for the field-count sweep")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.megabytes, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+Load Test
+Open-loop load generator for the AI service. Starts `uvicorn app:app`
+locally (or targets --url), sends a weighted mix of /api/check-eligibility,
+/api/ocr and /api/health requests with Poisson arrivals at a fixed rate and
+reports throughput and p50/p95/p99/p99.9 latency per endpoint.
+
+Requests are sent on schedule whether or not earlier ones have completed,
+and latency is measured from the scheduled send time, so a slow server
+shows up as latency instead of silently lowering the offered load.
+
+Sweeps: every combination of --workers, --schemes and --rate is run as a
+separate server start and load run. Budgets such as
+`check-eligibility.p99=50` (ms) or `ocr.error_rate=0.01` are checked for every
+run; the exit status is 1 when any is exceeded.
+
+Usage:
+    python benchmarks/load_test.py --rate 100 --duration 20
+    python benchmarks/load_test.py --workers 1 2 4 --schemes 10 1000 --rate 50 200 \\
+        --budget check-eligibility.p99=100 --budget health.p99=20 --output load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --rate 20 --mix check-eligibility=1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence
+
+import httpx
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVICE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_engines import make_catalog, make_population
+from bench_ocr_preprocessing import DEFAULT_FIXTURES, ensure_fixtures
+from catalog_manager import write_catalog
+
+
+ENDPOINTS = ("check-eligibility", "ocr", "health")
+DEFAULT_MIX = "check-eligibility=80,ocr=5,health=15"
+
+PERCENTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("p999", 0.999))
+
+# Budget metrics where higher is better; everything else is an upper bound
+MIN_BUDGETS = ("throughput",)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'check-eligibility=80,ocr=5' -> normalized weights."""
+    weights = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def parse_budget(text: str) -> tuple:
+    """'check-eligibility.p99=50' -> ('check-eligibility', 'p99', 50.0)."""
+    key, _, value = text.partition("=")
+    endpoint, _, name = key.partition(".")
+    if endpoint not in ENDPOINTS or not name or not value:
+        raise ValueError(f"Budget must look like ENDPOINT.METRIC=VALUE: {text}")
+    return endpoint, name, float(value)
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(workers: int, catalog_path: str, state_dir: str, startup_timeout: float = 60) -> Iterator[str]:
+    """Run uvicorn with the given worker count and catalog; yields the base URL."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        SCHEME_CATALOG_PATH=catalog_path,
+        OCR_JOBS_PATH=os.path.join(state_dir, "ocr_jobs.db"),
+        PROFILE_DIR=os.path.join(state_dir, "profiles")
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=SERVICE_DIR, env=env
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+            try:
+                if httpx.get(f"{url}/api/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become ready in time")
+            time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class RequestFactory:
+    """Builds the request for each endpoint from the seeded profiles and OCR fixtures."""
+
+    def __init__(self, profiles: List[Dict], documents: List[bytes], rng: random.Random, ocr_cache_bust: bool):
+        self.profiles = profiles
+        self.documents = documents
+        self.rng = rng
+        self.ocr_cache_bust = ocr_cache_bust
+        self._sequence = 0
+
+    def build(self, client: httpx.AsyncClient, endpoint: str) -> httpx.Request:
+        self._sequence += 1
+        if endpoint == "check-eligibility":
+            profile = self.profiles[self._sequence % len(self.profiles)]
+            return client.build_request("POST", "/api/check-eligibility", json=profile)
+        if endpoint == "ocr":
+            contents = self.documents[self._sequence % len(self.documents)]
+            if self.ocr_cache_bust:
+                # Bytes after the JPEG end marker are ignored by decoders but change the cache key
+                contents += f"load-test-{self._sequence}".encode()
+            files = {"file": ("document.jpg", contents, "image/jpeg")}
+            return client.build_request("POST", "/api/ocr", files=files)
+        return client.build_request("GET", "/api/health")
+
+
+async def run_load(url: str, mix: Dict[str, float], rate: float, duration: float, warmup: float,
+                   factory: RequestFactory, rng: random.Random, max_in_flight: int) -> Dict:
+    """
+    Offer Poisson arrivals at `rate` requests/second for warmup + duration
+    seconds. Only requests scheduled after the warm-up are recorded.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    dropped = {name: 0 for name in names}
+    statuses: Dict[str, Dict[str, int]] = {name: {} for name in names}
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        measure_from = start + warmup
+        end = measure_from + duration
+        in_flight = set()
+
+        async def send(endpoint: str, request: httpx.Request, scheduled: float) -> None:
+            try:
+                response = await client.send(request)
+                await response.aread()
+                status = str(response.status_code)
+                failed = response.status_code >= 400
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                failed = True
+            if scheduled < measure_from:
+                return
+            latencies[endpoint].append(loop.time() - scheduled)
+            statuses[endpoint][status] = statuses[endpoint].get(status, 0) + 1
+            if failed:
+                errors[endpoint] += 1
+
+        scheduled = start
+        while True:
+            scheduled += rng.expovariate(rate)
+            if scheduled >= end:
+                break
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            endpoint = rng.choices(names, weights)[0]
+            if len(in_flight) >= max_in_flight:
+                # The client is saturated; count it rather than delay the schedule
+                if scheduled >= measure_from:
+                    dropped[endpoint] += 1
+                continue
+            task = asyncio.ensure_future(send(endpoint, factory.build(client, endpoint), scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        elapsed = max(loop.time() - measure_from, duration)
+
+    report = {}
+    for name in names:
+        samples = latencies[name]
+        sent = len(samples) + dropped[name]
+        entry = {
+            "requests": len(samples),
+            "errors": errors[name],
+            "dropped": dropped[name],
+            "error_rate": round((errors[name] + dropped[name]) / sent, 4) if sent else 0.0,
+            "throughput": round((len(samples) - errors[name]) / elapsed, 2),
+            "statuses": statuses[name]
+        }
+        for label, fraction in PERCENTILES:
+            entry[label] = round(percentile(samples, fraction) * 1000, 2) if samples else None
+        entry["max"] = round(max(samples) * 1000, 2) if samples else None
+        report[name] = entry
+    return report
+
+
+def check_budgets(report: Dict, budgets: List[tuple]) -> List[str]:
+    """Descriptions of every budget the run exceeded."""
+    violations = []
+    for endpoint, name, limit in budgets:
+        entry = report.get(endpoint)
+        if entry is None:
+            continue
+        value = entry.get(name)
+        if value is None:
+            violations.append(f"{endpoint}.{name}: no successful samples")
+        elif name in MIN_BUDGETS and value < limit:
+            violations.append(f"{endpoint}.{name}: {value} < {limit}")
+        elif name not in MIN_BUDGETS and value > limit:
+            violations.append(f"{endpoint}.{name}: {value} > {limit}")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop load test for the AI service")
+    parser.add_argument("--url", help="Target an already running service instead of starting uvicorn")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="uvicorn worker counts to sweep")
+    parser.add_argument("--schemes", type=int, nargs="+", default=[0],
+                        help="Synthetic catalog sizes to sweep (0: built-in catalog)")
+    parser.add_argument("--rate", type=float, nargs="+", default=[50], help="Offered requests/second to sweep")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=3, help="Unrecorded seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--budget", action="append", default=[],
+                        help="ENDPOINT.METRIC=VALUE, e.g. check-eligibility.p99=50 (ms), ocr.error_rate=0.01, "
+                             "health.throughput=10 (minimum req/s)")
+    parser.add_argument("--users", type=int, default=1000, help="Distinct synthetic profiles to replay")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="OCR fixture directory (generated if missing)")
+    parser.add_argument("--documents", type=int, default=8, help="OCR fixture documents to replay")
+    parser.add_argument("--ocr-cache-bust", action="store_true",
+                        help="Make every OCR upload unique so the OCR cache does not serve repeats")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="Client-side concurrency limit")
+    parser.add_argument("--seed", type=int, default=11, help="Seed for profiles, catalogs and arrivals")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    budgets = [parse_budget(text) for text in args.budget]
+    profiles = make_population(args.users, args.seed)
+    documents = []
+    if "ocr" in mix:
+        for document in ensure_fixtures(args.fixtures, args.documents, 1234):
+            with open(os.path.join(args.fixtures, document["file"]), "rb") as f:
+                documents.append(f.read())
+
+    runs = []
+    with tempfile.TemporaryDirectory() as state_dir:
+        targets = [(None, None)] if args.url else [(w, s) for w in args.workers for s in args.schemes]
+        for workers, schemes in targets:
+            catalog_path = ""
+            if schemes:
+                catalog_path = os.path.join(state_dir, f"catalog-{schemes}.json")
+                if not os.path.exists(catalog_path):
+                    write_catalog(make_catalog(schemes, args.seed), catalog_path)
+
+            for rate in args.rate:
+                rng = random.Random(args.seed)
+                factory = RequestFactory(profiles, documents, rng, args.ocr_cache_bust)
+                if args.url:
+                    report = asyncio.run(run_load(args.url, mix, rate, args.duration, args.warmup,
+                                                  factory, rng, args.max_in_flight))
+                else:
+                    with serve(workers, catalog_path, state_dir) as url:
+                        report = asyncio.run(run_load(url, mix, rate, args.duration, args.warmup,
+                                                      factory, rng, args.max_in_flight))
+                violations = check_budgets(report, budgets)
+                runs.append({
+                    "workers": workers,
+                    "schemes": schemes or None,
+                    "rate": rate,
+                    "duration": args.duration,
+                    "endpoints": report,
+                    "violations": violations
+                })
+                print(f"workers={workers} schemes={schemes} rate={rate}/s: "
+                      + ", ".join(f"{name} p99={entry['p99']}ms err={entry['error_rate']}"
+                                  for name, entry in report.items())
+                      + (f" BUDGET EXCEEDED: {'; '.join(violations)}" if violations else ""),
+                      file=sys.stderr)
+
+    text = json.dumps({"mix": mix, "budgets": args.budget, "runs": runs}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any(run["violations"] for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
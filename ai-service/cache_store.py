@@ -0,0 +1,275 @@
+"""
+Cache Store
+Bounded in-process LRU cache with TTL and an optional shared SQLite tier
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with per-entry TTL.
+    Values are stored as-is, so callers must not mutate cached objects.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class SQLiteCache:
+    """
+    On-disk cache tier in a SQLite file with LRU eviction and TTL.
+    Several processes (e.g. uvicorn workers) can share the same file.
+    Values must be JSON-serializable.
+    """
+
+    # Trim to max_entries every N writes rather than on every write
+    TRIM_INTERVAL = 32
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now)
+            )
+            self._writes += 1
+            if self._writes % self.TRIM_INTERVAL == 0:
+                self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        expired = self._conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        self.expirations += max(expired, 0)
+        excess = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def retain_prefix(self, prefix: str) -> int:
+        """
+        Delete every entry whose key does not start with prefix.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM cache WHERE substr(key, 1, ?) != ?", (len(prefix), prefix)
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {
+            "entries": entries,
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional SQLite tier.
+    Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict:
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        lookups = self.memory.hits + self.memory.misses
+        disk_hits = self.disk.hits if self.disk is not None else 0
+        stats["hitRatio"] = round((self.memory.hits + disk_hits) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class VersionedCache:
+    """
+    Tiered cache for results derived from versioned data (e.g. eligibility
+    results for one scheme catalog). Keys are scoped to the current version,
+    read from a callback; when it changes, the memory tier is cleared and the
+    SQLite tier keeps only entries of the new version. Results computed
+    against any other version are not stored.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache], current_version: Callable[[], str]):
+        """
+        Args:
+            memory: In-process tier
+            disk: Optional SQLite tier; use a file of its own, since other
+                versions' entries are deleted from it
+            current_version: Returns the version results are currently computed against
+        """
+        self.tiers = TieredCache(memory, disk)
+        self.current_version = current_version
+        self.version: Optional[str] = None
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def disk(self) -> Optional[SQLiteCache]:
+        return self.tiers.disk
+
+    def _sync(self) -> str:
+        version = self.current_version()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    if self.version is not None:
+                        self.tiers.memory.clear()
+                        self.invalidations += 1
+                    if self.tiers.disk is not None:
+                        self.tiers.disk.retain_prefix(f"{version}:")
+                    self.version = version
+        return version
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.tiers.get(f"{self._sync()}:{key}")
+
+    def set(self, key: str, value: Any, version: str) -> None:
+        """Store a result computed against `version`; dropped if that is no longer current."""
+        if version == self._sync():
+            self.tiers.set(f"{version}:{key}", value)
+
+    def close(self) -> None:
+        self.tiers.close()
+
+    def stats(self) -> Dict:
+        return {**self.tiers.stats(), "version": self.version, "invalidations": self.invalidations}
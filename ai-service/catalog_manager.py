@@ -0,0 +1,347 @@
+"""
+Catalog Manager
+Loads the scheme catalog from a JSON file or SQLite database, compiles it
+into an immutable, versioned snapshot and swaps snapshots atomically on
+reload. Requests read the current snapshot once and use it throughout, so
+a reload never changes the catalog under an in-flight request.
+
+Catalog sources:
+    - None: the built-in SAMPLE_SCHEMES
+    - *.json: a JSON array of scheme objects (same shape as SAMPLE_SCHEMES,
+      optionally with a "profile" holding impact_score / expected_benefit)
+    - *.db / *.sqlite / *.sqlite3: a table schemes(position INTEGER, definition TEXT)
+      with one JSON scheme object per row, ordered by position
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from eligibility_service import EligibilityService
+from scheme_registry import SchemeRegistry
+from scheme_catalog import SAMPLE_SCHEMES
+from shared_catalog import attach_catalog
+
+
+logger = logging.getLogger(__name__)
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+REQUIRED_CRITERIA = ('min_age', 'max_age', 'max_income', 'categories', 'states')
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog source cannot be read or fails validation."""
+
+
+class CatalogNotReady(CatalogError):
+    """Raised when a shared catalog's version has not been exported yet; retry later."""
+
+
+class CatalogSnapshot(NamedTuple):
+    """One compiled catalog version (scheme records, kernels, index and tables)."""
+    version: str
+    source: str
+    loaded_at: float
+    schemes: SchemeRegistry
+    service: EligibilityService
+    shared: bool = False  # Kernel and response tables are mapped from a shared catalog export
+
+
+def validate_scheme(scheme: Dict, position: int) -> None:
+    """
+    Check that a catalog entry has the fields the scoring pipeline reads.
+
+    Raises:
+        CatalogError: If a field is missing or has the wrong type
+    """
+    if not isinstance(scheme, dict):
+        raise CatalogError(f"Scheme {position}: expected an object")
+    for field in ('name', 'description', 'category', 'benefits'):
+        if not isinstance(scheme.get(field), str):
+            raise CatalogError(f"Scheme {position}: '{field}' must be a string")
+
+    criteria = scheme.get('criteria')
+    if not isinstance(criteria, dict):
+        raise CatalogError(f"Scheme {position} ({scheme['name']}): 'criteria' must be an object")
+    missing = [field for field in REQUIRED_CRITERIA if field not in criteria]
+    if missing:
+        raise CatalogError(f"Scheme {position} ({scheme['name']}): missing criteria {', '.join(missing)}")
+    for field in ('min_age', 'max_age', 'max_income'):
+        if not _is_number(criteria[field]):
+            raise CatalogError(f"Scheme {position} ({scheme['name']}): '{field}' must be a number")
+    for field in ('categories', 'states'):
+        if not _is_string_list(criteria[field]):
+            raise CatalogError(f"Scheme {position} ({scheme['name']}): '{field}' must be a list of strings")
+    if 'gender' in criteria and not isinstance(criteria['gender'], str):
+        raise CatalogError(f"Scheme {position} ({scheme['name']}): 'gender' must be a string")
+
+    if 'duration' in scheme and not isinstance(scheme['duration'], str):
+        raise CatalogError(f"Scheme {position} ({scheme['name']}): 'duration' must be a string")
+    if 'requirements' in scheme and not _is_string_list(scheme['requirements']):
+        raise CatalogError(f"Scheme {position} ({scheme['name']}): 'requirements' must be a list of strings")
+    if 'profile' in scheme:
+        validate_profile(scheme['profile'], f"Scheme {position} ({scheme['name']})")
+
+
+def validate_profile(profile: Dict, label: str) -> None:
+    """
+    Check the optional per-scheme profile metadata.
+
+    Raises:
+        CatalogError: If a field has the wrong type
+    """
+    if not isinstance(profile, dict):
+        raise CatalogError(f"{label}: 'profile' must be an object")
+    if 'impact_score' in profile and not _is_number(profile['impact_score']):
+        raise CatalogError(f"{label}: 'profile.impact_score' must be a number")
+    if 'expected_benefit' in profile:
+        benefit = profile['expected_benefit']
+        if (not isinstance(benefit, dict) or not _is_number(benefit.get('min'))
+                or not _is_number(benefit.get('max')) or not isinstance(benefit.get('frequency'), str)):
+            raise CatalogError(
+                f"{label}: 'profile.expected_benefit' must have numeric 'min' and 'max' and a string 'frequency'"
+            )
+    if 'target_demographic' in profile and not isinstance(profile['target_demographic'], dict):
+        raise CatalogError(f"{label}: 'profile.target_demographic' must be an object")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_string_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def read_catalog(source: Optional[str]) -> List[Dict]:
+    """
+    Read and validate the scheme list from a catalog source.
+
+    Raises:
+        CatalogError: If the source cannot be read or an entry is invalid
+    """
+    if source is None:
+        schemes = copy.deepcopy(SAMPLE_SCHEMES)
+    elif source.lower().endswith(SQLITE_EXTENSIONS):
+        try:
+            conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+            try:
+                rows = conn.execute("SELECT definition FROM schemes ORDER BY position").fetchall()
+            finally:
+                conn.close()
+            schemes = [json.loads(definition) for (definition,) in rows]
+        except (sqlite3.Error, ValueError) as e:
+            raise CatalogError(f"Cannot read catalog {source}: {e}")
+    else:
+        try:
+            with open(source, encoding='utf-8') as f:
+                schemes = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CatalogError(f"Cannot read catalog {source}: {e}")
+
+    if not isinstance(schemes, list) or not schemes:
+        raise CatalogError("Catalog must be a non-empty list of schemes")
+    for position, scheme in enumerate(schemes):
+        validate_scheme(scheme, position)
+    return schemes
+
+
+def write_catalog(schemes: List[Dict], path: str) -> None:
+    """Write a catalog in the format chosen by the file extension (atomically for JSON)."""
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        conn = sqlite3.connect(path)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS schemes (position INTEGER PRIMARY KEY, definition TEXT NOT NULL)")
+                conn.execute("DELETE FROM schemes")
+                conn.executemany(
+                    "INSERT INTO schemes (position, definition) VALUES (?, ?)",
+                    [(i, json.dumps(scheme, ensure_ascii=False)) for i, scheme in enumerate(schemes)]
+                )
+        finally:
+            conn.close()
+    else:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(schemes, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def catalog_version(schemes: List[Dict]) -> str:
+    """Content hash of a catalog, so every worker loading the same data reports the same version."""
+    canonical = json.dumps(schemes, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+
+
+class CatalogManager:
+    """
+    Holds the current CatalogSnapshot and replaces it on reload.
+    Reading `snapshot` is a single attribute load, so readers never see a
+    half-built catalog; reloads are serialized and compile off to the side.
+    """
+
+    # Seconds between checks for the export while waiting for it at startup
+    ATTACH_POLL_INTERVAL = 0.5
+
+    def __init__(self, source: Optional[str] = None, precompute: bool = False,
+                 shared_dir: Optional[str] = None, attach_timeout: float = 120):
+        """
+        Args:
+            source: Catalog file or SQLite database (None for the built-in catalog)
+            precompute: Also build the ResponseTable for each snapshot
+            shared_dir: Shared catalog directory (see serve.py). Catalog
+                versions are only ever attached from exports there, never
+                compiled here; a version not exported yet is retried later.
+            attach_timeout: With shared_dir, seconds to wait at startup for
+                the source's version to be exported
+
+        Raises:
+            CatalogError: If the initial catalog cannot be loaded
+            CatalogNotReady: If the export did not appear within attach_timeout
+        """
+        self.source = source
+        self.precompute = precompute
+        self.shared_dir = shared_dir
+        self.reload_count = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._export_pending = False
+        deadline = time.monotonic() + attach_timeout
+        while True:
+            self._signature = self._source_signature()
+            try:
+                self.snapshot = self._build(read_catalog(source))
+                break
+            except CatalogNotReady:
+                # Re-read the source each time in case it changed while waiting
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(self.ATTACH_POLL_INTERVAL)
+
+    def _build(self, schemes: List[Dict]) -> CatalogSnapshot:
+        """
+        Raises:
+            CatalogError: If the catalog cannot be compiled (e.g. a value the
+                validation let through breaks a compile step)
+        """
+        try:
+            return self._compile(schemes)
+        except CatalogError:
+            raise
+        except Exception as e:
+            raise CatalogError(f"Cannot compile catalog: {type(e).__name__}: {e}") from e
+
+    def _compile(self, schemes: List[Dict]) -> CatalogSnapshot:
+        version = catalog_version(schemes)
+        shared = self.shared_dir is not None
+        if shared:
+            # Compiling here would give every worker a private copy of the tables
+            service = attach_catalog(self.shared_dir, version, schemes, self.precompute)
+            if service is None:
+                raise CatalogNotReady(f"Scheme catalog version {version} is not exported to {self.shared_dir} yet")
+        else:
+            service = EligibilityService(schemes, precompute=self.precompute)
+        return CatalogSnapshot(
+            version=version,
+            source=self.source or "built-in",
+            loaded_at=time.time(),
+            schemes=service.registry,
+            service=service,
+            shared=shared
+        )
+
+    def _source_signature(self) -> Optional[Tuple]:
+        """Modification times and sizes of the source (and its SQLite WAL file)."""
+        if self.source is None:
+            return None
+        signature = []
+        for path in (self.source, f"{self.source}-wal"):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def reload(self) -> Tuple[CatalogSnapshot, bool]:
+        """
+        Re-read the source and swap in a new snapshot if the content changed.
+        On failure the current snapshot stays in place.
+
+        Returns:
+            (current snapshot, whether it was replaced)
+
+        Raises:
+            CatalogError: If the source cannot be read or is invalid
+            CatalogNotReady: If the new version is not exported to the shared
+                directory yet; source_changed() stays true so it is retried
+        """
+        with self._lock:
+            # Recorded before reading so a broken file is not retried until it changes again
+            self._signature = self._source_signature()
+            try:
+                schemes = read_catalog(self.source)
+            except CatalogError as e:
+                self.last_error = str(e)
+                raise
+
+            if catalog_version(schemes) == self.snapshot.version:
+                self.last_error = None
+                self._export_pending = False
+                return self.snapshot, False
+
+            try:
+                snapshot = self._build(schemes)
+            except CatalogNotReady:
+                self._export_pending = True
+                raise
+            except CatalogError as e:
+                self.last_error = str(e)
+                raise
+            self.last_error = None
+            self._export_pending = False
+            self.snapshot = snapshot
+            self.reload_count += 1
+            logger.info("Scheme catalog reloaded: version %s (%d schemes)", snapshot.version, len(snapshot.schemes))
+            return snapshot, True
+
+    def source_changed(self) -> bool:
+        return self.source is not None and (self._export_pending or self._source_signature() != self._signature)
+
+    async def watch(self, interval: float) -> None:
+        """Poll the source and reload when it changes (run as a background task)."""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.source_changed():
+                continue
+            try:
+                await run_in_threadpool(self.reload)
+            except CatalogNotReady as e:
+                logger.debug("%s, retrying", e)
+            except CatalogError as e:
+                logger.warning("Scheme catalog reload failed, keeping version %s: %s", self.snapshot.version, e)
+            except Exception:
+                # Keep watching; an unexpected error must not stop future reloads
+                logger.exception("Scheme catalog reload failed, keeping version %s", self.snapshot.version)
+
+    def info(self) -> Dict:
+        snapshot = self.snapshot
+        return {
+            "catalogVersion": snapshot.version,
+            "source": snapshot.source,
+            "loadedAt": snapshot.loaded_at,
+            "schemeCount": len(snapshot.schemes),
+            "precomputed": snapshot.service.response_table is not None,
+            "shared": snapshot.shared,
+            "exportPending": self._export_pending,
+            "reloadCount": self.reload_count,
+            "lastError": self.last_error
+        }
@@ -0,0 +1,148 @@
+"""
+Eligibility Index for Welfare Schemes
+Finds candidate schemes for a user without scanning the whole catalog
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+
+class ThresholdIndex:
+    """
+    Sorted interval structure over one numeric criterion.
+    Answers "which schemes have value <= x" / ">= x" as bitsets in O(log n)
+    plus at most CHECKPOINT_INTERVAL single-bit merges.
+    """
+
+    CHECKPOINT_INTERVAL = 64
+
+    def __init__(self, values: List[float]):
+        # Scheme IDs in sorted order; single-bit masks are built when merged,
+        # since holding one per scheme would take memory quadratic in its size
+        self.order = sorted(range(len(values)), key=lambda i: values[i])
+        self.sorted_values = [values[i] for i in self.order]
+
+        # prefix_masks[c] = OR of bits for sorted positions [0, c * CHECKPOINT_INTERVAL)
+        self.prefix_masks = [0]
+        mask = 0
+        for position, scheme_id in enumerate(self.order, 1):
+            mask |= 1 << scheme_id
+            if position % self.CHECKPOINT_INTERVAL == 0:
+                self.prefix_masks.append(mask)
+        self.full_mask = mask
+
+    def _prefix(self, count: int) -> int:
+        """Bitset of the first `count` schemes in sorted order."""
+        checkpoint = count // self.CHECKPOINT_INTERVAL
+        mask = self.prefix_masks[checkpoint]
+        for position in range(checkpoint * self.CHECKPOINT_INTERVAL, count):
+            mask |= 1 << self.order[position]
+        return mask
+
+    def at_most(self, value: float) -> int:
+        """Bitset of schemes whose criterion value is <= value."""
+        return self._prefix(bisect_right(self.sorted_values, value))
+
+    def at_least(self, value: float) -> int:
+        """Bitset of schemes whose criterion value is >= value."""
+        return self.full_mask & ~self._prefix(bisect_left(self.sorted_values, value))
+
+
+class EligibilityIndex:
+    """
+    Index over scheme criteria applying the same hard filters as check_eligibility
+    (age range, max income, category, gender and state).
+    Scheme IDs are positions in the catalog list used to build the index.
+    """
+
+    def __init__(self, schemes: List[Dict]):
+        self.size = len(schemes)
+        self.full_mask = (1 << self.size) - 1
+
+        criteria_list = [scheme['criteria'] for scheme in schemes]
+        self.min_age_index = ThresholdIndex([c.get('min_age', 0) for c in criteria_list])
+        self.max_age_index = ThresholdIndex([c.get('max_age', 120) for c in criteria_list])
+        self.max_income_index = ThresholdIndex([c.get('max_income', float('inf')) for c in criteria_list])
+
+        self.all_categories_mask = 0
+        self.category_masks: Dict[str, int] = {}
+        self.all_states_mask = 0
+        self.state_masks: Dict[str, int] = {}
+        self.no_gender_mask = 0
+        self.gender_masks: Dict[Optional[str], int] = {}
+
+        for scheme_id, criteria in enumerate(criteria_list):
+            bit = 1 << scheme_id
+
+            categories = criteria.get('categories', ['All'])
+            if 'All' in categories:
+                self.all_categories_mask |= bit
+            for category in categories:
+                self.category_masks[category] = self.category_masks.get(category, 0) | bit
+
+            states = criteria.get('states', ['All'])
+            if 'All' in states:
+                self.all_states_mask |= bit
+            for state in states:
+                self.state_masks[state] = self.state_masks.get(state, 0) | bit
+
+            if 'gender' in criteria:
+                gender = criteria['gender']
+                self.gender_masks[gender] = self.gender_masks.get(gender, 0) | bit
+            else:
+                self.no_gender_mask |= bit
+
+    def candidate_mask(self, age: int, income: float, category: str,
+                       state: str, gender: Optional[str] = None) -> int:
+        """
+        Bitset of schemes passing every hard eligibility filter.
+
+        Args:
+            age: User's age
+            income: User's annual income
+            category: User's social category
+            state: User's state
+            gender: User's gender (gender-specific schemes are kept when not provided)
+
+        Returns:
+            Integer bitset where bit i is set if scheme i is a candidate
+        """
+        mask = self.all_categories_mask | self.category_masks.get(category, 0)
+        mask &= self.all_states_mask | self.state_masks.get(state, 0)
+        if gender:
+            mask &= self.no_gender_mask | self.gender_masks.get(gender, 0)
+        if not mask:
+            return 0
+
+        mask &= self.max_income_index.at_least(income)
+        mask &= self.min_age_index.at_most(age)
+        mask &= self.max_age_index.at_least(age)
+        return mask
+
+    def candidates(self, age: int, income: float, category: str,
+                   state: str, gender: Optional[str] = None) -> List[int]:
+        """
+        Scheme IDs passing every hard eligibility filter, in catalog order.
+
+        Args:
+            age: User's age
+            income: User's annual income
+            category: User's social category
+            state: User's state
+            gender: User's gender (gender-specific schemes are kept when not provided)
+
+        Returns:
+            Sorted list of scheme IDs
+        """
+        return EligibilityIndex.mask_to_ids(self.candidate_mask(age, income, category, state, gender))
+
+    @staticmethod
+    def mask_to_ids(mask: int) -> List[int]:
+        """Expand a bitset into the sorted list of set bit positions."""
+        ids = []
+        bits = bin(mask)[:1:-1]
+        position = bits.find('1')
+        while position != -1:
+            ids.append(position)
+            position = bits.find('1', position + 1)
+        return ids
@@ -0,0 +1,367 @@
+"""
+Eligibility Service
+Scores user profiles against a compiled scheme catalog.
+Shared by the HTTP API, the batch endpoint and offline tools so they agree.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from statistical_engine import StatisticalEngine, FactorRecord
+from recommendation_engine import RecommendationEngine, TopKRanker
+from scheme_registry import SchemeRecord, SchemeRegistry
+from scheme_kernels import compile_scheme_kernels
+from eligibility_index import EligibilityIndex
+from response_table import ResponseTable
+from record_stream import encode_json, encode_members
+
+
+logger = logging.getLogger(__name__)
+
+
+class EligibilityService:
+    """
+    Compiled scheme catalog (kernels + eligibility index) and the
+    request-time scoring pipeline built on top of it.
+    """
+
+    MIN_PROBABILITY = 0.3
+
+    # Slack for the vectorized prefilter in check_many and the response
+    # table's pruning; survivors are re-scored exactly, so this only has
+    # to cover float rounding
+    BATCH_PREFILTER_TOLERANCE = 1e-9
+
+    def __init__(self, schemes: List[Dict], precompute: bool = False,
+                 tables: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            schemes: Scheme catalog
+            precompute: Also materialize a ResponseTable over the discrete
+                profile space so common requests start from a table lookup
+            tables: Arrays from tables() of a service compiled earlier for the
+                same catalog (see shared_catalog); the kernels and response
+                table are attached to them instead of being rebuilt
+        """
+        # Scheme fields and profile metadata resolved once; scoring reads
+        # records by ID instead of the catalog dictionaries
+        self.registry = SchemeRegistry(schemes)
+        self.kernels = compile_scheme_kernels(schemes, tables)
+        self.index = EligibilityIndex(schemes)
+
+        self.response_table = None
+        if precompute:
+            table_arrays = tables if tables is not None and 'response_cells' in tables else None
+            try:
+                self.response_table = ResponseTable(
+                    self.kernels, self.index, self.MIN_PROBABILITY, self.BATCH_PREFILTER_TOLERANCE, table_arrays
+                )
+            except ValueError as e:
+                logger.warning("Response table disabled: %s", e)
+
+    def tables(self) -> Dict[str, np.ndarray]:
+        """Compiled arrays (kernels and, if built, the response table) for attaching other services."""
+        tables = self.kernels.tables()
+        if self.response_table is not None:
+            tables.update(self.response_table.tables())
+        return tables
+
+    def check(self, user_data: Dict) -> Dict:
+        """
+        Check eligibility for one user.
+
+        Args:
+            user_data: Dictionary with age, income, category, state and gender
+
+        Returns:
+            Response body for /api/check-eligibility
+        """
+        return self._score(user_data, self._candidates(user_data))
+
+    def check_json(self, user_data: Dict, extra: Optional[Dict] = None,
+                   timings: Optional[Dict[str, float]] = None) -> bytes:
+        """
+        Same result as check(), encoded as compact UTF-8 JSON. The static
+        fields of each recommended scheme are spliced in from fragments
+        encoded when the catalog was compiled; only the per-request fields
+        are serialized here.
+
+        Args:
+            user_data: Dictionary with age, income, category, state and gender
+            extra: Members appended to the top-level object (e.g. catalogVersion)
+            timings: Dictionary to add per-stage timings (milliseconds) to
+
+        Returns:
+            Encoded response body for /api/check-eligibility
+        """
+        start = time.perf_counter()
+        candidate_ids = self._candidates(user_data)
+        _lap(timings, "filter", start)
+        return self._encode(user_data, candidate_ids, extra, timings)
+
+    def check_many_json(self, users: List[Dict], extra: Optional[Dict] = None,
+                        timings: Optional[Dict[str, float]] = None) -> List[bytes]:
+        """
+        check_many() with each result encoded as in check_json(). Used by
+        the micro-batcher, which scores concurrent single requests together.
+
+        Args:
+            users: List of user dictionaries
+            extra: Members appended to every top-level object
+            timings: Dictionary to add per-stage timings (milliseconds) to,
+                summed over the whole batch
+
+        Returns:
+            One encoded response body per user, in input order
+        """
+        start = time.perf_counter()
+        candidates = self._batch_candidates(users)
+        _lap(timings, "filter", start)
+        return [
+            self._encode(user_data, candidate_ids, extra, timings)
+            for user_data, candidate_ids in zip(users, candidates)
+        ]
+
+    def _encode(self, user_data: Dict, candidate_ids: Iterable[int], extra: Optional[Dict],
+                timings: Optional[Dict[str, float]]) -> bytes:
+        start = time.perf_counter()
+        vulnerability_index, ranker = self._rank(user_data, candidate_ids)
+        start = _lap(timings, "rank", start)
+
+        schemes = []
+        for recommendation_score, (record, factors) in ranker.results():
+            scores, analysis = self._recommendation_parts(
+                user_data, vulnerability_index, record, factors, recommendation_score, timings
+            )
+            start = time.perf_counter()
+            schemes.append(b''.join((
+                b'{', record.head_json, b',', encode_members(scores), b',',
+                record.requirements_json, b',', encode_members(analysis), b'}'
+            )))
+            _lap(timings, "serialize", start)
+
+        start = time.perf_counter()
+        user_profile = RecommendationEngine.summarize_ranking(user_data, vulnerability_index, ranker)
+        start = _lap(timings, "profile", start)
+        body = b''.join((
+            encode_json({"success": True, "count": len(schemes), "totalEligible": ranker.total_count})[:-1],
+            b',"schemes":[', b','.join(schemes), b'],',
+            encode_members({"userProfile": user_profile, **(extra or {})}),
+            b'}'
+        ))
+        _lap(timings, "serialize", start)
+        return body
+
+    def _candidates(self, user_data: Dict) -> List[int]:
+        candidate_ids = None
+        if self.response_table is not None:
+            candidate_ids = self.response_table.lookup(
+                user_data['age'],
+                user_data['income'],
+                user_data['category'],
+                user_data['state'],
+                user_data.get('gender')
+            )
+        if candidate_ids is None:
+            candidate_ids = self.index.candidates(
+                user_data['age'],
+                user_data['income'],
+                user_data['category'],
+                user_data['state'],
+                user_data.get('gender')
+            )
+        return candidate_ids
+
+    def check_many(self, users: List[Dict]) -> List[Dict]:
+        """
+        Check eligibility for many users in one batched pass.
+        Probabilities for every (user, scheme) pair are computed with the
+        vectorized kernel first, so per-user work only touches schemes that
+        can pass the probability threshold.
+
+        Args:
+            users: List of user dictionaries
+
+        Returns:
+            One response body per user, in input order
+        """
+        return [
+            self._score(user_data, candidate_ids)
+            for user_data, candidate_ids in zip(users, self._batch_candidates(users))
+        ]
+
+    def _batch_candidates(self, users: List[Dict]) -> List[List[int]]:
+        if not users:
+            return []
+
+        matrix = self.kernels.matrix
+        probabilities = StatisticalEngine.calculate_batch_probability(*matrix.encode_users(users), matrix)
+        passing = probabilities >= self.MIN_PROBABILITY - self.BATCH_PREFILTER_TOLERANCE
+
+        candidates = []
+        for row, user_data in enumerate(users):
+            mask = self.index.candidate_mask(
+                user_data['age'],
+                user_data['income'],
+                user_data['category'],
+                user_data['state'],
+                user_data.get('gender')
+            )
+            candidates.append([int(i) for i in np.flatnonzero(passing[row]) if mask >> int(i) & 1])
+        return candidates
+
+    def _rank(self, user_data: Dict, candidate_ids: Iterable[int]) -> Tuple[float, TopKRanker]:
+        vulnerability_index = StatisticalEngine.calculate_vulnerability_index(user_data)
+
+        category_code = self.kernels.encode_category(user_data['category'])
+        gender_code = self.kernels.encode_gender(user_data.get('gender'))
+        universal_probability = self.kernels.get_universal_probability(category_code)
+
+        # Score threshold and max count are pushed into ranking; only the
+        # schemes that survive get a full response built afterwards
+        ranker = TopKRanker()
+
+        registry = self.registry
+        for scheme_id in candidate_ids:
+            record = registry[scheme_id]
+
+            # Single pass over every factor; everything below reads from it
+            factors = self.kernels[scheme_id].evaluate(
+                user_data['age'],
+                user_data['income'],
+                category_code,
+                gender_code,
+                universal_probability
+            )
+
+            if factors.probability < self.MIN_PROBABILITY:
+                continue
+
+            recommendation_score = RecommendationEngine.calculate_recommendation_score(
+                probability=round(factors.probability, 3),
+                scheme_category=record.category,
+                vulnerability_index=vulnerability_index,
+                scheme_impact=record.impact_score
+            )
+            ranker.push(recommendation_score, record.category, (record, factors))
+
+        return vulnerability_index, ranker
+
+    @staticmethod
+    def _recommendation_parts(user_data: Dict, vulnerability_index: float, record: SchemeRecord,
+                              factors: FactorRecord, recommendation_score: float,
+                              timings: Optional[Dict[str, float]] = None) -> Tuple[Dict, Dict]:
+        """
+        Per-request members of one recommendation, split into the ones
+        before and after the static "requirements" member so both response
+        paths keep the same key order.
+        """
+        start = time.perf_counter()
+        probability = round(factors.probability, 3)
+        statistical_analysis = StatisticalEngine.breakdown_from_factors(factors)
+        statistical_analysis["expectedBenefit"] = record.expected_benefit
+
+        scores = {
+            "matchScore": factors.match_score,
+            "probabilityScore": probability,
+            "confidenceInterval": StatisticalEngine.calculate_confidence_interval(factors.probability),
+            "eligibilityReason": generate_eligibility_reason(
+                user_data, record.criteria, record.category, factors
+            )
+        }
+        start = _lap(timings, "breakdown", start)
+
+        analysis = {
+            "statisticalAnalysis": statistical_analysis,
+            "impactScore": record.impact_score,
+            "recommendationScore": recommendation_score,
+            "personalizedExplanation": RecommendationEngine.get_personalized_explanation(
+                {"category": record.category, "probabilityScore": probability,
+                 "statisticalAnalysis": statistical_analysis},
+                user_data,
+                vulnerability_index
+            )
+        }
+        _lap(timings, "explanation", start)
+        return scores, analysis
+
+    def _score(self, user_data: Dict, candidate_ids: Iterable[int]) -> Dict:
+        vulnerability_index, ranker = self._rank(user_data, candidate_ids)
+
+        top_recommendations = []
+        for recommendation_score, (record, factors) in ranker.results():
+            scores, analysis = self._recommendation_parts(
+                user_data, vulnerability_index, record, factors, recommendation_score
+            )
+            top_recommendations.append({
+                "name": record.name,
+                "description": record.description,
+                "category": record.category,
+                "benefits": record.benefits,
+                "duration": record.duration,
+                **scores,
+                "requirements": list(record.requirements),
+                **analysis
+            })
+
+        user_profile = RecommendationEngine.summarize_ranking(
+            user_data,
+            vulnerability_index,
+            ranker
+        )
+
+        return {
+            "success": True,
+            "count": len(top_recommendations),
+            "totalEligible": ranker.total_count,
+            "schemes": top_recommendations,
+            "userProfile": user_profile
+        }
+
+
+def _lap(timings: Optional[Dict[str, float]], stage: str, start: float) -> float:
+    """Add the time since start (ms) to a stage, if timings are collected. Returns the current time."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (now - start) * 1000
+    return now
+
+
+def generate_eligibility_reason(user_data: Dict, criteria: Dict, category: str,
+                                factors: Optional[FactorRecord] = None) -> str:
+    """
+    Explain why the user qualifies. When the evaluated factors are passed,
+    the range checks are read from them instead of re-derived from criteria.
+    """
+    age = user_data['age']
+    income = user_data['income']
+    user_category = user_data['category']
+
+    if factors is not None:
+        age_ok = factors.age_probability > 0
+        income_ok = factors.income_probability > 0
+        category_ok = factors.category_probability > 0
+    else:
+        age_ok = criteria["min_age"] <= age <= criteria["max_age"]
+        income_ok = income <= criteria["max_income"]
+        category_ok = user_category in criteria["categories"] or "All" in criteria["categories"]
+
+    reasons = []
+
+    if age_ok:
+        reasons.append(f"Your age ({age}) falls within the eligible range")
+
+    if income_ok:
+        reasons.append(f"Your income (₹{income:,.0f}) meets the criteria")
+
+    if category_ok:
+        if user_category != "General":
+            reasons.append(f"Priority given to {user_category} category")
+        else:
+            reasons.append("Available for all categories")
+
+    if not reasons:
+        reasons.append(f"You meet the basic requirements for {category} schemes")
+
+    return ". ".join(reasons)
@@ -0,0 +1,220 @@
+"""
+Field Extractor
+Finds identity and document fields in OCR text with one compiled pattern.
+All field patterns are combined into a single alternation of named groups,
+so the text is scanned once however many fields are enabled, and each
+candidate is validated as soon as it matches (Verhoeff checksum for Aadhaar,
+holder-type letter for PAN, ...). Where fields overlap (the phone number in
+"9876543210@upi.in" and the email around it), the span of each match is
+rescanned for the other fields, so results equal one scan per field.
+"""
+
+import re
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+
+class FieldMatch(NamedTuple):
+    """One validated field found in the text."""
+    field: str
+    value: Union[str, float]  # Normalized value (float for income)
+    text: str                 # Matched text as it appears in the OCR output
+    start: int                # Character offsets of text
+    end: int
+
+
+# Verhoeff checksum tables (dihedral group D5)
+VERHOEFF_MULTIPLY = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 2, 3, 4, 0, 6, 7, 8, 9, 5),
+    (2, 3, 4, 0, 1, 7, 8, 9, 5, 6),
+    (3, 4, 0, 1, 2, 8, 9, 5, 6, 7),
+    (4, 0, 1, 2, 3, 9, 5, 6, 7, 8),
+    (5, 9, 8, 7, 6, 0, 4, 3, 2, 1),
+    (6, 5, 9, 8, 7, 1, 0, 4, 3, 2),
+    (7, 6, 5, 9, 8, 2, 1, 0, 4, 3),
+    (8, 7, 6, 5, 9, 3, 2, 1, 0, 4),
+    (9, 8, 7, 6, 5, 4, 3, 2, 1, 0)
+)
+VERHOEFF_PERMUTE = (
+    (0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    (1, 5, 7, 6, 2, 8, 3, 0, 9, 4),
+    (5, 8, 0, 3, 7, 9, 6, 1, 4, 2),
+    (8, 9, 1, 6, 0, 4, 3, 5, 2, 7),
+    (9, 4, 5, 3, 1, 2, 6, 8, 7, 0),
+    (4, 1, 3, 5, 8, 6, 0, 2, 7, 9),
+    (2, 7, 9, 3, 8, 0, 6, 4, 1, 5),
+    (7, 0, 4, 6, 9, 1, 3, 2, 8, 5)
+)
+
+# Fourth character of a PAN: holder type (person, company, HUF, firm, trust, ...)
+PAN_HOLDER_TYPES = frozenset("ABCFGHJLPT")
+
+# FieldSpec anchors
+DIGIT = "digit"
+WORD = "word"
+
+# Positions where any field can start (see FIELD_SPECS: \b-anchored, or ₹ for income)
+FIELD_STARTS = re.compile(r"\b|(?=₹)")
+
+INCOME_UNITS = {"lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "crore": 1e7, "crores": 1e7}
+
+
+def verhoeff_valid(digits: str) -> bool:
+    """True if the digit string (check digit last) passes the Verhoeff checksum."""
+    check = 0
+    for i, digit in enumerate(reversed(digits)):
+        check = VERHOEFF_MULTIPLY[check][VERHOEFF_PERMUTE[i % 8][int(digit)]]
+    return check == 0
+
+
+def _digits(match: re.Match, field: str) -> Optional[str]:
+    return re.sub(r'\D', '', match.group(f"{field}_v"))
+
+
+def _aadhaar(match: re.Match, field: str) -> Optional[str]:
+    digits = _digits(match, field)
+    return digits if verhoeff_valid(digits) else None
+
+
+def _pan(match: re.Match, field: str) -> Optional[str]:
+    value = match.group(field)
+    return value if value[3] in PAN_HOLDER_TYPES else None
+
+
+def _upper(match: re.Match, field: str) -> Optional[str]:
+    return match.group(f"{field}_v").upper()
+
+
+def _ration_card(match: re.Match, field: str) -> Optional[str]:
+    value = match.group(f"{field}_v").upper().rstrip('/-')
+    # Labels are often followed by a word ("Ration Card Holder"); real numbers have digits
+    return value if any(char.isdigit() for char in value) else None
+
+
+def _income(match: re.Match, field: str) -> Optional[float]:
+    amount = float(match.group(f"{field}_v").replace(',', ''))
+    unit = match.group(f"{field}_unit")
+    if unit:
+        amount *= INCOME_UNITS[unit.lower()]
+    return amount
+
+
+class FieldSpec(NamedTuple):
+    name: str
+    pattern: str  # May use the groups <name>_v (value) and <name>_unit
+    normalize: Callable[[re.Match, str], Optional[Union[str, float]]]
+    anchor: Optional[str] = WORD  # DIGIT / WORD: starts at a word boundary (with a digit); None: anywhere
+    value_span: bool = False      # Report the <name>_v span instead of the whole match (drops labels)
+
+
+# Within each anchor group, the first alternative that matches at a position wins
+FIELD_SPECS = (
+    FieldSpec("aadhaar", r"(?P<aadhaar_v>[2-9]\d{3}\s?\d{4}\s?\d{4})\b", _aadhaar, DIGIT),
+    FieldSpec("phone", r"(?P<phone_v>[6-9]\d{9})\b", _digits, DIGIT),
+    FieldSpec("pin_code", r"(?:(?i:pin\s*code|pincode|pin|postal\s*code)\s*[:#.-]?\s*|(?<=[-,])|(?<=[-,]\s))"
+                          r"(?P<pin_code_v>[1-9]\d{2}\s?\d{3})\b(?!\s?\d)", _digits, value_span=True),
+    FieldSpec("ration_card", r"(?i:ration\s*card)(?:\s*(?i:no|number|num)\.?)?\s*[:#-]?\s*"
+                             r"(?P<ration_card_v>[A-Za-z0-9][A-Za-z0-9/-]{5,19})", _ration_card, value_span=True),
+    FieldSpec("pan", r"[A-Z]{5}\d{4}[A-Z]\b", _pan),
+    FieldSpec("voter_id", r"(?P<voter_id_v>[A-Z]{3}\d{7})\b", _upper),
+    FieldSpec("ifsc", r"(?P<ifsc_v>[A-Z]{4}0[A-Z0-9]{6})\b", _upper),
+    FieldSpec("email", r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b", lambda match, field: match.group(field)),
+    FieldSpec("income", r"(?:\b(?i:rs|inr)\.?|₹)\s*(?P<income_v>(?:\d{1,3}(?:,\d{2,3})+|\d+)(?:\.\d{1,2})?)"
+                        r"(?:\s*/-)?(?:\s*(?P<income_unit>(?i:lakhs?|lacs?|crores?))\b)?", _income, None)
+)
+
+
+class FieldExtractor:
+    """
+    Single-pass extractor over a configurable set of fields.
+    Instances are immutable and safe to share between threads.
+    """
+
+    FIELDS = tuple(spec.name for spec in FIELD_SPECS)
+
+    def __init__(self, fields: Optional[Sequence[str]] = None):
+        """
+        Args:
+            fields: Field names to extract (default: all of FIELDS)
+
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        fields = self.FIELDS if fields is None else tuple(fields)
+        unknown = set(fields) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        self.specs = [spec for spec in FIELD_SPECS if spec.name in fields]
+        self.fields = tuple(spec.name for spec in self.specs)
+        self._normalizers = {spec.name: spec.normalize for spec in self.specs}
+        self._span_groups = {spec.name: f"{spec.name}_v" if spec.value_span else spec.name for spec in self.specs}
+        self.pattern = re.compile(self._combine(self.specs))
+        self._order = {name: i for i, name in enumerate(self.fields)}
+        # For each field, the alternatives the combined pattern had not yet tried when it
+        # matched that field, so overlapping fields at the same position are still found
+        alternation = [spec for anchor in (DIGIT, WORD, None) for spec in self.specs if spec.anchor == anchor]
+        self._later_patterns = {
+            spec.name: re.compile(self._combine(alternation[i + 1:])) if i + 1 < len(alternation) else None
+            for i, spec in enumerate(alternation)
+        }
+
+    @staticmethod
+    def _combine(specs: Sequence[FieldSpec]) -> str:
+        """
+        Build the combined pattern. Word-anchored fields share one leading \\b
+        and digit-anchored ones one (?=\\d), so most positions are rejected
+        after a single check instead of once per field.
+        """
+        def alternatives(anchor):
+            return "|".join(f"(?P<{spec.name}>{spec.pattern})" for spec in specs if spec.anchor == anchor)
+
+        digit, word, anywhere = alternatives(DIGIT), alternatives(WORD), alternatives(None)
+        anchored = "|".join(part for part in (f"(?=\\d)(?:{digit})" if digit else "", word) if part)
+        return "|".join(part for part in (f"\\b(?:{anchored})" if anchored else "", anywhere) if part)
+
+    def finditer(self, text: str) -> Iterator[FieldMatch]:
+        """
+        Yield validated fields in text order (ties in FIELDS order). The
+        matches are the same as one finditer per field: fields may overlap,
+        and matches of one field never do.
+        """
+        # Where each field's own scan would resume, as in a per-field finditer
+        resume = dict.fromkeys(self.fields, 0)
+        for match in self.pattern.finditer(text):
+            start, end = match.span()
+            found = []
+            self._match_at(text, start, match, resume, found)
+            # Every field starts at a word boundary or ₹, so only those positions
+            # inside the span can begin a field the combined match covered
+            for boundary in FIELD_STARTS.finditer(text, start + 1, end):
+                pos = boundary.start()
+                self._match_at(text, pos, self.pattern.match(text, pos), resume, found)
+            if len(found) > 1:
+                found.sort(key=lambda field_match: (field_match.start, self._order[field_match.field]))
+            yield from found
+
+    def _match_at(self, text: str, pos: int, match: Optional[re.Match], resume: Dict[str, int],
+                  found: List[FieldMatch]) -> None:
+        """Collect every field matching at pos, following the alternation order from match."""
+        while match is not None:
+            # The outer field group closes last, so lastgroup is the field name
+            field = match.lastgroup
+            if resume[field] <= pos:
+                resume[field] = match.end()
+                found.extend(self._validate(match, field))
+            later = self._later_patterns[field]
+            match = later.match(text, pos) if later is not None else None
+
+    def _validate(self, match: re.Match, field: str) -> List[FieldMatch]:
+        value = self._normalizers[field](match, field)
+        if value is None:
+            return []
+        group = self._span_groups[field]
+        return [FieldMatch(field, value, match.group(group), match.start(group), match.end(group))]
+
+    def extract(self, text: str) -> List[FieldMatch]:
+        return list(self.finditer(text))
+
+
+DEFAULT_EXTRACTOR = FieldExtractor()
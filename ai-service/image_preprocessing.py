@@ -0,0 +1,223 @@
+"""
+Image Preprocessing
+Shrinks and cleans up uploaded document photos before OCR.
+Tesseract time grows with pixel count, so most of the win comes from
+decoding JPEGs at reduced scale and downscaling to the resolution OCR needs.
+"""
+
+import io
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from PIL import Image, ImageOps
+
+
+# Long side of an A4 page in inches; used to turn a target DPI into pixels
+PAGE_LONG_SIDE_INCHES = 11.69
+
+ORIENTATION_TAG = 0x0112
+
+
+class PreprocessConfig(NamedTuple):
+    """Preprocessing options. The defaults are tuned for phone photos of ID cards and forms."""
+    enabled: bool = True
+    target_dpi: int = 300
+    grayscale: bool = True
+    binarize: bool = True
+    crop: bool = False
+
+    @property
+    def max_side(self) -> int:
+        """Longest image side (pixels) that still gives target_dpi on a full page."""
+        return int(self.target_dpi * PAGE_LONG_SIDE_INCHES)
+
+    def fingerprint(self) -> str:
+        """Short stable string identifying the settings (used in OCR cache keys)."""
+        if not self.enabled:
+            return "raw"
+        return f"dpi{self.target_dpi}-g{int(self.grayscale)}-b{int(self.binarize)}-c{int(self.crop)}"
+
+
+class ImagePreprocessor:
+    """
+    Preprocessing stages for document images.
+    Every stage is a static method so they can be benchmarked separately.
+    """
+
+    # Crop only when the detected page covers this share of the photo or more;
+    # smaller boxes are usually a logo or a bright patch, not the page
+    MIN_CROP_FRACTION = 0.2
+    CROP_DETECT_SIDE = 256
+    CROP_MARGIN = 0.01
+
+    @staticmethod
+    def decode(contents: bytes, config: PreprocessConfig) -> Image.Image:
+        """
+        Decode image bytes. JPEGs are decoded straight at a reduced scale
+        (1/2, 1/4 or 1/8) when the full resolution is more than OCR needs.
+        """
+        image = Image.open(io.BytesIO(contents))
+        if config.enabled and image.format == 'JPEG':
+            scale = config.max_side / max(image.size)
+            if scale < 1:
+                mode = 'L' if config.grayscale else 'RGB'
+                image.draft(mode, (int(image.size[0] * scale), int(image.size[1] * scale)))
+        image.load()
+        return image
+
+    @staticmethod
+    def orient(image: Image.Image) -> Image.Image:
+        """Apply the EXIF rotation phone cameras store instead of rotating pixels."""
+        if image.getexif().get(ORIENTATION_TAG, 1) == 1:
+            return image
+        return ImageOps.exif_transpose(image)
+
+    @staticmethod
+    def to_grayscale(image: Image.Image) -> Image.Image:
+        """Convert to 8-bit grayscale, flattening transparency onto white."""
+        if image.mode == 'L':
+            return image
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, rgba)
+        return image.convert('L')
+
+    @staticmethod
+    def downscale(image: Image.Image, max_side: int) -> Image.Image:
+        """Shrink so the longest side is at most max_side. Never upscales."""
+        scale = max_side / max(image.size)
+        if scale >= 1:
+            return image
+        size = (max(1, round(image.size[0] * scale)), max(1, round(image.size[1] * scale)))
+        # Pillow's bilinear resize filters over the whole source footprint, so it
+        # does not alias when shrinking; Lanczos costs ~2.5x for no OCR gain
+        return image.resize(size, Image.Resampling.BILINEAR, reducing_gap=3.0)
+
+    @staticmethod
+    def otsu_threshold(image: Image.Image) -> int:
+        """Otsu's threshold for a grayscale image, from its histogram."""
+        histogram = image.histogram()[:256]
+        total = sum(histogram)
+        weighted_total = sum(level * count for level, count in enumerate(histogram))
+
+        background_count = 0
+        background_sum = 0
+        best_threshold = 127
+        best_variance = -1.0
+        for level, count in enumerate(histogram):
+            background_count += count
+            if background_count == 0:
+                continue
+            foreground_count = total - background_count
+            if foreground_count == 0:
+                break
+            background_sum += level * count
+            background_mean = background_sum / background_count
+            foreground_mean = (weighted_total - background_sum) / foreground_count
+            variance = background_count * foreground_count * (background_mean - foreground_mean) ** 2
+            if variance > best_variance:
+                best_variance = variance
+                best_threshold = level
+        return best_threshold
+
+    @staticmethod
+    def binarize(image: Image.Image) -> Image.Image:
+        """Global Otsu binarization. Returns an 'L' image with only 0 and 255."""
+        image = ImagePreprocessor.to_grayscale(image)
+        threshold = ImagePreprocessor.otsu_threshold(image)
+        return image.point([0 if level <= threshold else 255 for level in range(256)])
+
+    @staticmethod
+    def find_document_box(image: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Locate a bright page on a darker background.
+
+        Returns:
+            (left, top, right, bottom) in image coordinates, or None when no
+            convincing page region is found
+        """
+        gray = ImagePreprocessor.to_grayscale(image)
+        small = gray.copy()
+        small.thumbnail((ImagePreprocessor.CROP_DETECT_SIDE, ImagePreprocessor.CROP_DETECT_SIDE))
+        threshold = ImagePreprocessor.otsu_threshold(small)
+        box = small.point([0 if level <= threshold else 255 for level in range(256)]).getbbox()
+        if box is None:
+            return None
+
+        box_area = (box[2] - box[0]) * (box[3] - box[1])
+        fraction = box_area / (small.size[0] * small.size[1])
+        if fraction < ImagePreprocessor.MIN_CROP_FRACTION or fraction > 0.98:
+            return None
+
+        scale_x = image.size[0] / small.size[0]
+        scale_y = image.size[1] / small.size[1]
+        margin_x = int(image.size[0] * ImagePreprocessor.CROP_MARGIN)
+        margin_y = int(image.size[1] * ImagePreprocessor.CROP_MARGIN)
+        return (
+            max(0, int(box[0] * scale_x) - margin_x),
+            max(0, int(box[1] * scale_y) - margin_y),
+            min(image.size[0], int(box[2] * scale_x) + margin_x),
+            min(image.size[1], int(box[3] * scale_y) + margin_y)
+        )
+
+    @staticmethod
+    def crop_document(image: Image.Image) -> Image.Image:
+        """Crop to the detected page, or return the image unchanged."""
+        box = ImagePreprocessor.find_document_box(image)
+        return image.crop(box) if box is not None else image
+
+
+def _timed(timings: Dict[str, float], stage: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings[stage] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def prepare_image(image: Image.Image, config: Optional[PreprocessConfig] = None,
+                  timings: Optional[Dict[str, float]] = None) -> Tuple[Image.Image, Dict[str, float]]:
+    """
+    Run the configured preprocessing stages on an already decoded image
+    (e.g. one page of a multi-page document).
+
+    Args:
+        image: Decoded image
+        config: Preprocessing options (defaults to PreprocessConfig())
+        timings: Dictionary to add stage timings to
+
+    Returns:
+        Tuple of (image ready for OCR, per-stage timings in milliseconds)
+    """
+    config = config or PreprocessConfig()
+    timings = {} if timings is None else timings
+    if not config.enabled:
+        return image, timings
+
+    image = _timed(timings, "orient", ImagePreprocessor.orient, image)
+    if config.grayscale or config.binarize:
+        image = _timed(timings, "grayscale", ImagePreprocessor.to_grayscale, image)
+    # Crop first so the target DPI applies to the page rather than the whole photo
+    if config.crop:
+        image = _timed(timings, "crop", ImagePreprocessor.crop_document, image)
+    image = _timed(timings, "downscale", ImagePreprocessor.downscale, image, config.max_side)
+    if config.binarize:
+        image = _timed(timings, "binarize", ImagePreprocessor.binarize, image)
+    return image, timings
+
+
+def preprocess_image(contents: bytes,
+                     config: Optional[PreprocessConfig] = None) -> Tuple[Image.Image, Dict[str, float]]:
+    """
+    Decode an uploaded document and run the configured preprocessing stages.
+
+    Args:
+        contents: Raw uploaded file bytes
+        config: Preprocessing options (defaults to PreprocessConfig())
+
+    Returns:
+        Tuple of (image ready for OCR, per-stage timings in milliseconds)
+    """
+    config = config or PreprocessConfig()
+    timings = {}
+    image = _timed(timings, "decode", ImagePreprocessor.decode, contents, config)
+    return prepare_image(image, config, timings)
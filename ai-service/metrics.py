@@ -0,0 +1,212 @@
+"""
+Metrics
+In-process counters and fixed-bucket latency histograms, rendered in the
+Prometheus text exposition format for the /metrics endpoint.
+Recording is a bisect and a few additions under a lock, cheap enough to
+leave on for every request.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+
+# Seconds; spans sub-millisecond scoring stages up to multi-second OCR
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values]
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time (queue depths, cache sizes, ...).
+    Also used for counters kept elsewhere (e.g. cache hits), with TYPE counter.
+    """
+
+    def __init__(self, name: str, help_text: str, collect: Callable[[], Union[float, Dict[Tuple, float]]],
+                 labels: Sequence[str] = (), metric_type: str = "gauge"):
+        """
+        Args:
+            name: Metric name
+            help_text: HELP line
+            collect: Returns the value, or {label values tuple: value} for labelled gauges
+            labels: Label names
+            metric_type: "gauge", or "counter" for monotonic values
+        """
+        self.name = name
+        self.help_text = help_text
+        self.collect = collect
+        self.labels = tuple(labels)
+        self.TYPE = metric_type
+
+    def samples(self) -> List[str]:
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels. Observations are in seconds."""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+
+        lines = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = _labels(self.labels, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, collect: Callable, labels: Sequence[str] = (),
+              metric_type: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, help_text, collect, labels, metric_type))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+def observe_stages(histogram: Histogram, timings: Dict[str, float], *label_values: str) -> None:
+    """Record a per-stage timings dictionary (milliseconds, as the pipelines report them)."""
+    for stage, milliseconds in timings.items():
+        histogram.observe(milliseconds / 1000, *label_values, stage)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them per route template
+    (e.g. /api/ocr/jobs/{job_id}), so IDs in paths do not create new series.
+    Streaming responses are timed until the last chunk is sent.
+    """
+
+    def __init__(self, app, requests: Counter, latency: Histogram):
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self._paths: Optional[Dict] = None
+
+    def _route_path(self, scope) -> str:
+        if self._paths is None:
+            # Endpoint -> path template; built on first use, once all routes are registered
+            self._paths = {getattr(route, 'endpoint', None): route.path for route in scope["app"].routes}
+        return self._paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            path = self._route_path(scope)
+            self.requests.inc(scope["method"], path, str(status))
+            self.latency.observe(time.perf_counter() - start, path)
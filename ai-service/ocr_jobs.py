@@ -0,0 +1,350 @@
+"""
+OCR Job Queue
+Persistent SQLite-backed queue for asynchronous OCR: submitting returns a
+job ID at once and clients poll (or long-poll) for the result.
+Jobs survive restarts; a job whose worker died is picked up again once its
+lease runs out.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+
+class RetryLater(Exception):
+    """Raised by a job's process function to return the job to the queue."""
+
+
+class WorkerCrashed(Exception):
+    """
+    Raised by a job's process function when the worker running the job died.
+    The job is retried, and the attempt counts towards max_attempts.
+    """
+
+
+class OCRJobStore:
+    """
+    Job table in a SQLite file. Several processes (uvicorn workers) can share
+    the same file: claiming is done in an IMMEDIATE transaction, so each job
+    is handed to one worker at a time.
+    """
+
+    def __init__(self, path: str, ttl: float = 3600, lease: float = 300, max_attempts: int = 3):
+        """
+        Args:
+            path: SQLite file
+            ttl: Seconds a finished job (and its result) is kept
+            lease: Seconds a claimed job may run before another worker may retry it
+            max_attempts: Claims before a job that keeps dying is marked failed
+        """
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily so importing the app does not create the file
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, payload BLOB,"
+                " result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+                " lease_expires_at REAL, expires_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ocr_jobs_status ON ocr_jobs (status, created_at)")
+            self._conn = conn
+        return self._conn
+
+    def submit(self, payload: bytes) -> str:
+        """Queue a document and return its job ID."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO ocr_jobs (id, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, payload, now, now)
+            )
+        return job_id
+
+    def submit_finished(self, result: Dict) -> str:
+        """Record a job that is already done (e.g. served from the OCR cache)."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO ocr_jobs (id, status, result, created_at, updated_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, DONE, json.dumps(result, ensure_ascii=False), now, now, now + self.ttl)
+            )
+        return job_id
+
+    def claim(self) -> Optional[Tuple[str, bytes]]:
+        """
+        Take the oldest queued job, or a running job whose lease expired
+        (its worker crashed or was restarted).
+
+        Returns:
+            (job_id, payload), or None if nothing is waiting
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._next_claimable(conn, now)
+                while row is not None and row[2] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE ocr_jobs SET status = ?, payload = NULL, error = ?,"
+                        " updated_at = ?, expires_at = ? WHERE id = ?",
+                        (FAILED, f"OCR worker stopped {row[2]} times while processing this job",
+                         now, now + self.ttl, row[0])
+                    )
+                    row = self._next_claimable(conn, now)
+                if row is not None:
+                    conn.execute(
+                        "UPDATE ocr_jobs SET status = ?, attempts = attempts + 1,"
+                        " updated_at = ?, lease_expires_at = ? WHERE id = ?",
+                        (RUNNING, now, now + self.lease, row[0])
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return (row[0], row[1]) if row is not None else None
+
+    @staticmethod
+    def _next_claimable(conn: sqlite3.Connection, now: float) -> Optional[Tuple[str, bytes, int]]:
+        return conn.execute(
+            "SELECT id, payload, attempts FROM ocr_jobs"
+            " WHERE status = ? OR (status = ? AND lease_expires_at <= ?)"
+            " ORDER BY created_at LIMIT 1",
+            (QUEUED, RUNNING, now)
+        ).fetchone()
+
+    def requeue(self, job_id: str, count_attempt: bool = False) -> None:
+        """
+        Put a claimed job back in the queue.
+
+        Args:
+            job_id: Claimed job
+            count_attempt: Keep the attempt (the worker crashed) instead of
+                undoing it (e.g. OCR pool full). The next claim fails the
+                job once it has used max_attempts.
+        """
+        with self._lock:
+            self._connection().execute(
+                "UPDATE ocr_jobs SET status = ?, attempts = attempts - ?, updated_at = ?,"
+                " lease_expires_at = NULL WHERE id = ? AND status = ?",
+                (QUEUED, 0 if count_attempt else 1, time.time(), job_id, RUNNING)
+            )
+
+    def complete(self, job_id: str, result: Dict) -> None:
+        self._finish(job_id, DONE, json.dumps(result, ensure_ascii=False), None)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, FAILED, None, error)
+
+    def _finish(self, job_id: str, status: str, result: Optional[str], error: Optional[str]) -> None:
+        now = time.time()
+        with self._lock:
+            # The payload is dropped once the job is finished
+            self._connection().execute(
+                "UPDATE ocr_jobs SET status = ?, payload = NULL, result = ?, error = ?,"
+                " updated_at = ?, lease_expires_at = NULL, expires_at = ? WHERE id = ?",
+                (status, result, error, now, now + self.ttl, job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Public view of a job.
+
+        Returns:
+            Dictionary with jobId, status, attempts and data/error once
+            finished, or None for unknown or expired jobs
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT status, result, error, attempts, created_at, updated_at, expires_at"
+                " FROM ocr_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, result, error, attempts, created_at, updated_at, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+
+        job = {
+            "jobId": job_id,
+            "status": status,
+            "attempts": attempts,
+            "createdAt": created_at,
+            "updatedAt": updated_at
+        }
+        if status == DONE:
+            job["data"] = json.loads(result)
+        elif status == FAILED:
+            job["error"] = error
+        return job
+
+    def cleanup(self) -> int:
+        """Delete finished jobs past their TTL. Returns the number removed."""
+        with self._lock:
+            return self._connection().execute(
+                "DELETE FROM ocr_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._connection().execute("SELECT status, COUNT(*) FROM ocr_jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class OCRJobRunner:
+    """
+    Runs queued jobs with at most `concurrency` in progress in this process.
+    Idle workers wake on local submissions and otherwise poll the store, so
+    jobs submitted by other processes or recovered after a crash are also
+    picked up.
+    """
+
+    POLL_INTERVAL = 1.0
+    CLEANUP_INTERVAL = 60.0
+
+    def __init__(self, store: OCRJobStore, process: Callable[[bytes], Awaitable[Dict]], concurrency: int = 2):
+        """
+        Args:
+            store: Job store
+            process: Coroutine function turning a payload into a result.
+                It may raise RetryLater to put the job back in the queue, or
+                WorkerCrashed to retry it up to the store's max_attempts.
+                Any other error fails the job.
+            concurrency: Jobs processed at once by this runner
+        """
+        self.store = store
+        self.process = process
+        self.concurrency = max(1, concurrency)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._finished: Optional[asyncio.Condition] = None
+        self._tasks = []
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._finished = asyncio.Condition()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.ensure_future(self._cleanup()))
+
+    async def stop(self) -> None:
+        """Stop taking jobs. Jobs in progress keep their lease and are retried later."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake an idle worker (call after submitting a job)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                await self._run_next()
+            except sqlite3.Error as e:
+                # e.g. "database is locked"; a claimed job keeps its lease and is retried later
+                logger.warning("OCR job store error: %s", e)
+                await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def _run_next(self) -> None:
+        """Claim and process one job, or wait for one if the queue is empty."""
+        claimed = await run_in_threadpool(self.store.claim)
+        if claimed is None:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        job_id, payload = claimed
+        try:
+            result = await self.process(payload)
+        except RetryLater:
+            await run_in_threadpool(self.store.requeue, job_id)
+            await asyncio.sleep(self.POLL_INTERVAL)
+            return
+        except WorkerCrashed as e:
+            logger.warning("OCR job %s lost its worker, retrying: %s", job_id, e)
+            await run_in_threadpool(self.store.requeue, job_id, True)
+            await asyncio.sleep(self.POLL_INTERVAL)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("OCR job %s failed: %s", job_id, e)
+            await run_in_threadpool(self.store.fail, job_id, f"OCR processing failed: {str(e)}")
+        else:
+            await run_in_threadpool(self.store.complete, job_id, result)
+
+        async with self._finished:
+            self._finished.notify_all()
+
+    async def _cleanup(self) -> None:
+        while True:
+            try:
+                removed = await run_in_threadpool(self.store.cleanup)
+                if removed:
+                    logger.info("Removed %d expired OCR jobs", removed)
+            except sqlite3.Error as e:
+                logger.warning("OCR job cleanup failed: %s", e)
+            await asyncio.sleep(self.CLEANUP_INTERVAL)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """
+        Long-poll: return the job once it is finished or the timeout passes.
+        Wakes immediately for jobs finished in this process and polls for
+        jobs finished elsewhere.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await run_in_threadpool(self.store.get, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED_STATES or remaining <= 0:
+                return job
+            if self._finished is None:
+                await asyncio.sleep(min(remaining, self.POLL_INTERVAL))
+                continue
+            try:
+                async with self._finished:
+                    await asyncio.wait_for(self._finished.wait(), min(remaining, self.POLL_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
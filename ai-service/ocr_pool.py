@@ -0,0 +1,92 @@
+"""
+OCR Worker Pool
+Runs OCR in a dedicated process pool with a bounded queue so OCR bursts
+cannot block the event loop or starve the eligibility endpoints
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+
+class OCRQueueFull(Exception):
+    """Raised when the OCR pool already has max_pending jobs queued or running."""
+
+
+class OCRWorkerPool:
+    """
+    Bounded front for a ProcessPoolExecutor.
+    At most max_workers jobs run at once and at most max_pending are
+    admitted in total (running + waiting); further submissions are
+    rejected immediately instead of queueing without limit.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the app does not fork workers
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run func(*args) in a worker process. The job counts as pending until
+        it finishes in the worker, even if the caller stops waiting for it.
+
+        Raises:
+            OCRQueueFull: If max_pending jobs are already admitted
+        """
+        with self._pending_lock:
+            if self.pending >= self.max_pending:
+                raise OCRQueueFull(f"OCR queue is full ({self.max_pending} pending)")
+            self.pending += 1
+
+        try:
+            executor = self._get_executor()
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._job_done(None)
+            self._reset_executor(executor)
+            raise
+        except BaseException:
+            self._job_done(None)
+            raise
+        # Called from the executor's thread once the job has really ended
+        # (or was cancelled before it started)
+        future.add_done_callback(self._job_done)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge image); start fresh next time
+            self._reset_executor(executor)
+            raise
+
+    def _job_done(self, future: Optional[Future]) -> None:
+        with self._pending_lock:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
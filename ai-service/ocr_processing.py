@@ -0,0 +1,188 @@
+"""
+OCR Processing
+Document decoding, Tesseract OCR and field extraction.
+Functions here run inside OCR worker processes, so they must stay picklable.
+"""
+
+import io
+import time
+from typing import Dict, List, Optional, Tuple, Union
+import pytesseract
+from PIL import Image
+from image_preprocessing import PreprocessConfig, prepare_image, preprocess_image
+from field_extractor import DEFAULT_EXTRACTOR, FieldExtractor
+
+try:
+    import pdf2image
+except ImportError:  # PDF scans need pdf2image + poppler; images work without them
+    pdf2image = None
+
+
+# Fields merged across pages of a multi-page document
+LIST_FIELDS = FieldExtractor.FIELDS
+
+# Fields returned before the single-pass extractor; their lists keep the
+# matched text (e.g. Aadhaar "1234 5678 9012", not digits only)
+LEGACY_FIELDS = ("email", "phone", "aadhaar", "pan")
+
+# Render PDFs at this DPI when preprocessing is disabled
+DEFAULT_PDF_DPI = 200
+
+
+class UnsupportedDocument(ValueError):
+    """Raised for uploads that cannot be split into pages."""
+
+
+def extract_fields(text: str) -> Dict:
+    """
+    Extract structured fields from OCR text in a single pass
+    (see field_extractor.FieldExtractor).
+
+    Args:
+        text: Raw OCR output
+
+    Returns:
+        Dictionary with raw_text, one list per field (matched text for
+        LEGACY_FIELDS, normalized values for voter_id, ration_card, ifsc,
+        pin_code and income) and "fields": every match with its normalized
+        value, matched text and character offsets
+    """
+    extracted = {"raw_text": text}
+    for field in DEFAULT_EXTRACTOR.fields:
+        extracted[field] = []
+    matches = []
+    for match in DEFAULT_EXTRACTOR.finditer(text):
+        extracted[match.field].append(match.text if match.field in LEGACY_FIELDS else match.value)
+        matches.append(match._asdict())
+    extracted["fields"] = matches
+    return extracted
+
+
+def run_ocr(contents: bytes, config: Optional[PreprocessConfig] = None) -> Tuple[Dict, Dict[str, float]]:
+    """
+    Preprocess an uploaded image, run OCR and extract fields.
+
+    Args:
+        contents: Raw uploaded file bytes
+        config: Preprocessing options (defaults to PreprocessConfig())
+
+    Returns:
+        Tuple of (extracted data, per-stage timings in milliseconds)
+    """
+    image, timings = preprocess_image(contents, config)
+
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(image)
+    timings["ocr"] = round((time.perf_counter() - start) * 1000, 3)
+
+    start = time.perf_counter()
+    extracted_data = extract_fields(text)
+    timings["extract"] = round((time.perf_counter() - start) * 1000, 3)
+    return extracted_data, timings
+
+
+def is_pdf(contents: bytes) -> bool:
+    return contents[:5] == b'%PDF-'
+
+
+def count_pages(contents: bytes) -> int:
+    """
+    Number of pages in an uploaded document (frames of a multi-page TIFF/GIF
+    or pages of a PDF; 1 for ordinary images).
+
+    Raises:
+        UnsupportedDocument: If the upload is a PDF and pdf2image is missing,
+            or the bytes are not a readable image
+    """
+    if is_pdf(contents):
+        if pdf2image is None:
+            raise UnsupportedDocument("PDF support requires the pdf2image package and poppler")
+        return int(pdf2image.pdfinfo_from_bytes(contents)["Pages"])
+    try:
+        with Image.open(io.BytesIO(contents)) as image:
+            return getattr(image, "n_frames", 1)
+    except (OSError, SyntaxError) as e:
+        raise UnsupportedDocument(f"Unreadable document: {e}")
+
+
+def load_page(contents: bytes, page: int, config: PreprocessConfig) -> Image.Image:
+    """
+    Decode one page (0-based) of a document. PDF pages are rendered straight
+    at the preprocessing target DPI.
+    """
+    if is_pdf(contents):
+        if pdf2image is None:
+            raise UnsupportedDocument("PDF support requires the pdf2image package and poppler")
+        dpi = config.target_dpi if config.enabled else DEFAULT_PDF_DPI
+        return pdf2image.convert_from_bytes(contents, dpi=dpi, first_page=page + 1, last_page=page + 1)[0]
+    image = Image.open(io.BytesIO(contents))
+    image.seek(page)
+    # Copy the frame so it no longer depends on the multi-frame file
+    return image.copy()
+
+
+def run_ocr_page(contents: Union[bytes, str], page: int,
+                 config: Optional[PreprocessConfig] = None) -> Tuple[Dict, Dict[str, float]]:
+    """
+    Decode, preprocess and OCR one page of a multi-page document.
+
+    Args:
+        contents: Raw uploaded file bytes, or the path of a file holding
+            them (saves sending the whole document to a worker per page)
+        page: 0-based page number
+        config: Preprocessing options (defaults to PreprocessConfig())
+
+    Returns:
+        Tuple of (extracted data for the page, per-stage timings in milliseconds)
+    """
+    config = config or PreprocessConfig()
+    timings = {}
+
+    start = time.perf_counter()
+    if isinstance(contents, str):
+        with open(contents, 'rb') as f:
+            contents = f.read()
+    image = load_page(contents, page, config)
+    timings["decode"] = round((time.perf_counter() - start) * 1000, 3)
+
+    image, timings = prepare_image(image, config, timings)
+
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(image)
+    timings["ocr"] = round((time.perf_counter() - start) * 1000, 3)
+
+    start = time.perf_counter()
+    extracted_data = extract_fields(text)
+    timings["extract"] = round((time.perf_counter() - start) * 1000, 3)
+    return extracted_data, timings
+
+
+def merge_page_fields(pages: List[Optional[Dict]]) -> Dict:
+    """
+    Merge per-page extractions into one document result.
+
+    Args:
+        pages: Extracted data per page in page order (None for failed pages)
+
+    Returns:
+        raw_text joined with form feeds, each field list de-duplicated in
+        first-seen order (values compared without spaces) and "fields" with
+        the 1-based page number added to every match
+    """
+    merged = {"raw_text": "\f".join(page["raw_text"] if page else "" for page in pages)}
+    for field in LIST_FIELDS:
+        seen = set()
+        values = []
+        for page in pages:
+            for value in (page or {}).get(field, []):
+                key = str(value).replace(" ", "")
+                if key not in seen:
+                    seen.add(key)
+                    values.append(value)
+        merged[field] = values
+    merged["fields"] = [
+        {**match, "page": number}
+        for number, page in enumerate(pages, 1)
+        for match in (page or {}).get("fields", [])
+    ]
+    return merged
@@ -0,0 +1,145 @@
+"""
+Request Profiling
+Opt-in cProfile capture of live requests. Requests are picked by a sampling
+rate or an explicit request header; each profiled request writes one pstats
+file to a local directory, and only the newest few are kept.
+Open a downloaded file with `python -m pstats FILE` or snakeviz.
+"""
+
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+PROFILE_SUFFIX = ".pstats"
+
+# Names handed out by profile_path(); anything else is refused on download
+PROFILE_NAME = re.compile(r"^\d{8}-\d{6}-[a-z0-9-]+-\d+-\d+\.pstats$")
+
+
+def run_profiled(path: str, func: Callable, *args):
+    """
+    Run func under cProfile and write the stats to path. Module-level so it
+    can be sent to a process pool (e.g. to profile OCR in the pool worker).
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args)
+    finally:
+        tmp_path = f"{path}.tmp"
+        profiler.dump_stats(tmp_path)
+        os.replace(tmp_path, path)
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and manages the profile directory.
+    At most one request per process is profiled in-process at a time
+    (cProfile is process-wide on newer Pythons); others run unprofiled.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 0.0, keep: int = 50):
+        """
+        Args:
+            directory: Where pstats files are written (created on first use)
+            sample_rate: Share of requests profiled without being asked (0 to 1)
+            keep: Number of most recent profiles kept
+        """
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._active = threading.Lock()
+        self._sequence = 0
+        self._sequence_lock = threading.Lock()
+
+    def set_sample_rate(self, rate: float) -> None:
+        """
+        Raises:
+            ValueError: If rate is not between 0 and 1
+        """
+        if not 0 <= rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+        self.sample_rate = rate
+
+    def sample(self) -> bool:
+        """Whether a request not explicitly asking for a profile should be profiled."""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def profile_path(self, label: str) -> str:
+        """New file path for a profile of the given endpoint label (e.g. "ocr")."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._sequence_lock:
+            self._sequence += 1
+            sequence = self._sequence
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{os.getpid()}-{sequence}{PROFILE_SUFFIX}"
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[Optional[str]]:
+        """
+        Profile the enclosed block in this thread.
+
+        Yields:
+            Name of the profile being written, or None if another profile is
+            already running in this process (the block then runs unprofiled)
+        """
+        if not self._active.acquire(blocking=False):
+            yield None
+            return
+        try:
+            path = self.profile_path(label)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield os.path.basename(path)
+            finally:
+                profiler.disable()
+                tmp_path = f"{path}.tmp"
+                profiler.dump_stats(tmp_path)
+                os.replace(tmp_path, path)
+        finally:
+            self._active.release()
+        self.trim()
+
+    def trim(self) -> None:
+        """Delete the oldest profiles beyond `keep`."""
+        for profile in self.list()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, profile["name"]))
+            except OSError:
+                pass
+
+    def list(self) -> List[Dict]:
+        """Profiles on disk, newest first."""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and PROFILE_NAME.match(entry.name)]
+        except FileNotFoundError:
+            return []
+
+        profiles = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            profiles.append({
+                "name": entry.name,
+                "endpoint": entry.name.split("-", 2)[2].rsplit("-", 2)[0],
+                "size": stat.st_size,
+                "createdAt": stat.st_mtime
+            })
+        profiles.sort(key=lambda profile: (profile["createdAt"], profile["name"]), reverse=True)
+        return profiles
+
+    def path(self, name: str) -> Optional[str]:
+        """Full path of a listed profile, or None for unknown (or unsafe) names."""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
@@ -3,7 +3,8 @@ Recommendation Engine for Welfare Schemes
 Ranks and recommends schemes based on probability scores and user needs
 """
 
-from typing import List, Dict, Tuple
+import heapq
+from typing import Any, List, Dict, Tuple
 from statistical_engine import StatisticalEngine
 from scheme_profiles import SchemeProfiles
 
@@ -14,6 +15,11 @@ class RecommendationEngine:
     with scheme impact and user vulnerability assessment.
     """
     
+    MIN_RECOMMENDATION_SCORE = 50
+    HIGH_PRIORITY_SCORE = 80
+    MAX_RECOMMENDATIONS = 10
+    SUMMARY_SCHEME_COUNT = 5
+    
     @staticmethod
     def calculate_recommendation_score(probability: float, 
                                        scheme_category: str,
@@ -98,10 +104,45 @@ class RecommendationEngine:
         Returns:
             User profile summary dictionary
         """
+        return RecommendationEngine._build_profile_summary(
+            user_data,
+            vulnerability_index,
+            [scheme['category'] for scheme in eligible_schemes[:RecommendationEngine.SUMMARY_SCHEME_COUNT]],
+            len(eligible_schemes),
+            len([s for s in eligible_schemes
+                 if s.get('recommendationScore', 0) >= RecommendationEngine.HIGH_PRIORITY_SCORE])
+        )
+    
+    @staticmethod
+    def summarize_ranking(user_data: Dict, vulnerability_index: float,
+                          ranker: 'TopKRanker') -> Dict:
+        """
+        Generate the user profile summary from a TopKRanker's streaming counters,
+        without needing the full ranked list of eligible schemes.
+        
+        Args:
+            user_data: User information
+            vulnerability_index: Calculated vulnerability index
+            ranker: Ranker that has seen every eligible scheme
+            
+        Returns:
+            User profile summary dictionary
+        """
+        return RecommendationEngine._build_profile_summary(
+            user_data,
+            vulnerability_index,
+            ranker.leading_categories(),
+            ranker.total_count,
+            ranker.high_priority_count
+        )
+    
+    @staticmethod
+    def _build_profile_summary(user_data: Dict, vulnerability_index: float,
+                               leading_categories: List[str], total_eligible: int,
+                               high_priority: int) -> Dict:
         # Analyze which categories are most relevant
         category_counts = {}
-        for scheme in eligible_schemes[:5]:  # Top 5 schemes
-            cat = scheme['category']
+        for cat in leading_categories:  # Top 5 schemes
             category_counts[cat] = category_counts.get(cat, 0) + 1
         
         # Sort categories by frequency
@@ -133,9 +174,8 @@ class RecommendationEngine:
             "incomeCategory": income_category,
             "priorityCategories": priority_categories,
             "recommendedFocus": focus,
-            "totalEligibleSchemes": len(eligible_schemes),
-            "highPrioritySchemes": len([s for s in eligible_schemes 
-                                       if s.get('recommendationScore', 0) >= 80])
+            "totalEligibleSchemes": total_eligible,
+            "highPrioritySchemes": high_priority
         }
     
     @staticmethod
@@ -183,7 +223,8 @@ class RecommendationEngine:
         return ". ".join(reasons[:3])  # Max 3 reasons
     
     @staticmethod
-    def filter_top_recommendations(schemes: List[Dict], max_count: int = 10) -> List[Dict]:
+    def filter_top_recommendations(schemes: List[Dict],
+                                   max_count: int = MAX_RECOMMENDATIONS) -> List[Dict]:
         """
         Filter to return only top N recommendations with minimum threshold.
         
@@ -195,7 +236,61 @@ class RecommendationEngine:
             Filtered list of top recommendations
         """
         # Filter schemes with recommendation score >= 50
-        quality_schemes = [s for s in schemes if s.get('recommendationScore', 0) >= 50]
+        quality_schemes = [s for s in schemes
+                           if s.get('recommendationScore', 0) >= RecommendationEngine.MIN_RECOMMENDATION_SCORE]
         
         # Return top N
         return quality_schemes[:max_count]
+
+
+class TopKRanker:
+    """
+    Streaming ranker that keeps only the top K schemes above a score threshold.
+    Produces the same order as rank_schemes + filter_top_recommendations
+    (score descending, ties in arrival order) while counting every scheme seen,
+    so callers only build full responses for schemes that are returned.
+    """
+    
+    def __init__(self, max_count: int = RecommendationEngine.MAX_RECOMMENDATIONS,
+                 min_score: float = RecommendationEngine.MIN_RECOMMENDATION_SCORE,
+                 summary_count: int = RecommendationEngine.SUMMARY_SCHEME_COUNT):
+        self.max_count = max_count
+        self.min_score = min_score
+        self.summary_count = summary_count
+        self.total_count = 0
+        self.high_priority_count = 0
+        self._top = []       # min-heap of (score, -sequence, item)
+        self._leading = []   # min-heap of (score, -sequence, category)
+    
+    def push(self, score: float, category: str, item: Any) -> None:
+        """
+        Offer a scored scheme to the ranker.
+        
+        Args:
+            score: Recommendation score
+            category: Scheme category (used for the profile summary)
+            item: Caller payload returned by results() if the scheme is kept
+        """
+        sequence = -self.total_count
+        self.total_count += 1
+        if score >= RecommendationEngine.HIGH_PRIORITY_SCORE:
+            self.high_priority_count += 1
+        
+        TopKRanker._bounded_push(self._leading, self.summary_count, (score, sequence, category))
+        if score >= self.min_score:
+            TopKRanker._bounded_push(self._top, self.max_count, (score, sequence, item))
+    
+    @staticmethod
+    def _bounded_push(heap: List, capacity: int, entry: Tuple) -> None:
+        if len(heap) < capacity:
+            heapq.heappush(heap, entry)
+        elif capacity > 0 and entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    
+    def results(self) -> List[Tuple[float, Any]]:
+        """Kept (score, item) pairs, best first."""
+        return [(score, item) for score, _, item in sorted(self._top, key=lambda e: e[:2], reverse=True)]
+    
+    def leading_categories(self) -> List[str]:
+        """Categories of the top summary_count schemes regardless of threshold, best first."""
+        return [category for _, _, category in sorted(self._leading, key=lambda e: e[:2], reverse=True)]
@@ -0,0 +1,206 @@
+"""
+Record Streams
+Incremental JSON-array / NDJSON decoding and NDJSON encoding for batch endpoints and tools
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List
+from starlette.responses import StreamingResponse
+
+
+class RecordStreamError(ValueError):
+    """Raised when a record stream is malformed beyond recovery."""
+
+
+class InvalidRecord:
+    """Placeholder for a single NDJSON line that could not be parsed."""
+
+    __slots__ = ('message',)
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def decode_ndjson_line(line: str) -> Any:
+    """Decode one non-blank NDJSON line (InvalidRecord if it is not valid JSON)."""
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return InvalidRecord(f"Invalid JSON: {e}")
+
+
+class JSONRecordDecoder:
+    """
+    Incremental decoder for a body that is either a JSON array of records
+    or newline-delimited JSON. The format is detected from the first
+    non-whitespace character. Only one partial record is buffered at a time.
+    """
+
+    MAX_RECORD_CHARS = 64 * 1024
+    WHITESPACE = ' \t\r\n'
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._mode = None          # 'array' or 'ndjson'
+        self._expect_value = True  # array mode: value next (else ',' or ']')
+        self._array_started = False
+        self._array_closed = False
+        self._element_count = 0
+        self._error = None         # deferred so records decoded before it are not lost
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Decode the next chunk of the body.
+
+        Args:
+            data: Raw bytes (may split records or UTF-8 sequences anywhere)
+
+        Returns:
+            Records completed by this chunk (InvalidRecord for bad NDJSON lines)
+        """
+        self._buffer += self._utf8.decode(data)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """Flush the remaining buffer at end of input."""
+        self._buffer += self._utf8.decode(b'', final=True)
+        records = self._drain(final=True)
+        if self._mode == 'array' and not self._array_closed:
+            raise RecordStreamError("Unterminated JSON array")
+        return records
+
+    def _drain(self, final: bool) -> List[Any]:
+        if self._error is not None:
+            raise self._error
+        if self._mode is None:
+            stripped = self._buffer.lstrip(self.WHITESPACE)
+            if not stripped:
+                return []
+            self._mode = 'array' if stripped[0] == '[' else 'ndjson'
+            self._buffer = stripped
+
+        if self._mode == 'ndjson':
+            return self._drain_ndjson(final)
+        return self._drain_array(final)
+
+    def _drain_ndjson(self, final: bool) -> List[Any]:
+        lines = self._buffer.split('\n')
+        self._buffer = '' if final else lines.pop()
+        if len(self._buffer) > self.MAX_RECORD_CHARS:
+            raise RecordStreamError(f"Record exceeds {self.MAX_RECORD_CHARS} characters")
+
+        return [decode_ndjson_line(line) for line in lines if line.strip()]
+
+    def _drain_array(self, final: bool) -> List[Any]:
+        records = []
+        try:
+            self._scan_array(records, final)
+        except RecordStreamError as e:
+            if not records:
+                raise
+            self._error = e
+        return records
+
+    def _scan_array(self, records: List[Any], final: bool) -> None:
+        buffer = self._buffer
+        pos = 0
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in self.WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+
+            if self._array_closed:
+                raise RecordStreamError("Unexpected data after JSON array")
+
+            char = buffer[pos]
+            if not self._array_started:
+                self._array_started = True
+                pos += 1
+                continue
+
+            if self._expect_value:
+                if char == ']' and self._element_count == 0:
+                    self._array_closed = True
+                    pos += 1
+                    continue
+                try:
+                    record, end = self._json.raw_decode(buffer, pos)
+                except ValueError as e:
+                    if final:
+                        raise RecordStreamError(f"Invalid JSON array element: {e}")
+                    if len(buffer) - pos > self.MAX_RECORD_CHARS:
+                        raise RecordStreamError(f"Record exceeds {self.MAX_RECORD_CHARS} characters")
+                    break
+                # A scalar at the very end of the buffer may be cut short (e.g. a number)
+                if end == len(buffer) and not final and not isinstance(record, (dict, list, str)):
+                    break
+                records.append(record)
+                self._element_count += 1
+                self._expect_value = False
+                pos = end
+            else:
+                if char == ',':
+                    self._expect_value = True
+                elif char == ']':
+                    self._array_closed = True
+                else:
+                    raise RecordStreamError(f"Expected ',' or ']' in JSON array, found {char!r}")
+                pos += 1
+
+        self._buffer = buffer[pos:]
+
+
+async def aiter_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield records from an async byte stream (e.g. Request.stream())."""
+    decoder = JSONRecordDecoder()
+    async for chunk in chunks:
+        for record in decoder.feed(chunk):
+            yield record
+    for record in decoder.close():
+        yield record
+
+
+def iter_records(stream: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Yield records from a binary file object."""
+    decoder = JSONRecordDecoder()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+def encode_json(record: Any) -> bytes:
+    """Encode a record as compact UTF-8 JSON."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def encode_members(record: Dict) -> bytes:
+    """Encode a dictionary's members without the enclosing braces, for splicing into a larger object."""
+    return encode_json(record)[1:-1]
+
+
+def encode_ndjson(record: Any) -> bytes:
+    """Encode one record as a compact NDJSON line."""
+    return encode_json(record) + b'\n'
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming NDJSON response that can be sent while the request body is
+    still being read. The base class listens for disconnects on receive(),
+    which would consume request body chunks on older ASGI servers.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,165 @@
+"""
+Materialized Response Table
+Precomputes candidate schemes for the whole discrete profile space
+(age x category x gender x income bucket) so requests start from a lookup
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from statistical_engine import StatisticalEngine
+from scheme_kernels import MAX_TABLE_AGE, SchemeKernelSet
+from eligibility_index import EligibilityIndex
+
+
+class ResponseTable:
+    """
+    Dense table indexed by (age, category, gender, income bucket).
+
+    Income buckets are split at every scheme's max_income, so the hard
+    eligibility filters are constant inside a bucket. Each cell holds the
+    candidate scheme IDs (catalog order) that pass those filters and can
+    still reach the probability threshold somewhere in the bucket. The
+    within-bucket income effect is applied exactly at request time by
+    re-scoring just those candidates.
+
+    Build cost grows with cells x catalog size, so this is meant for
+    catalogs with a moderate number of distinct income limits.
+    """
+
+    GENDERS = (None, 'Male', 'Female', 'Other')
+
+    # Refuse to build tables that would not fit comfortably in memory
+    MAX_CELLS = 1_000_000
+
+    def __init__(self, kernels: SchemeKernelSet, index: EligibilityIndex,
+                 min_probability: float, tolerance: float = 1e-9,
+                 tables: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            kernels: Compiled scheme kernels
+            index: Eligibility index over the same catalog
+            min_probability: Probability threshold candidates must be able to reach
+            tolerance: Slack on the threshold for float rounding
+            tables: Arrays from tables() of a table built earlier with the same
+                arguments (e.g. memory-mapped from a shared catalog); used
+                instead of building the table
+
+        Raises:
+            ValueError: If the table would be too large, or tables do not fit the catalog
+        """
+        self.index = index
+        self.category_keys = {name: i for i, name in enumerate(kernels.category_codes)}
+        gender_names = list(self.GENDERS) + [g for g in index.gender_masks if g not in self.GENDERS]
+        self.gender_keys = {name: i for i, name in enumerate(gender_names)}
+        self.income_bounds = sorted({kernel.max_income for kernel in kernels})
+
+        shape = (MAX_TABLE_AGE + 1, len(self.category_keys), len(self.gender_keys), len(self.income_bounds) + 1)
+        cells = int(np.prod(shape))
+        if cells > self.MAX_CELLS:
+            raise ValueError(f"Response table would need {cells} cells (limit {self.MAX_CELLS})")
+
+        if tables is not None:
+            if tables['response_cells'].shape != shape:
+                raise ValueError("Response table arrays do not match the catalog")
+            self.cells = tables['response_cells']
+            self.candidate_sets = CandidateSets(tables['response_offsets'], tables['response_ids'])
+            return
+
+        # Cells point into a list of interned candidate tuples
+        self.cells = np.zeros(shape, dtype=np.int32)
+        self.candidate_sets: List[Tuple[int, ...]] = []
+        interned: Dict[Tuple[int, ...], int] = {}
+
+        # Best-case income probability per (bucket, scheme): the lowest income in the bucket
+        income_upper = [
+            [self._income_upper_bound(kernel, bucket) for kernel in kernels]
+            for bucket in range(len(self.income_bounds) + 1)
+        ]
+
+        age_masks = [
+            index.min_age_index.at_most(age) & index.max_age_index.at_least(age)
+            for age in range(MAX_TABLE_AGE + 1)
+        ]
+        income_masks = [index.max_income_index.at_least(bound) for bound in self.income_bounds] + [0]
+
+        for category, c in self.category_keys.items():
+            category_code = kernels.encode_category(category)
+            universal = kernels.get_universal_probability(category_code)
+            for gender, g in self.gender_keys.items():
+                gender_code = kernels.encode_gender(gender)
+                base_mask = index.all_categories_mask | index.category_masks.get(category, 0)
+                base_mask &= index.all_states_mask
+                if gender:
+                    base_mask &= index.no_gender_mask | index.gender_masks.get(gender, 0)
+
+                for age in range(MAX_TABLE_AGE + 1):
+                    age_mask = base_mask & age_masks[age]
+                    for bucket, income_mask in enumerate(income_masks):
+                        candidates = tuple(
+                            scheme_id for scheme_id in EligibilityIndex.mask_to_ids(age_mask & income_mask)
+                            if StatisticalEngine.combine_factors(
+                                kernels[scheme_id].age_probability(age),
+                                income_upper[bucket][scheme_id],
+                                kernels[scheme_id].category_probability(category_code, universal),
+                                kernels[scheme_id].gender_probability(gender_code)
+                            ) >= min_probability - tolerance
+                        )
+                        if candidates not in interned:
+                            interned[candidates] = len(self.candidate_sets)
+                            self.candidate_sets.append(candidates)
+                        self.cells[age, c, g, bucket] = interned[candidates]
+
+    def tables(self) -> Dict[str, np.ndarray]:
+        """The cells and candidate sets as flat arrays, for exporting a compiled catalog."""
+        lengths = [len(candidates) for candidates in self.candidate_sets]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        ids = np.fromiter((i for candidates in self.candidate_sets for i in candidates),
+                          dtype=np.int32, count=int(offsets[-1]))
+        return {"response_cells": self.cells, "response_offsets": offsets, "response_ids": ids}
+
+    def _income_upper_bound(self, kernel, bucket: int) -> float:
+        """Largest income probability a kernel can give for incomes in a bucket."""
+        if bucket == 0 or kernel.max_income <= 0:
+            return 1.0
+        lowest_income = self.income_bounds[bucket - 1]
+        if math.isinf(lowest_income):
+            return 0.0
+        return min(math.exp(-kernel.decay_rate * (lowest_income / kernel.max_income)), 1.0)
+
+    def lookup(self, age: int, income: float, category: str, state: str,
+               gender: Optional[str] = None) -> Optional[Tuple[int, ...]]:
+        """
+        Candidate scheme IDs for a profile, or None if the profile is outside
+        the materialized space and the caller should use the index instead.
+        """
+        if not (0 <= age <= MAX_TABLE_AGE):
+            return None
+        c = self.category_keys.get(category)
+        g = self.gender_keys.get(gender)
+        if c is None or g is None:
+            return None
+        # Only states with no state-specific schemes share the 'All' cells
+        if self.index.state_masks.get(state, 0) & ~self.index.all_states_mask:
+            return None
+        bucket = bisect_left(self.income_bounds, income)
+        return self.candidate_sets[self.cells[age, c, g, bucket]]
+
+
+class CandidateSets:
+    """
+    Candidate sets stored as one flat ID array plus offsets. Items are
+    memoryview slices, which iterate as plain ints without copying.
+    """
+
+    def __init__(self, offsets: np.ndarray, ids: np.ndarray):
+        self.offsets = memoryview(np.ascontiguousarray(offsets, dtype=np.int64))
+        self.ids = memoryview(np.ascontiguousarray(ids, dtype=np.int32))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> memoryview:
+        return self.ids[self.offsets[position]:self.offsets[position + 1]]
@@ -0,0 +1,122 @@
+"""
+Scheme Catalog
+Built-in welfare scheme definitions and eligibility criteria
+"""
+
+SAMPLE_SCHEMES = [
+    {
+        "name": "PM Kisan Samman Nidhi",
+        "description": "Financial assistance to small and marginal farmers",
+        "category": "Agriculture",
+        "benefits": "₹6,000 per year in three installments",
+        "duration": "Ongoing",
+        "criteria": {
+            "min_age": 18,
+            "max_age": 100,
+            "max_income": 200000,
+            "categories": ["All"],
+            "states": ["All"]
+        },
+        "requirements": [
+            "Land ownership documents",
+            "Aadhaar card",
+            "Bank account details"
+        ]
+    },
+    {
+        "name": "Ayushman Bharat",
+        "description": "Health insurance scheme for economically vulnerable families",
+        "category": "Healthcare",
+        "benefits": "₹5 Lakh per family per year",
+        "duration": "Ongoing",
+        "criteria": {
+            "min_age": 0,
+            "max_age": 120,
+            "max_income": 100000,
+            "categories": ["All"],
+            "states": ["All"]
+        },
+        "requirements": [
+            "Ration card",
+            "Income certificate",
+            "Aadhaar card"
+        ]
+    },
+    {
+        "name": "Pradhan Mantri Awas Yojana",
+        "description": "Affordable housing for economically weaker sections",
+        "category": "Housing",
+        "benefits": "Subsidy up to ₹2.5 Lakh",
+        "duration": "Till 2026",
+        "criteria": {
+            "min_age": 18,
+            "max_age": 70,
+            "max_income": 300000,
+            "categories": ["All"],
+            "states": ["All"]
+        },
+        "requirements": [
+            "Income certificate",
+            "Aadhaar card",
+            "Property documents"
+        ]
+    },
+    {
+        "name": "National Scholarship Portal",
+        "description": "Scholarships for students from minority communities and economically weaker sections",
+        "category": "Education",
+        "benefits": "₹10,000 to ₹50,000 per year",
+        "duration": "Academic year",
+        "criteria": {
+            "min_age": 5,
+            "max_age": 30,
+            "max_income": 250000,
+            "categories": ["SC", "ST", "OBC", "EWS"],
+            "states": ["All"]
+        },
+        "requirements": [
+            "School/College ID",
+            "Income certificate",
+            "Caste certificate (if applicable)"
+        ]
+    },
+    {
+        "name": "Pradhan Mantri Mudra Yojana",
+        "description": "Loans for small businesses and entrepreneurs",
+        "category": "Finance",
+        "benefits": "Loans up to ₹10 Lakh",
+        "duration": "Ongoing",
+        "criteria": {
+            "min_age": 18,
+            "max_age": 65,
+            "max_income": 500000,
+            "categories": ["All"],
+            "states": ["All"]
+        },
+        "requirements": [
+            "Business plan",
+            "Aadhaar card",
+            "Bank statements"
+        ]
+    },
+    {
+        "name": "Beti Bachao Beti Padhao",
+        "description": "Scheme to save and educate girl children",
+        "category": "Social Welfare",
+        "benefits": "Education support and savings scheme",
+        "duration": "Ongoing",
+        "criteria": {
+            "min_age": 0,
+            "max_age": 21,
+            "max_income": 500000,
+            "categories": ["All"],
+            "states": ["All"],
+            "gender": "Female"
+        },
+        "requirements": [
+            "Birth certificate",
+            "Aadhaar card",
+            "Bank account"
+        ]
+    }
+]
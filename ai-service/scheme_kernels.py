@@ -0,0 +1,263 @@
+"""
+Compiled Scheme Kernels
+Precomputes per-scheme lookup tables so request-time scoring is table lookups
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import stats
+from statistical_engine import StatisticalEngine, FactorRecord
+
+
+MAX_TABLE_AGE = 120
+
+
+def compile_age_tables(min_ages: Sequence[float], max_ages: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Age probability and age match bonus tables for ages 0..MAX_TABLE_AGE,
+    for many schemes at once. Values are identical to
+    StatisticalEngine.calculate_age_probability and get_age_match_bonus: the
+    same normal pdf ratio is evaluated over whole arrays instead of one
+    scalar scipy call per age.
+
+    Args:
+        min_ages: Minimum eligible age per scheme
+        max_ages: Maximum eligible age per scheme
+
+    Returns:
+        (M x 121 float64 age probabilities, M x 121 int64 age match bonuses)
+    """
+    ages = np.arange(MAX_TABLE_AGE + 1, dtype=np.float64)
+    min_ages = np.asarray(min_ages, dtype=np.float64)[:, None]
+    max_ages = np.asarray(max_ages, dtype=np.float64)[:, None]
+    age_range = max_ages - min_ages
+    optimal_age = (min_ages + max_ages) / 2
+    has_range = age_range > 0
+
+    std_dev = np.where(has_range, age_range / 4, 1.0)
+    prob = stats.norm.pdf(ages, optimal_age, std_dev)
+    max_prob = stats.norm.pdf(optimal_age, optimal_age, std_dev)
+    curve = np.where(max_prob > 0, np.minimum(prob / max_prob, 1.0), 1.0)
+    age_table = np.where(has_range, curve, (ages == optimal_age).astype(np.float64))
+    age_table = np.where((ages < min_ages) | (ages > max_ages), 0.0, age_table)
+
+    age_position = np.where(has_range, (ages - min_ages) / np.where(has_range, age_range, 1.0), 0.5)
+    age_bonus_table = np.where((0.3 <= age_position) & (age_position <= 0.7), 5, 0).astype(np.int64)
+    return age_table, age_bonus_table
+
+
+class SchemeKernel:
+    """
+    Compiled, read-only scoring kernel for a single scheme.
+    Produces the same values as the corresponding StatisticalEngine functions.
+    """
+
+    __slots__ = ('min_age', 'max_age', 'max_income', 'decay_rate', 'age_table',
+                 'age_bonus_table', 'all_categories', 'category_mask', 'required_gender', 'scheme_category')
+
+    def __init__(self, scheme: Dict, scheme_set: 'SchemeKernelSet',
+                 age_table: Optional[Sequence[float]] = None, age_bonus_table: Optional[Sequence[int]] = None):
+        """
+        Args:
+            scheme: Scheme dictionary
+            scheme_set: Kernel set providing the category/gender encoding
+            age_table: Age probabilities for 0..MAX_TABLE_AGE compiled earlier
+                (e.g. a view into a shared catalog); computed when omitted
+            age_bonus_table: Age match bonuses for 0..MAX_TABLE_AGE, likewise
+        """
+        criteria = scheme['criteria']
+        self.min_age = criteria.get('min_age', 0)
+        self.max_age = criteria.get('max_age', 120)
+        self.max_income = criteria.get('max_income', float('inf'))
+        self.scheme_category = scheme['category']
+        self.decay_rate = StatisticalEngine.get_income_decay_rate(self.scheme_category)
+
+        # 0..MAX_TABLE_AGE inclusive (SchemeKernelSet compiles them for the whole catalog)
+        if age_table is None or age_bonus_table is None:
+            age_tables, bonus_tables = compile_age_tables([self.min_age], [self.max_age])
+            age_table, age_bonus_table = tuple(age_tables[0].tolist()), tuple(bonus_tables[0].tolist())
+        self.age_table = age_table
+        self.age_bonus_table = age_bonus_table
+
+        categories = criteria.get('categories', ['All'])
+        self.all_categories = 'All' in categories
+        self.category_mask = 0
+        for name in categories:
+            self.category_mask |= 1 << scheme_set.encode_category(name)
+
+        self.required_gender = scheme_set.encode_gender(criteria.get('gender'))
+
+    def age_probability(self, age: int) -> float:
+        """Age probability via lookup table (falls back outside 0..120)."""
+        if 0 <= age <= MAX_TABLE_AGE and age == int(age):
+            return self.age_table[int(age)]
+        return StatisticalEngine.calculate_age_probability(age, self.min_age, self.max_age)
+
+    def age_match_bonus(self, age: int) -> int:
+        """Match score age bonus via lookup table (falls back outside 0..120)."""
+        if 0 <= age <= MAX_TABLE_AGE and age == int(age):
+            return self.age_bonus_table[int(age)]
+        return StatisticalEngine.get_age_match_bonus(age, self.min_age, self.max_age)
+
+    def income_ratio(self, income: float) -> float:
+        """Ratio of income to the scheme's income limit (0 when there is no limit)."""
+        return income / self.max_income if self.max_income > 0 else 0
+
+    def income_probability(self, income: float) -> float:
+        """Income probability using the precomputed decay constant."""
+        if income > self.max_income:
+            return 0.0
+        if self.max_income == 0:
+            return 1.0
+        return min(math.exp(-self.decay_rate * (income / self.max_income)), 1.0)
+
+    def category_probability(self, category_code: int, universal_probability: float) -> float:
+        """
+        Category probability from the category bitmask.
+
+        Args:
+            category_code: Encoded user category (-1 if unknown)
+            universal_probability: Precomputed probability for 'All' schemes
+        """
+        if self.all_categories:
+            return universal_probability
+        if category_code >= 0 and self.category_mask >> category_code & 1:
+            return 0.95
+        return 0.0
+
+    def gender_probability(self, gender_code: int) -> float:
+        """Gender probability from encoded genders (0 = none/not provided)."""
+        if self.required_gender == 0:
+            return 1.0
+        if gender_code == 0:
+            return 0.7
+        if gender_code == self.required_gender:
+            return 1.0
+        return 0.0
+
+    def overall_probability(self, age: int, income: float, category_code: int,
+                            gender_code: int, universal_probability: float) -> float:
+        """Kernel equivalent of StatisticalEngine.calculate_overall_probability."""
+        age_prob = self.age_probability(age)
+        if age_prob == 0:
+            return 0.0
+        income_prob = self.income_probability(income)
+        if income_prob == 0:
+            return 0.0
+        category_prob = self.category_probability(category_code, universal_probability)
+        if category_prob == 0:
+            return 0.0
+        gender_prob = self.gender_probability(gender_code)
+        if gender_prob == 0:
+            return 0.0
+
+        return StatisticalEngine.combine_factors(age_prob, income_prob, category_prob, gender_prob)
+
+    def evaluate(self, age: int, income: float, category_code: int,
+                 gender_code: int, universal_probability: float) -> FactorRecord:
+        """Kernel equivalent of StatisticalEngine.evaluate_factors."""
+        age_prob = self.age_probability(age)
+        income_prob = self.income_probability(income)
+        category_prob = self.category_probability(category_code, universal_probability)
+        gender_prob = self.gender_probability(gender_code)
+        probability = StatisticalEngine.combine_factors(age_prob, income_prob, category_prob, gender_prob)
+
+        return FactorRecord(
+            age_probability=age_prob,
+            income_probability=income_prob,
+            category_probability=category_prob,
+            gender_probability=gender_prob,
+            probability=probability,
+            priority=StatisticalEngine.get_priority_band(probability),
+            match_score=min(85 + self.age_match_bonus(age) +
+                            StatisticalEngine.get_income_match_bonus(self.income_ratio(income)), 100)
+        )
+
+
+class SchemeKernelSet:
+    """
+    Kernels for a whole catalog, sharing one category/gender vocabulary.
+    Kernels are in the same order as the schemes they were compiled from.
+    """
+
+    def __init__(self, schemes: List[Dict], tables: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            schemes: Scheme catalog
+            tables: Arrays from tables() of a kernel set compiled earlier for
+                the same catalog; kernels then read their lookup tables from
+                them instead of computing and holding their own
+        """
+        self.matrix = StatisticalEngine.compile_scheme_matrix(schemes, tables)
+        self.category_codes = self.matrix.category_codes
+        self.gender_codes = self.matrix.gender_codes
+
+        # 'All' schemes depend only on the user's category, so precompute per code
+        self.universal_probability = [
+            StatisticalEngine.calculate_category_match_probability(name, ['All'])
+            for name in self.category_codes
+        ]
+        self.unknown_universal_probability = StatisticalEngine.calculate_category_match_probability(None, ['All'])
+
+        width = MAX_TABLE_AGE + 1
+        if tables is None:
+            age_tables, bonus_tables = compile_age_tables(
+                [scheme['criteria'].get('min_age', 0) for scheme in schemes],
+                [scheme['criteria'].get('max_age', 120) for scheme in schemes]
+            )
+        else:
+            if tables['age_table'].shape != (len(schemes), width):
+                raise ValueError("Kernel tables do not match the catalog")
+            age_tables, bonus_tables = tables['age_table'], tables['age_bonus_table']
+        # Flat memoryviews: indexing returns plain floats/ints, slicing copies nothing
+        age_tables = memoryview(np.ascontiguousarray(age_tables, dtype=np.float64).reshape(-1))
+        bonus_tables = memoryview(np.ascontiguousarray(bonus_tables, dtype=np.int64).reshape(-1))
+        self.kernels = [
+            SchemeKernel(scheme, self, age_tables[start:start + width], bonus_tables[start:start + width])
+            for start, scheme in zip(range(0, len(schemes) * width, width), schemes)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.kernels)
+
+    def __iter__(self):
+        return iter(self.kernels)
+
+    def __getitem__(self, index: int) -> SchemeKernel:
+        return self.kernels[index]
+
+    def tables(self) -> Dict[str, np.ndarray]:
+        """Compiled arrays (scheme matrix and per-kernel age tables) that can rebuild this set."""
+        tables = self.matrix.arrays()
+        tables['age_table'] = np.array([kernel.age_table for kernel in self.kernels], dtype=np.float64)
+        tables['age_bonus_table'] = np.array([kernel.age_bonus_table for kernel in self.kernels], dtype=np.int64)
+        return tables
+
+    def encode_category(self, category: str) -> int:
+        """Encode a category name; unknown categories map to -1."""
+        return self.matrix.encode_category(category)
+
+    def encode_gender(self, gender: Optional[str]) -> int:
+        """Encode a gender; None maps to 0 and unknown values map to -1."""
+        return self.matrix.encode_gender(gender)
+
+    def get_universal_probability(self, category_code: int) -> float:
+        """Category probability for an 'All' scheme given an encoded user category."""
+        if category_code < 0:
+            return self.unknown_universal_probability
+        return self.universal_probability[category_code]
+
+
+def compile_scheme_kernels(schemes: List[Dict], tables: Optional[Dict[str, np.ndarray]] = None) -> SchemeKernelSet:
+    """
+    Compile every scheme in a catalog into a SchemeKernel.
+
+    Args:
+        schemes: List of scheme dictionaries with 'criteria' and 'category'
+        tables: Arrays compiled earlier for the same catalog (SchemeKernelSet.tables)
+
+    Returns:
+        SchemeKernelSet with one kernel per scheme
+    """
+    return SchemeKernelSet(schemes, tables)
@@ -121,13 +121,44 @@ class SchemeProfiles:
         return benefit
     
     @staticmethod
-    def format_expected_benefit(scheme_name: str) -> str:
-        """Format expected benefit as readable string."""
-        benefit = SchemeProfiles.get_expected_benefit(scheme_name)
-        
+    def format_benefit(benefit: Dict) -> str:
+        """Format an expected benefit dict (min, max, frequency) as readable string."""
         if benefit["min"] == benefit["max"]:
             amount = f"₹{benefit['min']:,}"
         else:
             amount = f"₹{benefit['min']:,} - ₹{benefit['max']:,}"
         
         return f"{amount} ({benefit['frequency']})"
+    
+    @staticmethod
+    def format_expected_benefit(scheme_name: str) -> str:
+        """Format expected benefit as readable string."""
+        return SchemeProfiles.format_benefit(SchemeProfiles.get_expected_benefit(scheme_name))
+
+    @staticmethod
+    def get_scheme_impact_score(scheme: Dict) -> float:
+        """
+        Impact score for a catalog entry. Entries loaded from a catalog
+        file may carry their own "profile"; built-in schemes fall back to
+        the tables above.
+        """
+        profile = scheme.get("profile") or {}
+        if "impact_score" in profile:
+            return profile["impact_score"]
+        return SchemeProfiles.get_impact_score(scheme["name"])
+
+    @staticmethod
+    def format_scheme_expected_benefit(scheme: Dict) -> str:
+        """Formatted expected benefit for a catalog entry (see get_scheme_impact_score)."""
+        profile = scheme.get("profile") or {}
+        if "expected_benefit" not in profile:
+            return SchemeProfiles.format_expected_benefit(scheme["name"])
+        return SchemeProfiles.format_benefit(profile["expected_benefit"])
+
+    @staticmethod
+    def get_scheme_target_demographic(scheme: Dict) -> Dict:
+        """Target demographic profile for a catalog entry (see get_scheme_impact_score)."""
+        profile = scheme.get("profile") or {}
+        if "target_demographic" in profile:
+            return profile["target_demographic"]
+        return SchemeProfiles.get_target_demographic(scheme["name"])
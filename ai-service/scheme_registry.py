@@ -0,0 +1,123 @@
+"""
+Scheme Registry
+Compact per-scheme records with integer IDs. Catalog fields and profile
+metadata (impact score, formatted expected benefit, target demographics)
+are resolved once when the catalog is compiled, so the scoring loop works
+on IDs and attribute reads instead of string-keyed lookups. The static
+response fields are also pre-encoded as JSON fragments.
+"""
+
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+from scheme_profiles import SchemeProfiles
+from record_stream import encode_members
+
+
+class SchemeRecord:
+    """
+    One catalog entry. Uses __slots__ and interned strings so large
+    catalogs do not pay for a dict per scheme and per nested field.
+    """
+
+    __slots__ = (
+        'id', 'name', 'description', 'category', 'benefits', 'duration',
+        'requirements', 'criteria', 'impact_score', 'expected_benefit', 'target_demographic',
+        'head_json', 'requirements_json'
+    )
+
+    def __init__(self, scheme_id: int, name: str, description: str, category: str, benefits: str,
+                 duration: str, requirements: Tuple[str, ...], criteria: Dict, impact_score: float,
+                 expected_benefit: str, target_demographic: Dict):
+        self.id = scheme_id
+        self.name = name
+        self.description = description
+        self.category = category
+        self.benefits = benefits
+        self.duration = duration
+        self.requirements = requirements
+        self.criteria = criteria
+        self.impact_score = impact_score
+        self.expected_benefit = expected_benefit
+        self.target_demographic = target_demographic
+
+        # Static members of a recommendation, encoded once for EligibilityService.check_json
+        self.head_json = encode_members({
+            "name": name,
+            "description": description,
+            "category": category,
+            "benefits": benefits,
+            "duration": duration
+        })
+        self.requirements_json = encode_members({"requirements": list(requirements)})
+
+    def __repr__(self) -> str:
+        return f"SchemeRecord({self.id}, {self.name!r})"
+
+
+class SchemeRegistry:
+    """
+    Scheme records indexed by ID (position in the catalog list).
+    Repeated values (categories, states, durations, requirement lists,
+    demographics) are shared between records.
+    """
+
+    def __init__(self, schemes: List[Dict]):
+        self._shared: Dict = {}
+        self.records = [self._compile(scheme_id, scheme) for scheme_id, scheme in enumerate(schemes)]
+        self.ids = {record.name: record.id for record in self.records}
+        # Only needed while compiling
+        del self._shared
+
+    def _share(self, value):
+        """Return a canonical instance of a hashable value (strings are interned)."""
+        if isinstance(value, str):
+            return sys.intern(value)
+        return self._shared.setdefault(value, value)
+
+    def _share_dict(self, value: Dict) -> Dict:
+        """Return a canonical instance of a flat dictionary of scalars and lists."""
+        key = ('dict',) + tuple(sorted(
+            (name, tuple(item) if isinstance(item, (list, tuple)) else item) for name, item in value.items()
+        ))
+        try:
+            return self._shared.setdefault(key, value)
+        except TypeError:
+            # Nested containers: keep this record's own copy
+            return value
+
+    def _compile(self, scheme_id: int, scheme: Dict) -> SchemeRecord:
+        share = self._share
+        criteria = self._share_dict({
+            key: [share(item) for item in value] if isinstance(value, list) else value
+            for key, value in scheme['criteria'].items()
+        })
+
+        record = SchemeRecord(
+            scheme_id=scheme_id,
+            name=share(scheme['name']),
+            description=share(scheme['description']),
+            category=share(scheme['category']),
+            benefits=share(scheme['benefits']),
+            duration=share(scheme.get('duration', 'Ongoing')),
+            requirements=share(tuple(share(item) for item in scheme.get('requirements', []))),
+            criteria=criteria,
+            impact_score=SchemeProfiles.get_scheme_impact_score(scheme),
+            expected_benefit=share(SchemeProfiles.format_scheme_expected_benefit(scheme)),
+            target_demographic=self._share_dict(SchemeProfiles.get_scheme_target_demographic(scheme))
+        )
+        record.head_json = share(record.head_json)
+        record.requirements_json = share(record.requirements_json)
+        return record
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[SchemeRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, scheme_id: int) -> SchemeRecord:
+        return self.records[scheme_id]
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Scheme ID for a scheme name, or None if it is not in the catalog."""
+        return self.ids.get(name)
@@ -0,0 +1,296 @@
+"""
+Offline Population Scoring
+Scores a CSV or NDJSON file of beneficiary profiles against the scheme catalog
+in parallel worker processes, using the same EligibilityService as the API.
+
+Usage:
+    python score_population.py profiles.csv results.ndjson --workers 8 --chunk-size 5000
+    python score_population.py profiles.ndjson results.ndjson --resume
+    python score_population.py profiles.csv results.ndjson --catalog schemes.json
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from eligibility_service import EligibilityService
+from record_stream import InvalidRecord, JSONRecordDecoder, decode_ndjson_line, encode_ndjson, iter_records
+from catalog_manager import catalog_version, read_catalog
+
+
+# Set in each worker process by _init_worker
+_service: Optional[EligibilityService] = None
+
+
+def _init_worker(schemes: List[Dict]) -> None:
+    global _service
+    _service = EligibilityService(schemes)
+
+
+def parse_profile(record) -> Dict:
+    """
+    Normalize one input record into the user_data shape used by the API.
+
+    Raises:
+        ValueError: If a required field is missing or has the wrong type
+    """
+    if isinstance(record, InvalidRecord):
+        raise ValueError(record.message)
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    missing = [field for field in ('age', 'income', 'category', 'state') if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+
+    age = _finite_number(record, 'age')
+    if age != int(age):
+        raise ValueError(f"age must be an integer, got {record['age']!r}")
+
+    for field in ('category', 'state', 'gender'):
+        if record.get(field) is not None and not isinstance(record[field], str):
+            raise ValueError(f"{field} must be a string, got {record[field]!r}")
+
+    return {
+        'age': int(age),
+        'income': _finite_number(record, 'income'),
+        'category': record['category'],
+        'state': record['state'],
+        'gender': record.get('gender') or None
+    }
+
+
+def _finite_number(record: Dict, field: str) -> float:
+    if isinstance(record[field], bool):
+        raise ValueError(f"{field} must be a number, got {record[field]!r}")
+    value = float(record[field])
+    if not math.isfinite(value):
+        raise ValueError(f"{field} must be a finite number, got {record[field]!r}")
+    return value
+
+
+def score_chunk(start_row: int, records: List) -> bytes:
+    """
+    Score one chunk of raw records in a worker process.
+
+    Args:
+        start_row: Row number of the first record in the input
+        records: Raw CSV/NDJSON records
+
+    Returns:
+        NDJSON lines, one per record, in input order
+    """
+    rows = []
+    for offset, record in enumerate(records):
+        row = {'row': start_row + offset}
+        if isinstance(record, dict) and record.get('id') not in (None, ''):
+            row['id'] = record['id']
+        try:
+            rows.append((row, parse_profile(record), None))
+        except (ValueError, TypeError, OverflowError) as e:
+            rows.append((row, None, f"Invalid record: {e}"))
+
+    scored = iter(_service.check_many([profile for _, profile, _ in rows if profile is not None]))
+
+    lines = []
+    for row, profile, error in rows:
+        if profile is None:
+            lines.append(encode_ndjson({**row, 'success': False, 'error': error}))
+        else:
+            lines.append(encode_ndjson({**row, **next(scored)}))
+    return b''.join(lines)
+
+
+def read_records(path: str, input_format: str, offset: int = 0) -> Iterator[Tuple[object, Optional[int]]]:
+    """
+    Stream raw records from a CSV or NDJSON/JSON-array file.
+
+    Args:
+        offset: Byte position to start reading at, as yielded for an
+            earlier record (CSV and NDJSON only)
+
+    Yields:
+        (record, byte position just after it), with None as the position
+        for JSON arrays, which cannot be resumed mid-file
+    """
+    with open(path, 'rb') as f:
+        if input_format == 'csv':
+            yield from _csv_records(f, offset)
+        elif _is_json_array(f):
+            for record in iter_records(f):
+                yield record, None
+        else:
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                text = line.decode('utf-8')
+                if text.strip():
+                    yield decode_ndjson_line(text), offset
+
+
+def _csv_records(f: BinaryIO, offset: int) -> Iterator[Tuple[Dict, int]]:
+    position = 0
+
+    def lines() -> Iterator[str]:
+        # csv pulls one line at a time, so position is always the end of the last record
+        nonlocal position
+        for line in f:
+            position += len(line)
+            yield line.decode('utf-8')
+
+    reader = csv.DictReader(lines())
+    if offset:
+        # The header is still read from the top of the file
+        reader.fieldnames
+        f.seek(offset)
+        position = offset
+    for record in reader:
+        yield record, position
+
+
+def _is_json_array(f: BinaryIO) -> bool:
+    """Detect a JSON array body the way JSONRecordDecoder does, then rewind."""
+    first = b''
+    for line in f:
+        first = line.lstrip(JSONRecordDecoder.WHITESPACE.encode())
+        if first:
+            break
+    f.seek(0)
+    return first.startswith(b'[')
+
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: Dict) -> None:
+    """Write the checkpoint atomically so a crash never leaves it half-written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def run(input_path: str, output_path: str, input_format: str, workers: int,
+        chunk_size: int, checkpoint_path: str, resume: bool, catalog: Optional[str] = None) -> Dict:
+    """
+    Score every profile in input_path and write ranked results to output_path.
+
+    Args:
+        catalog: Scheme catalog file or SQLite database (default: built-in schemes)
+
+    Returns:
+        Final checkpoint state (rows and chunks written)
+    """
+    schemes = read_catalog(catalog)
+    state = {'input': os.path.abspath(input_path), 'chunk_size': chunk_size,
+             'catalog_version': catalog_version(schemes),
+             'chunks_done': 0, 'rows_done': 0, 'output_bytes': 0, 'input_bytes': 0}
+
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None:
+        if checkpoint['input'] != state['input'] or checkpoint['chunk_size'] != chunk_size:
+            raise SystemExit("Checkpoint was written for a different input or chunk size")
+        if checkpoint.get('catalog_version', state['catalog_version']) != state['catalog_version']:
+            raise SystemExit("Checkpoint was written against a different scheme catalog")
+        if not os.path.exists(output_path):
+            raise SystemExit(f"Checkpoint found but output file {output_path} is missing")
+        state = checkpoint
+
+    # Drop anything written after the last checkpoint
+    mode = 'r+b' if checkpoint is not None else 'wb'
+    output = open(output_path, mode)
+    output.truncate(state['output_bytes'])
+    output.seek(state['output_bytes'])
+
+    # Continue reading the input where the last committed chunk ended. JSON
+    # arrays and checkpoints without input_bytes skip the committed rows instead.
+    input_bytes = state.get('input_bytes')
+    records = read_records(input_path, input_format, input_bytes or 0)
+    if input_bytes is None:
+        for _ in islice(records, state['rows_done']):
+            pass
+
+    def chunks():
+        row = state['rows_done']
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            yield row, [record for record, _ in chunk], chunk[-1][1]
+            row += len(chunk)
+
+    def commit(lines: bytes, count: int, end: Optional[int]) -> None:
+        output.write(lines)
+        output.flush()
+        os.fsync(output.fileno())
+        state['chunks_done'] += 1
+        state['rows_done'] += count
+        state['output_bytes'] = output.tell()
+        state['input_bytes'] = end
+        save_checkpoint(checkpoint_path, state)
+
+    try:
+        if workers <= 0:
+            _init_worker(schemes)
+            for start_row, chunk, end in chunks():
+                commit(score_chunk(start_row, chunk), len(chunk), end)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(schemes,)) as pool:
+                # Keep a bounded window of chunks in flight; write them in order
+                in_flight = []
+                for start_row, chunk, end in chunks():
+                    in_flight.append((pool.submit(score_chunk, start_row, chunk), len(chunk), end))
+                    if len(in_flight) >= workers * 2:
+                        future, count, end = in_flight.pop(0)
+                        commit(future.result(), count, end)
+                for future, count, end in in_flight:
+                    commit(future.result(), count, end)
+    finally:
+        output.close()
+
+    return state
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score beneficiary profiles against the scheme catalog")
+    parser.add_argument('input', help="CSV or NDJSON file of profiles (age, income, category, state, gender[, id])")
+    parser.add_argument('output', help="NDJSON file for ranked recommendations")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default=None,
+                        help="Input format (default: from file extension)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (0 = score in this process)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="Profiles per chunk")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+    parser.add_argument('--catalog', default=None,
+                        help="Scheme catalog JSON file or SQLite database (default: built-in schemes)")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    input_format = args.format or ('csv' if args.input.lower().endswith('.csv') else 'ndjson')
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+
+    state = run(args.input, args.output, input_format, args.workers,
+                args.chunk_size, checkpoint_path, args.resume, args.catalog)
+    print(f"Scored {state['rows_done']} profiles in {state['chunks_done']} chunks -> {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Multi-worker Server
+Runs app.py under several uvicorn workers that share one compiled scheme
+catalog. The parent process compiles the catalog once and exports its
+arrays (kernel age tables, scheme matrix and, with PRECOMPUTE_RESPONSES=1,
+the response table) to a shared directory, /dev/shm by default so it lives
+in shared memory. Workers memory-map the arrays read-only instead of
+compiling their own copy, so startup is fast and the tables are resident
+once on the host.
+
+The parent also polls the catalog source and exports every new version.
+Workers only ever attach: a worker that sees the change before the export
+exists keeps serving the current version and retries on its next poll.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+    SCHEME_CATALOG_PATH=schemes.db PRECOMPUTE_RESPONSES=1 python serve.py --workers 8
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import uvicorn
+
+from catalog_manager import CatalogError, CatalogManager
+from shared_catalog import export_catalog, prune_catalogs
+
+
+logger = logging.getLogger("serve")
+
+
+def default_shared_dir() -> str:
+    """Fresh directory in shared memory (/dev/shm) when available, else the temp directory."""
+    parent = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+    return tempfile.mkdtemp(prefix="scheme-catalog-", dir=parent)
+
+
+def export_snapshot(manager: CatalogManager, shared_dir: str, keep: list) -> None:
+    """Export the current catalog version and drop all but the last few exports."""
+    snapshot = manager.snapshot
+    path = export_catalog(snapshot.service, snapshot.version, shared_dir)
+    if snapshot.version in keep:
+        keep.remove(snapshot.version)
+    keep.append(snapshot.version)
+    # The previous version stays for workers that have not reloaded yet
+    del keep[:-2]
+    prune_catalogs(shared_dir, keep)
+    logger.info("Exported scheme catalog version %s to %s", snapshot.version, path)
+
+
+def watch_catalog(manager: CatalogManager, shared_dir: str, keep: list,
+                  interval: float, stop: threading.Event) -> None:
+    """Export each new catalog version (run in a background thread of the parent)."""
+    while not stop.wait(interval):
+        if not manager.source_changed():
+            continue
+        try:
+            _, changed = manager.reload()
+            if changed:
+                export_snapshot(manager, shared_dir, keep)
+        except CatalogError as e:
+            logger.warning("Scheme catalog reload failed, keeping version %s: %s", manager.snapshot.version, e)
+        except Exception:
+            # e.g. OSError from a full shared directory; workers compile the
+            # version themselves and the next change is exported as usual
+            logger.exception("Scheme catalog export failed for version %s", manager.snapshot.version)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the AI service with workers sharing one compiled catalog")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--shared-dir", default=os.environ.get("SHARED_CATALOG_DIR"),
+                        help="Directory for the compiled catalog exports; other entries in it are left alone "
+                             "(default: a new directory in /dev/shm)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper())
+
+    manager = CatalogManager(
+        os.environ.get("SCHEME_CATALOG_PATH") or None,
+        precompute=os.environ.get("PRECOMPUTE_RESPONSES", "0") == "1"
+    )
+    owns_shared_dir = args.shared_dir is None
+    shared_dir = args.shared_dir or default_shared_dir()
+    keep = []
+    export_snapshot(manager, shared_dir, keep)
+
+    # Inherited by the worker processes; app.py attaches the export
+    os.environ["SHARED_CATALOG_DIR"] = shared_dir
+
+    stop = threading.Event()
+    interval = float(os.environ.get("CATALOG_WATCH_INTERVAL", "5"))
+    watcher = None
+    if manager.source is not None and interval > 0:
+        watcher = threading.Thread(
+            target=watch_catalog, args=(manager, shared_dir, keep, interval, stop), daemon=True
+        )
+        watcher.start()
+
+    try:
+        uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+    finally:
+        stop.set()
+        if watcher is not None:
+            watcher.join()
+        if owns_shared_dir:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
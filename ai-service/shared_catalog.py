@@ -0,0 +1,134 @@
+"""
+Shared Catalog
+Compiled scheme catalogs exported as .npy arrays for several worker
+processes. The serving parent (serve.py) compiles each catalog version once
+and exports the arrays (kernel age tables, scheme matrix, response table);
+workers memory-map them read-only, so the OS keeps one copy of the tables
+however many workers attach, and workers skip kernel compilation.
+
+Layout: <directory>/<catalog version>/<array name>.npy plus manifest.json.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from eligibility_service import EligibilityService
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Bump when the exported arrays change meaning
+FORMAT = 1
+
+# Temporary directories of exports in progress: "." + version + "-" + mkdtemp suffix
+TMP_EXPORT_NAME = re.compile(r"^\.[0-9a-f]+-[a-z0-9_]+$")
+
+
+def export_catalog(service: EligibilityService, version: str, directory: str) -> str:
+    """
+    Export a compiled service's arrays under directory/version. The export
+    is written to a temporary directory and renamed into place, so workers
+    never see a partial one; an existing export of the version is kept.
+
+    Args:
+        service: Service compiled from the catalog
+        version: Catalog version (see catalog_manager.catalog_version)
+        directory: Shared catalog directory
+
+    Returns:
+        Path of the export
+    """
+    path = os.path.join(directory, version)
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        return path
+
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=f".{version}-", dir=directory)
+    try:
+        tables = service.tables()
+        for name, array in tables.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(array))
+        manifest = {"format": FORMAT, "version": version, "schemes": len(service.registry), "arrays": sorted(tables)}
+        with open(os.path.join(tmp_path, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if os.path.exists(os.path.join(path, MANIFEST)):
+            # Another process exported the same version first
+            return path
+        raise
+    return path
+
+
+def _load(path: str) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Empty arrays cannot be memory-mapped
+        return np.load(path)
+
+
+def attach_catalog(directory: str, version: str, schemes: List[Dict],
+                   precompute: bool = False) -> Optional[EligibilityService]:
+    """
+    Build a service for a catalog on top of its exported, memory-mapped arrays.
+
+    Args:
+        directory: Shared catalog directory
+        version: Version of `schemes`
+        schemes: The catalog itself (records and the index are still built per process)
+        precompute: Whether the service should have a response table; it is
+            built locally if the export has none
+
+    Returns:
+        The service, or None if the version has not been exported (or the
+        export does not fit the catalog), in which case the caller compiles it
+    """
+    path = os.path.join(directory, version)
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != FORMAT or manifest.get("schemes") != len(schemes):
+        logger.warning("Ignoring incompatible shared catalog export at %s", path)
+        return None
+
+    try:
+        tables = {name: _load(os.path.join(path, f"{name}.npy")) for name in manifest["arrays"]}
+        return EligibilityService(schemes, precompute=precompute, tables=tables)
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning("Could not attach shared catalog at %s: %s", path, e)
+        return None
+
+
+def _is_export(directory: str, name: str) -> bool:
+    """Whether a directory entry was created by export_catalog (an export or a leftover temporary one)."""
+    path = os.path.join(directory, name)
+    if not os.path.isdir(path) or os.path.islink(path):
+        return False
+    return os.path.exists(os.path.join(path, MANIFEST)) or TMP_EXPORT_NAME.match(name) is not None
+
+
+def prune_catalogs(directory: str, keep: Iterable[str]) -> None:
+    """
+    Delete exports of versions not in keep. Workers still mapping them are
+    unaffected. Anything else in the directory is left alone, so it may be
+    shared with other files.
+    """
+    keep = set(keep)
+    try:
+        entries = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in entries:
+        if name not in keep and _is_export(directory, name):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
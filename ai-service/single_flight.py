@@ -0,0 +1,51 @@
+"""
+Single Flight
+Coalesces concurrent calls with the same key into one in-flight
+computation whose result every caller receives. Used in front of
+/api/check-eligibility scoring, where campaign pushes and kiosk retries
+send identical profiles within milliseconds of each other.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    At most one computation per key runs at a time; callers arriving while
+    it runs wait for it instead of starting their own. Nothing is kept once
+    it finishes, so results are never served stale.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0   # Computations started
+        self.shared = 0  # Callers served by another caller's computation
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return func()'s result, sharing it with concurrent callers of the same key.
+
+        Raises:
+            Exception: Whatever func raised, for every caller of that flight
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            flight = self._flights[key] = asyncio.ensure_future(func())
+            flight.add_done_callback(lambda done: self._land(key, done))
+        # Shielded so a caller that goes away does not cancel the others' result
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Marks the exception retrieved even if every caller went away
+            flight.exception()
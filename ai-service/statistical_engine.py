@@ -5,10 +5,25 @@ Provides probability calculations and statistical analysis for scheme recommenda
 
 import numpy as np
 from scipy import stats
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
 import math
 
 
+class FactorRecord(NamedTuple):
+    """
+    Immutable result of evaluating one user against one scheme.
+    Every downstream consumer (breakdown, match score, explanation, ranking)
+    reads from this record instead of recomputing the factors.
+    """
+    age_probability: float
+    income_probability: float
+    category_probability: float
+    gender_probability: float
+    probability: float
+    priority: str
+    match_score: int
+
+
 class StatisticalEngine:
     """
     Core statistical analysis engine for scheme matching.
@@ -40,6 +55,8 @@ class StatisticalEngine:
         'Finance': 0.70
     }
     
+    STEEP_INCOME_CATEGORIES = ('Healthcare', 'Education', 'Social Welfare')
+    
     @staticmethod
     def calculate_age_probability(user_age: int, min_age: int, max_age: int) -> float:
         """
@@ -73,6 +90,23 @@ class StatisticalEngine:
         
         return min(prob / max_prob, 1.0) if max_prob > 0 else 1.0
     
+    @staticmethod
+    def get_income_decay_rate(scheme_category: str) -> float:
+        """
+        Get the exponential decay rate used for the income curve of a scheme category.
+        
+        Args:
+            scheme_category: Category of scheme
+            
+        Returns:
+            Decay rate (higher = steeper preference for lower income)
+        """
+        if scheme_category in StatisticalEngine.STEEP_INCOME_CATEGORIES:
+            # Steeper curve - heavily favors lower income
+            return 2.5
+        # Gentler curve
+        return 1.5
+    
     @staticmethod
     def calculate_income_probability(user_income: float, max_income: float, 
                                     scheme_category: str) -> float:
@@ -98,12 +132,7 @@ class StatisticalEngine:
         income_ratio = user_income / max_income
         
 
-        if scheme_category in ['Healthcare', 'Education', 'Social Welfare']:
-            # Steeper curve - heavily favors lower income
-            decay_rate = 2.5
-        else:
-            # Gentler curve
-            decay_rate = 1.5
+        decay_rate = StatisticalEngine.get_income_decay_rate(scheme_category)
         
         # Exponential decay: higher probability for lower income
         # Formula: e^(-λ * income_ratio)
@@ -196,20 +225,8 @@ class StatisticalEngine:
             scheme_criteria.get('gender')
         )
         
-       
-        if age_prob == 0 or income_prob == 0 or category_prob == 0 or gender_prob == 0:
-            return 0.0
-        
         
-        overall_prob = (
-            StatisticalEngine.WEIGHTS['age'] * age_prob +
-            StatisticalEngine.WEIGHTS['income'] * income_prob +
-            StatisticalEngine.WEIGHTS['category'] * category_prob +
-            StatisticalEngine.WEIGHTS['gender'] * gender_prob +
-            StatisticalEngine.WEIGHTS['location']*0.8
-        )
-        
-        return min(overall_prob, 1.0)
+        return StatisticalEngine.combine_factors(age_prob, income_prob, category_prob, gender_prob)
     
     @staticmethod
     def calculate_confidence_interval(probability: float, sample_size: int = 100) -> Tuple[float, float]:
@@ -316,15 +333,6 @@ class StatisticalEngine:
         )
         
 
-        if probability >= 0.8:
-            priority = "VERY HIGH"
-        elif probability >= 0.6:
-            priority = "HIGH"
-        elif probability >= 0.4:
-            priority = "MEDIUM"
-        else:
-            priority = "LOW"
-        
         return {
             "demographicMatch": round(age_prob, 3),
             "incomeCompatibility": round(income_prob, 3),
@@ -332,6 +340,315 @@ class StatisticalEngine:
                 user_data['category'],
                 scheme_criteria.get('categories', ['All'])
             ), 3),
-            "priorityScore": priority,
+            "priorityScore": StatisticalEngine.get_priority_band(probability),
             "overallProbability": round(probability, 3)
         }
+    
+    @staticmethod
+    def get_priority_band(probability: float) -> str:
+        """
+        Map an overall probability to its priority band.
+        
+        Args:
+            probability: Overall probability score
+            
+        Returns:
+            One of "VERY HIGH", "HIGH", "MEDIUM" or "LOW"
+        """
+        if probability >= 0.8:
+            return "VERY HIGH"
+        elif probability >= 0.6:
+            return "HIGH"
+        elif probability >= 0.4:
+            return "MEDIUM"
+        return "LOW"
+    
+    @staticmethod
+    def get_age_match_bonus(user_age: int, min_age: int, max_age: int) -> int:
+        """Match score bonus for ages in the middle of the eligible range."""
+        age_range = max_age - min_age
+        age_position = (user_age - min_age) / age_range if age_range > 0 else 0.5
+        if 0.3 <= age_position <= 0.7:  # Sweet spot
+            return 5
+        return 0
+    
+    @staticmethod
+    def get_income_match_bonus(income_ratio: float) -> int:
+        """Match score bonus for incomes well below the scheme limit."""
+        if income_ratio < 0.5:
+            return 10
+        elif income_ratio < 0.75:
+            return 5
+        return 0
+    
+    @staticmethod
+    def calculate_match_score(user_age: int, user_income: float, min_age: int,
+                              max_age: int, max_income: float) -> int:
+        """
+        Calculate how well the user matches the scheme criteria.
+        
+        Args:
+            user_age: User's current age
+            user_income: User's annual income
+            min_age: Minimum eligible age for scheme
+            max_age: Maximum eligible age for scheme
+            max_income: Maximum eligible income for scheme
+            
+        Returns:
+            Match score between 85 and 100
+        """
+        income_ratio = user_income / max_income if max_income > 0 else 0
+        score = (85 +  # Base score
+                 StatisticalEngine.get_age_match_bonus(user_age, min_age, max_age) +
+                 StatisticalEngine.get_income_match_bonus(income_ratio))
+        return min(score, 100)
+    
+    @staticmethod
+    def evaluate_factors(user_data: Dict, scheme_criteria: Dict,
+                         scheme_category: str) -> FactorRecord:
+        """
+        Evaluate every factor for a (user, scheme) pair in a single pass.
+        
+        Args:
+            user_data: Dictionary with user information
+            scheme_criteria: Dictionary with scheme eligibility criteria
+            scheme_category: Category of the scheme
+            
+        Returns:
+            FactorRecord with all factors, overall probability, priority and match score
+        """
+        min_age = scheme_criteria.get('min_age', 0)
+        max_age = scheme_criteria.get('max_age', 120)
+        max_income = scheme_criteria.get('max_income', float('inf'))
+        
+        age_prob = StatisticalEngine.calculate_age_probability(user_data['age'], min_age, max_age)
+        income_prob = StatisticalEngine.calculate_income_probability(
+            user_data['income'], max_income, scheme_category
+        )
+        category_prob = StatisticalEngine.calculate_category_match_probability(
+            user_data['category'],
+            scheme_criteria.get('categories', ['All'])
+        )
+        gender_prob = StatisticalEngine.calculate_gender_probability(
+            user_data.get('gender'),
+            scheme_criteria.get('gender')
+        )
+        probability = StatisticalEngine.combine_factors(age_prob, income_prob, category_prob, gender_prob)
+        
+        return FactorRecord(
+            age_probability=age_prob,
+            income_probability=income_prob,
+            category_probability=category_prob,
+            gender_probability=gender_prob,
+            probability=probability,
+            priority=StatisticalEngine.get_priority_band(probability),
+            match_score=StatisticalEngine.calculate_match_score(
+                user_data['age'], user_data['income'], min_age, max_age, max_income
+            )
+        )
+    
+    @staticmethod
+    def combine_factors(age_prob: float, income_prob: float,
+                        category_prob: float, gender_prob: float) -> float:
+        """
+        Combine individual factor probabilities with weighted scoring.
+        Any zero factor makes the scheme ineligible.
+        
+        Returns:
+            Overall probability score between 0 and 1
+        """
+        if age_prob == 0 or income_prob == 0 or category_prob == 0 or gender_prob == 0:
+            return 0.0
+        
+        overall_prob = (
+            StatisticalEngine.WEIGHTS['age'] * age_prob +
+            StatisticalEngine.WEIGHTS['income'] * income_prob +
+            StatisticalEngine.WEIGHTS['category'] * category_prob +
+            StatisticalEngine.WEIGHTS['gender'] * gender_prob +
+            StatisticalEngine.WEIGHTS['location']*0.8
+        )
+        
+        return min(overall_prob, 1.0)
+    
+    @staticmethod
+    def breakdown_from_factors(factors: FactorRecord) -> Dict:
+        """
+        Build the statistical breakdown from an already evaluated FactorRecord.
+        
+        Args:
+            factors: Evaluated factors for a (user, scheme) pair
+            
+        Returns:
+            Dictionary with detailed statistical analysis
+        """
+        return {
+            "demographicMatch": round(factors.age_probability, 3),
+            "incomeCompatibility": round(factors.income_probability, 3),
+            "categoryMatch": round(factors.category_probability, 3),
+            "priorityScore": factors.priority,
+            "overallProbability": round(factors.probability, 3)
+        }
+    
+    @staticmethod
+    def compile_scheme_matrix(schemes: List[Dict],
+                              arrays: Optional[Dict[str, np.ndarray]] = None) -> 'SchemeMatrix':
+        """
+        Compile scheme criteria into a columnar matrix for batch scoring.
+        
+        Args:
+            schemes: List of scheme dictionaries with 'criteria' and 'category'
+            arrays: Columns compiled earlier for the same catalog (see
+                SchemeMatrix.ARRAYS), e.g. memory-mapped from a shared catalog
+            
+        Returns:
+            SchemeMatrix holding one column entry per scheme
+        """
+        return SchemeMatrix(schemes, arrays)
+    
+    @staticmethod
+    def calculate_batch_probability(ages: np.ndarray, incomes: np.ndarray,
+                                    category_codes: np.ndarray, gender_codes: np.ndarray,
+                                    scheme_matrix: 'SchemeMatrix') -> np.ndarray:
+        """
+        Calculate overall probability for many users against many schemes at once.
+        Vectorized equivalent of calculate_overall_probability using broadcasting.
+        
+        Args:
+            ages: Array of N user ages
+            incomes: Array of N user incomes
+            category_codes: Array of N category codes (see SchemeMatrix.encode_category)
+            gender_codes: Array of N gender codes (see SchemeMatrix.encode_gender)
+            scheme_matrix: Compiled scheme matrix with M schemes
+            
+        Returns:
+            N x M array of probability scores between 0 and 1
+        """
+        ages = np.asarray(ages, dtype=np.float64)[:, None]
+        incomes = np.asarray(incomes, dtype=np.float64)[:, None]
+        category_codes = np.asarray(category_codes, dtype=np.int64)
+        gender_codes = np.asarray(gender_codes, dtype=np.int64)[:, None]
+        m = scheme_matrix
+        
+        # Age: normal curve centred on the middle of the eligible range
+        age_range = m.max_age - m.min_age
+        optimal_age = (m.min_age + m.max_age) / 2
+        std_dev = np.where(age_range > 0, age_range / 4, 1.0)
+        z = (ages - optimal_age) / std_dev
+        age_prob = np.where(age_range > 0, np.exp(-0.5 * z * z), (ages == optimal_age).astype(np.float64))
+        age_prob = np.where((ages < m.min_age) | (ages > m.max_age), 0.0, np.minimum(age_prob, 1.0))
+        
+        # Income: exponential decay on income / max_income
+        safe_max_income = np.where(m.max_income > 0, m.max_income, 1.0)
+        income_prob = np.where(m.max_income > 0, np.exp(-m.decay_rate * (incomes / safe_max_income)), 1.0)
+        income_prob = np.where(incomes > m.max_income, 0.0, np.minimum(income_prob, 1.0))
+        
+        # Category: universal schemes scale with vulnerability, listed ones need a match
+        known = category_codes >= 0
+        vulnerability = np.where(known, m.category_vulnerability[np.where(known, category_codes, 0)], 0.5)[:, None]
+        listed = m.category_allowed[:, np.where(known, category_codes, 0)].T & known[:, None]
+        category_prob = np.where(m.all_categories, 0.85 + 0.15 * vulnerability, np.where(listed, 0.95, 0.0))
+        
+        # Gender: 0 = no requirement (scheme) / not provided (user)
+        gender_prob = np.where(gender_codes == 0, 0.7, np.where(gender_codes == m.required_gender, 1.0, 0.0))
+        gender_prob = np.where(m.required_gender == 0, 1.0, gender_prob)
+        
+        weights = StatisticalEngine.WEIGHTS
+        overall_prob = (
+            weights['age'] * age_prob +
+            weights['income'] * income_prob +
+            weights['category'] * category_prob +
+            weights['gender'] * gender_prob +
+            weights['location'] * 0.8
+        )
+        any_zero = (age_prob == 0) | (income_prob == 0) | (category_prob == 0) | (gender_prob == 0)
+        
+        return np.where(any_zero, 0.0, np.minimum(overall_prob, 1.0))
+
+
+class SchemeMatrix:
+    """
+    Columnar representation of scheme criteria for vectorized scoring.
+    Each attribute is a length-M array (or M x C for category_allowed).
+    
+    Category and gender vocabularies start from StatisticalEngine's known values
+    and are extended with any names found in the scheme criteria, so encoded
+    comparisons give the same answers as the scalar string comparisons.
+    """
+    
+    __slots__ = ('size', 'min_age', 'max_age', 'max_income', 'decay_rate',
+                 'all_categories', 'category_allowed', 'category_vulnerability',
+                 'required_gender', 'category_codes', 'gender_codes')
+    
+    # Attributes that are arrays, in the order they are exported
+    ARRAYS = ('min_age', 'max_age', 'max_income', 'decay_rate', 'all_categories',
+              'category_allowed', 'category_vulnerability', 'required_gender')
+    
+    def __init__(self, schemes: List[Dict], arrays: Optional[Dict[str, np.ndarray]] = None):
+        self.category_codes = {name: code for code, name in enumerate(StatisticalEngine.CATEGORY_VULNERABILITY)}
+        self.gender_codes = {'male': 1, 'female': 2, 'other': 3}
+        
+        for scheme in schemes:
+            for name in scheme['criteria'].get('categories', ['All']):
+                self.category_codes.setdefault(name, len(self.category_codes))
+            required_gender = scheme['criteria'].get('gender')
+            if required_gender is not None:
+                self.gender_codes.setdefault(required_gender.lower(), len(self.gender_codes) + 1)
+        
+        self.size = len(schemes)
+        if arrays is not None:
+            for name in self.ARRAYS:
+                setattr(self, name, arrays[name])
+            if self.min_age.shape != (self.size,) or self.category_allowed.shape[1] != len(self.category_codes):
+                raise ValueError("Scheme matrix arrays do not match the catalog")
+            return
+        
+        self.min_age = np.array([s['criteria'].get('min_age', 0) for s in schemes], dtype=np.float64)
+        self.max_age = np.array([s['criteria'].get('max_age', 120) for s in schemes], dtype=np.float64)
+        self.max_income = np.array([s['criteria'].get('max_income', float('inf')) for s in schemes], dtype=np.float64)
+        self.decay_rate = np.array([StatisticalEngine.get_income_decay_rate(s['category']) for s in schemes],
+                                   dtype=np.float64)
+        self.all_categories = np.array(['All' in s['criteria'].get('categories', ['All']) for s in schemes],
+                                       dtype=bool)
+        
+        self.category_allowed = np.zeros((self.size, len(self.category_codes)), dtype=bool)
+        for i, scheme in enumerate(schemes):
+            for name in scheme['criteria'].get('categories', ['All']):
+                self.category_allowed[i, self.category_codes[name]] = True
+        
+        self.category_vulnerability = np.array(
+            [StatisticalEngine.CATEGORY_VULNERABILITY.get(name, 0.5) for name in self.category_codes],
+            dtype=np.float64
+        )
+        self.required_gender = np.array(
+            [self.encode_gender(s['criteria'].get('gender')) for s in schemes], dtype=np.int64
+        )
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The array attributes by name, for exporting a compiled catalog."""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+    
+    def encode_category(self, category: str) -> int:
+        """Encode a category name; unknown categories map to -1."""
+        return self.category_codes.get(category, -1)
+    
+    def encode_gender(self, gender: Optional[str]) -> int:
+        """Encode a gender; None maps to 0 and unknown values map to -1."""
+        if gender is None:
+            return 0
+        return self.gender_codes.get(gender.lower(), -1)
+    
+    def encode_users(self, users: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert a list of user dictionaries into columnar arrays.
+        
+        Args:
+            users: List of user dictionaries (age, income, category, gender)
+            
+        Returns:
+            Tuple of (ages, incomes, category_codes, gender_codes) arrays
+        """
+        ages = np.array([u['age'] for u in users], dtype=np.float64)
+        incomes = np.array([u['income'] for u in users], dtype=np.float64)
+        category_codes = np.array([self.encode_category(u['category']) for u in users], dtype=np.int64)
+        gender_codes = np.array([self.encode_gender(u.get('gender')) for u in users], dtype=np.int64)
+        return ages, incomes, category_codes, gender_codes
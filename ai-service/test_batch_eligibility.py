@@ -0,0 +1,83 @@
+"""
+Test file for batch eligibility
+Checks EligibilityService.check_many, the record decoder and the NDJSON batch endpoint
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import itertools
+import json
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from eligibility_service import EligibilityService
+from record_stream import JSONRecordDecoder, InvalidRecord
+from scheme_catalog import SAMPLE_SCHEMES
+
+PROFILES = [
+    {'age': age, 'income': income, 'category': category, 'state': 'Bihar', 'gender': gender}
+    for age, income, category, gender in itertools.product(
+        [0, 5, 18, 25, 45, 70, 110],
+        [0, 50000, 99999, 150000, 200000, 300000, 600000],
+        ['General', 'SC', 'EWS', 'Minority'],
+        [None, 'Female', 'female', 'Male']
+    )
+]
+
+
+def test_check_many_matches_check():
+    """Batched scoring should give exactly the single-profile responses"""
+    service = EligibilityService(SAMPLE_SCHEMES)
+    assert service.check_many(PROFILES) == [service.check(p) for p in PROFILES]
+    assert service.check_many([]) == []
+
+
+def test_decoder_handles_split_chunks():
+    """Records split at every byte boundary should decode identically"""
+    array_body = json.dumps([{'a': 1}, {'b': 'é'}, 3, [4]]).encode('utf-8')
+    ndjson_body = b'{"a": 1}\n\nnot json\n{"b": "\xc3\xa9"}\n'
+    for body, expected in [(array_body, [{'a': 1}, {'b': 'é'}, 3, [4]]), (b' [ ] ', [])]:
+        for split in range(len(body) + 1):
+            decoder = JSONRecordDecoder()
+            records = decoder.feed(body[:split]) + decoder.feed(body[split:]) + decoder.close()
+            assert records == expected, (split, records)
+
+    decoder = JSONRecordDecoder()
+    records = decoder.feed(ndjson_body[:5]) + decoder.feed(ndjson_body[5:]) + decoder.close()
+    assert records[0] == {'a': 1} and records[2] == {'b': 'é'}
+    assert isinstance(records[1], InvalidRecord)
+
+
+def test_batch_endpoint_streams_ndjson():
+    client = TestClient(app_module.app)
+    profiles = PROFILES[:40]
+    body = '\n'.join(json.dumps(p) for p in profiles[:20]) + '\n{"age": "x"}\n' + \
+        '\n'.join(json.dumps(p) for p in profiles[20:])
+
+    response = client.post('/api/check-eligibility/batch', content=body)
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['index'] for line in lines] == list(range(41))
+    assert lines[20]['success'] is False
+
+    expected = [client.post('/api/check-eligibility', json=p).json() for p in profiles]
+    results = [{k: v for k, v in line.items() if k != 'index'} for line in lines[:20] + lines[21:]]
+    assert results == expected
+
+    response = client.post('/api/check-eligibility/batch', json=profiles[:3])
+    assert [json.loads(line)['index'] for line in response.text.splitlines()] == [0, 1, 2]
+
+    response = client.post('/api/check-eligibility/batch', content='[' + json.dumps(profiles[0]) + ' oops')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]['success'] is True and lines[-1]['success'] is False
+
+
+if __name__ == "__main__":
+    test_check_many_matches_check()
+    test_decoder_handles_split_chunks()
+    test_batch_endpoint_streams_ndjson()
+    print("Batch eligibility tests completed successfully!")
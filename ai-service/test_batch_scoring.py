@@ -0,0 +1,63 @@
+"""
+Test file for batch scoring
+Checks the vectorized probability matrix against the scalar Statistical Engine
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import itertools
+import numpy as np
+
+from statistical_engine import StatisticalEngine
+
+SCHEMES = [
+    {'category': 'Agriculture',
+     'criteria': {'min_age': 18, 'max_age': 100, 'max_income': 200000, 'categories': ['All'], 'states': ['All']}},
+    {'category': 'Education',
+     'criteria': {'min_age': 5, 'max_age': 30, 'max_income': 250000,
+                  'categories': ['SC', 'ST', 'OBC', 'EWS'], 'states': ['All']}},
+    {'category': 'Social Welfare',
+     'criteria': {'min_age': 0, 'max_age': 21, 'max_income': 500000, 'categories': ['All'],
+                  'states': ['All'], 'gender': 'Female'}},
+    {'category': 'Healthcare',
+     'criteria': {'min_age': 60, 'max_age': 60, 'max_income': 0, 'categories': ['Minority'], 'states': ['All']}},
+    {'category': 'Finance', 'criteria': {}},
+]
+
+
+def test_batch_probability_matches_scalar():
+    """Every (user, scheme) pair should match calculate_overall_probability"""
+    users = [
+        {'age': age, 'income': income, 'category': category, 'gender': gender}
+        for age, income, category, gender in itertools.product(
+            [0, 4, 5, 18, 21, 45, 60, 100, 120],
+            [0, 50000, 199999.5, 200000, 250001, 1e7],
+            ['General', 'SC', 'EWS', 'Minority', 'Unknown'],
+            [None, 'Female', 'female', 'Male', 'Other', 'Unlisted']
+        )
+    ]
+    matrix = StatisticalEngine.compile_scheme_matrix(SCHEMES)
+    result = StatisticalEngine.calculate_batch_probability(*matrix.encode_users(users), matrix)
+
+    assert result.shape == (len(users), len(SCHEMES))
+    for i, user in enumerate(users):
+        for j, scheme in enumerate(SCHEMES):
+            expected = StatisticalEngine.calculate_overall_probability(
+                user, scheme['criteria'], scheme['category']
+            )
+            assert abs(result[i, j] - expected) < 1e-9, (user, scheme, result[i, j], expected)
+
+
+def test_batch_probability_empty_inputs():
+    matrix = StatisticalEngine.compile_scheme_matrix(SCHEMES)
+    result = StatisticalEngine.calculate_batch_probability(
+        np.array([]), np.array([]), np.array([], dtype=np.int64), np.array([], dtype=np.int64), matrix
+    )
+    assert result.shape == (0, len(SCHEMES))
+
+
+if __name__ == "__main__":
+    test_batch_probability_matches_scalar()
+    test_batch_probability_empty_inputs()
+    print("Batch scoring tests completed successfully!")
@@ -0,0 +1,108 @@
+"""
+Test file for the cache store
+Covers LRU eviction, TTL expiry, the SQLite tier, tier promotion and the
+version-scoped eligibility result cache
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from cache_store import LRUCache, SQLiteCache, TieredCache, VersionedCache
+
+PROFILE = {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'}
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+    short = LRUCache(max_entries=2, ttl=0.05)
+    short.set('a', 1)
+    time.sleep(0.06)
+    assert short.get('a') is None
+    assert short.stats()['expirations'] == 1
+
+
+def test_sqlite_tier_is_shared_and_promoted():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.db')
+        writer = SQLiteCache(path, max_entries=3)
+        writer.TRIM_INTERVAL = 1
+        for i in range(5):
+            writer.set(f'k{i}', {'value': i})
+        assert writer.stats()['entries'] == 3
+
+        # A second process/worker sees the same entries
+        tiered = TieredCache(LRUCache(max_entries=4), SQLiteCache(path))
+        assert tiered.get('k4') == {'value': 4}
+        assert tiered.memory.get('k4') == {'value': 4}
+        assert tiered.get('k0') is None
+        assert tiered.stats()['disk']['hits'] == 1
+        writer.close()
+        tiered.close()
+
+
+def test_versioned_cache_drops_other_versions():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.db')
+        catalog = {'version': 'v1'}
+        cache = VersionedCache(LRUCache(max_entries=8), SQLiteCache(path), lambda: catalog['version'])
+        other_worker = VersionedCache(LRUCache(max_entries=8), SQLiteCache(path), lambda: catalog['version'])
+
+        cache.set('profile', 'result-v1', 'v1')
+        assert cache.get('profile') == 'result-v1'
+        assert other_worker.get('profile') == 'result-v1'
+
+        # After a reload, old results are neither served nor kept
+        catalog['version'] = 'v2'
+        assert cache.get('profile') is None
+        assert cache.tiers.memory.stats()['entries'] == 0
+        assert cache.disk.stats()['entries'] == 0
+        cache.set('profile', 'late-v1-result', 'v1')
+        assert cache.get('profile') is None
+        cache.set('profile', 'result-v2', 'v2')
+        assert other_worker.get('profile') == 'result-v2'
+        stats = cache.stats()
+        assert (stats['version'], stats['invalidations']) == ('v2', 1)
+        cache.close()
+        other_worker.close()
+
+
+def test_eligibility_endpoint_serves_cached_results():
+    client = TestClient(app_module.app)
+    original = app_module.ELIGIBILITY_CACHE
+    app_module.ELIGIBILITY_CACHE = VersionedCache(
+        LRUCache(max_entries=16), None, lambda: app_module.CATALOG.snapshot.version
+    )
+    try:
+        first = client.post('/api/check-eligibility', json=PROFILE)
+        # Same normalized profile (income as int vs float)
+        second = client.post('/api/check-eligibility', json={**PROFILE, 'income': 80000.0})
+        stats = client.get('/api/check-eligibility/cache/stats').json()['data']
+    finally:
+        app_module.ELIGIBILITY_CACHE = original
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert second.headers['content-type'] == 'application/json'
+    assert (stats['memory']['hits'], stats['memory']['misses'], stats['hitRatio']) == (1, 1, 0.5)
+    assert stats['version'] == app_module.CATALOG.snapshot.version
+
+
+if __name__ == "__main__":
+    test_lru_evicts_least_recently_used_and_expires()
+    test_sqlite_tier_is_shared_and_promoted()
+    test_versioned_cache_drops_other_versions()
+    test_eligibility_endpoint_serves_cached_results()
+    print("Cache store tests completed successfully!")
@@ -0,0 +1,129 @@
+"""
+Test file for the hot-reloadable scheme catalog
+Covers JSON/SQLite sources, versioned snapshots, atomic reload and the admin endpoints
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import copy
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from catalog_manager import CatalogError, CatalogManager, catalog_version, write_catalog
+from eligibility_service import EligibilityService
+from scheme_catalog import SAMPLE_SCHEMES
+
+PROFILE = {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'}
+
+
+def test_sources_and_reload():
+    with tempfile.TemporaryDirectory() as tmp:
+        for filename in ('schemes.json', 'schemes.db'):
+            path = os.path.join(tmp, filename)
+            write_catalog(SAMPLE_SCHEMES, path)
+            manager = CatalogManager(path)
+            assert manager.snapshot.version == catalog_version(SAMPLE_SCHEMES) == CatalogManager().snapshot.version
+            assert manager.snapshot.service.check(PROFILE) == EligibilityService(SAMPLE_SCHEMES).check(PROFILE)
+
+            # Unchanged content keeps the snapshot
+            assert manager.reload() == (manager.snapshot, False)
+
+            # A catalog entry can carry its own profile metadata
+            schemes = copy.deepcopy(SAMPLE_SCHEMES)
+            schemes[1]['profile'] = {'impact_score': 0.5,
+                                     'expected_benefit': {'min': 1, 'max': 2, 'frequency': 'Monthly'}}
+            write_catalog(schemes, path)
+            os.utime(path, ns=(0, 0))
+            assert manager.source_changed()
+
+            old = manager.snapshot
+            snapshot, changed = manager.reload()
+            assert changed and snapshot is manager.snapshot and snapshot.version != old.version
+            ayushman = next(s for s in snapshot.service.check(PROFILE)['schemes'] if s['name'] == 'Ayushman Bharat')
+            assert ayushman['impactScore'] == 0.5
+            assert ayushman['statisticalAnalysis']['expectedBenefit'] == '₹1 - ₹2 (Monthly)'
+            # A request that started on the old snapshot still sees the old catalog
+            assert old.service.check(PROFILE) == EligibilityService(SAMPLE_SCHEMES).check(PROFILE)
+
+            # Broken sources are rejected and the current snapshot stays
+            broken = copy.deepcopy(schemes)
+            del broken[0]['criteria']['max_income']
+            write_catalog(broken, path)
+            try:
+                manager.reload()
+                raise AssertionError("expected CatalogError")
+            except CatalogError:
+                pass
+            assert manager.snapshot is snapshot and 'max_income' in manager.info()['lastError']
+
+
+def test_admin_reload_endpoint_and_response_version():
+    original = (app_module.CATALOG, app_module.ADMIN_TOKEN)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schemes.json')
+        write_catalog(SAMPLE_SCHEMES, path)
+        app_module.CATALOG = CatalogManager(path)
+        app_module.ADMIN_TOKEN = 'secret'
+        try:
+            client = TestClient(app_module.app)
+            first = client.post('/api/check-eligibility', json=PROFILE).json()
+            assert first['catalogVersion'] == catalog_version(SAMPLE_SCHEMES)
+
+            write_catalog(SAMPLE_SCHEMES[:3], path)
+            assert client.post('/api/admin/catalog/reload').status_code == 403
+            response = client.post('/api/admin/catalog/reload', headers={'X-Admin-Token': 'secret'})
+            assert response.json()['changed'] is True and response.json()['schemeCount'] == 3
+
+            second = client.post('/api/check-eligibility', json=PROFILE).json()
+            assert second['catalogVersion'] == catalog_version(SAMPLE_SCHEMES[:3])
+            assert second['totalEligible'] < first['totalEligible']
+
+            info = client.get('/api/admin/catalog', headers={'X-Admin-Token': 'secret'}).json()
+            assert info['catalogVersion'] == second['catalogVersion'] and info['reloadCount'] == 1
+        finally:
+            app_module.CATALOG, app_module.ADMIN_TOKEN = original
+
+
+def test_mistyped_catalog_values_are_rejected():
+    mistyped = [
+        ('criteria', 'gender', 1),
+        ('criteria', 'states', ['Bihar', 7]),
+        (None, 'requirements', 'Aadhaar card'),
+        (None, 'profile', {'expected_benefit': {'min': 1}}),
+    ]
+    original = (app_module.CATALOG, app_module.ADMIN_TOKEN)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schemes.json')
+        for section, field, value in mistyped:
+            schemes = copy.deepcopy(SAMPLE_SCHEMES)
+            (schemes[0][section] if section else schemes[0])[field] = value
+            write_catalog(schemes, path)
+            try:
+                CatalogManager(path)
+                raise AssertionError(f"expected CatalogError for {field}={value!r}")
+            except CatalogError as e:
+                assert field in str(e)
+
+        write_catalog(SAMPLE_SCHEMES, path)
+        app_module.CATALOG = CatalogManager(path)
+        app_module.ADMIN_TOKEN = 'secret'
+        try:
+            schemes = copy.deepcopy(SAMPLE_SCHEMES)
+            schemes[0]['criteria']['gender'] = 1
+            write_catalog(schemes, path)
+            client = TestClient(app_module.app)
+            response = client.post('/api/admin/catalog/reload', headers={'X-Admin-Token': 'secret'})
+            assert response.status_code == 422 and 'gender' in response.json()['detail']
+            assert app_module.CATALOG.snapshot.version == catalog_version(SAMPLE_SCHEMES)
+        finally:
+            app_module.CATALOG, app_module.ADMIN_TOKEN = original
+
+
+if __name__ == "__main__":
+    test_sources_and_reload()
+    test_admin_reload_endpoint_and_response_version()
+    test_mistyped_catalog_values_are_rejected()
+    print("Catalog manager tests completed successfully!")
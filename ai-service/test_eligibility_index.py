@@ -0,0 +1,85 @@
+"""
+Test file for the eligibility index
+Compares index candidates with a linear scan over the same hard filters
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import itertools
+import random
+
+from eligibility_index import EligibilityIndex, ThresholdIndex
+
+
+def linear_scan(schemes, age, income, category, state, gender):
+    """Reference implementation of the check_eligibility filters"""
+    ids = []
+    for scheme_id, scheme in enumerate(schemes):
+        criteria = scheme['criteria']
+        if age < criteria['min_age'] or age > criteria['max_age']:
+            continue
+        if income > criteria['max_income']:
+            continue
+        if 'All' not in criteria['categories'] and category not in criteria['categories']:
+            continue
+        if 'gender' in criteria and gender:
+            if criteria['gender'] != gender:
+                continue
+        if 'All' not in criteria['states'] and state not in criteria['states']:
+            continue
+        ids.append(scheme_id)
+    return ids
+
+
+def random_catalog(size, seed=7):
+    rng = random.Random(seed)
+    schemes = []
+    for i in range(size):
+        min_age = rng.randint(0, 60)
+        criteria = {
+            'min_age': min_age,
+            'max_age': rng.randint(min_age, 120),
+            'max_income': rng.choice([50000, 100000, 250000, 500000, 1000000]),
+            'categories': rng.choice([['All'], ['SC', 'ST'], ['OBC', 'EWS'], ['General']]),
+            'states': rng.choice([['All'], ['All'], ['Bihar'], ['Kerala', 'Delhi']]),
+        }
+        if rng.random() < 0.2:
+            criteria['gender'] = rng.choice(['Female', 'Male'])
+        schemes.append({
+            'name': f'Scheme {i}',
+            'description': f'Synthetic scheme {i}',
+            'category': rng.choice(['Healthcare', 'Education', 'Housing', 'Agriculture', 'Finance']),
+            'benefits': 'Varies',
+            'criteria': criteria,
+        })
+    return schemes
+
+
+def test_index_matches_linear_scan():
+    """Candidates should equal the linear scan for every profile"""
+    schemes = random_catalog(300)
+    index = EligibilityIndex(schemes)
+    for age, income, category, state, gender in itertools.product(
+        [-5, 0, 17, 18, 45, 60, 120, 150],
+        [0, 50000, 50001, 250000, 1000000, 2000000],
+        ['SC', 'General', 'EWS', 'Unknown'],
+        ['Bihar', 'Delhi', 'Goa'],
+        [None, 'Female', 'Male', 'Other']
+    ):
+        expected = linear_scan(schemes, age, income, category, state, gender)
+        assert index.candidates(age, income, category, state, gender) == expected
+
+
+def test_threshold_index_bounds():
+    index = ThresholdIndex([5, 1, 3, 3, 9])
+    assert EligibilityIndex.mask_to_ids(index.at_most(3)) == [1, 2, 3]
+    assert EligibilityIndex.mask_to_ids(index.at_least(3)) == [0, 2, 3, 4]
+    assert index.at_most(0) == 0
+    assert EligibilityIndex.mask_to_ids(index.at_least(-1)) == [0, 1, 2, 3, 4]
+
+
+if __name__ == "__main__":
+    test_index_matches_linear_scan()
+    test_threshold_index_bounds()
+    print("Eligibility index tests completed successfully!")
@@ -0,0 +1,109 @@
+"""
+Test file for the single-pass OCR field extractor
+Covers each field type, inline validation, offsets and the legacy result keys
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+
+from field_extractor import FieldExtractor, verhoeff_valid
+from ocr_processing import extract_fields
+
+
+def valid_aadhaar(prefix: str) -> str:
+    return next(prefix + str(d) for d in range(10) if verhoeff_valid(prefix + str(d)))
+
+
+AADHAAR = valid_aadhaar("23456789012")
+
+SAMPLE = f"""GOVERNMENT OF INDIA
+Name: Asha Devi  Email: asha.devi@example.in
+Aadhaar No: {AADHAAR[:4]} {AADHAAR[4:8]} {AADHAAR[8:]}  Old: {AADHAAR[:11]}{(int(AADHAAR[11]) + 1) % 10}
+PAN: ABCPE1234F  Bad PAN: ABCXE1234F
+Mobile: +91 9876543210, landline 0801234567
+Voter ID: XYZ1234567  IFSC: SBIN0001234
+Ration Card No: KA/12/345678  Ration card holder
+Address: 12 MG Road, Bengaluru - 560001  PIN Code: 110 001
+Annual Income: Rs. 2,50,000/-  Loan: ₹1.5 lakh
+"""
+
+
+def test_extracts_and_validates_every_field():
+    matches = FieldExtractor().extract(SAMPLE)
+    values = [(match.field, match.value) for match in matches]
+    assert values == [
+        ('email', 'asha.devi@example.in'),
+        ('aadhaar', AADHAAR),
+        ('pan', 'ABCPE1234F'),
+        ('phone', '9876543210'),
+        ('voter_id', 'XYZ1234567'),
+        ('ifsc', 'SBIN0001234'),
+        ('ration_card', 'KA/12/345678'),
+        ('pin_code', '560001'),
+        ('pin_code', '110001'),
+        ('income', 250000.0),
+        ('income', 150000.0)
+    ]
+    for match in matches:
+        assert SAMPLE[match.start:match.end] == match.text
+    assert matches[1].text == f"{AADHAAR[:4]} {AADHAAR[4:8]} {AADHAAR[8:]}"
+
+
+def test_single_pass_matches_per_field_scans():
+    rng = random.Random(5)
+    words = SAMPLE.split() + ['the', 'scheme', '12345', 'office', '\n', '9876543210@upi.in', 'ABCPE1234F@co.in']
+    text = ' '.join(rng.choice(words) for _ in range(5000))
+
+    combined = [tuple(match) for match in FieldExtractor().extract(text)]
+    separate = sorted(
+        (tuple(match) for field in FieldExtractor.FIELDS for match in FieldExtractor([field]).extract(text)),
+        key=lambda match: match[3]
+    )
+    assert combined == separate
+
+    try:
+        FieldExtractor(['passport'])
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+
+def test_extract_fields_keeps_legacy_keys():
+    extracted = extract_fields(SAMPLE)
+    assert extracted['raw_text'] == SAMPLE
+    assert extracted['email'] == ['asha.devi@example.in']
+    assert extracted['phone'] == ['9876543210']
+    # Legacy lists keep the matched text; "fields" carries the normalized value
+    assert extracted['aadhaar'] == [f"{AADHAAR[:4]} {AADHAAR[4:8]} {AADHAAR[8:]}"]
+    assert [match['value'] for match in extracted['fields'] if match['field'] == 'aadhaar'] == [AADHAAR]
+    assert extracted['pan'] == ['ABCPE1234F']
+    assert extracted['income'] == [250000.0, 150000.0]
+    assert len(extracted['fields']) == 11
+    assert extracted['fields'][0] == {
+        'field': 'email', 'value': 'asha.devi@example.in', 'text': 'asha.devi@example.in',
+        'start': SAMPLE.index('asha.devi@'), 'end': SAMPLE.index('asha.devi@') + 20
+    }
+
+
+def test_overlapping_fields_are_all_found():
+    text = f"Pay to 9876543210@upi.in or {AADHAAR}@mail.in"
+    values = [(match.field, match.value) for match in FieldExtractor().extract(text)]
+    assert values == [
+        ('phone', '9876543210'),
+        ('email', '9876543210@upi.in'),
+        ('aadhaar', AADHAAR),
+        ('email', f'{AADHAAR}@mail.in')
+    ]
+    extracted = extract_fields(text)
+    assert extracted['phone'] == ['9876543210']
+    assert extracted['email'] == ['9876543210@upi.in', f'{AADHAAR}@mail.in']
+
+
+if __name__ == "__main__":
+    test_extracts_and_validates_every_field()
+    test_single_pass_matches_per_field_scans()
+    test_extract_fields_keeps_legacy_keys()
+    test_overlapping_fields_are_all_found()
+    print("Field extractor tests completed successfully!")
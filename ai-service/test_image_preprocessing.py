@@ -0,0 +1,65 @@
+"""
+Test file for the image preprocessing pipeline
+Covers JPEG draft decoding, downscaling, binarization and page cropping
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import io
+
+from PIL import Image, ImageDraw
+
+from image_preprocessing import ImagePreprocessor, PreprocessConfig, preprocess_image
+
+
+def make_photo(size=(3000, 4000), fmt='JPEG') -> bytes:
+    """Bright page with dark text lines on a darker background."""
+    photo = Image.new('RGB', size, (80, 80, 80))
+    draw = ImageDraw.Draw(photo)
+    page = (size[0] // 4, size[1] // 4, size[0] * 3 // 4, size[1] * 3 // 4)
+    draw.rectangle(page, fill=(240, 240, 240))
+    for y in range(page[1] + 100, page[3] - 100, 120):
+        draw.rectangle((page[0] + 80, y, page[2] - 80, y + 30), fill=(20, 20, 20))
+    buffer = io.BytesIO()
+    photo.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_pipeline_shrinks_and_binarizes():
+    config = PreprocessConfig(target_dpi=100)
+    image, timings = preprocess_image(make_photo(), config)
+
+    assert max(image.size) <= config.max_side
+    assert image.mode == 'L'
+    histogram = image.histogram()
+    assert sum(histogram) == histogram[0] + histogram[255]
+    assert list(timings) == ['decode', 'orient', 'grayscale', 'downscale', 'binarize']
+
+    # JPEGs are decoded at reduced scale rather than at full size
+    decoded = ImagePreprocessor.decode(make_photo(), config)
+    assert max(decoded.size) < 4000
+
+
+def test_disabled_config_returns_original_image():
+    image, timings = preprocess_image(make_photo(size=(600, 800), fmt='PNG'), PreprocessConfig(enabled=False))
+    assert image.size == (600, 800) and image.mode == 'RGB'
+    assert list(timings) == ['decode']
+    assert PreprocessConfig(enabled=False).fingerprint() != PreprocessConfig().fingerprint()
+
+
+def test_crop_finds_page():
+    image = Image.open(io.BytesIO(make_photo(size=(1200, 1600), fmt='PNG')))
+    left, top, right, bottom = ImagePreprocessor.find_document_box(image)
+    assert abs(left - 300) <= 30 and abs(top - 400) <= 30
+    assert abs(right - 900) <= 30 and abs(bottom - 1200) <= 30
+
+    # A plain image has no page to crop
+    assert ImagePreprocessor.find_document_box(Image.new('L', (400, 400), 200)) is None
+
+
+if __name__ == "__main__":
+    test_pipeline_shrinks_and_binarizes()
+    test_disabled_config_returns_original_image()
+    test_crop_finds_page()
+    print("Image preprocessing tests completed successfully!")
@@ -0,0 +1,79 @@
+"""
+Test file for the in-process metrics and the /metrics endpoint
+Covers histogram bucketing, the Prometheus text format and per-stage recording
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from metrics import MetricsRegistry, observe_stages
+from ocr_jobs import OCRJobStore
+
+PROFILE = {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'}
+
+
+def test_histogram_and_text_format():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.001, 0.01))
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    registry.gauge("queue_depth", "Queue depth", lambda: 3)
+
+    latency.observe(0.0005, "filter")
+    latency.observe(0.001, "filter")   # Bucket bounds are inclusive
+    latency.observe(0.5, "filter")
+    observe_stages(latency, {"rank": 2.0})
+    requests.inc('/a"b')
+    requests.inc('/a"b')
+
+    text = registry.render()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="filter",le="0.001"} 2' in text
+    assert 'stage_seconds_bucket{stage="filter",le="0.01"} 2' in text
+    assert 'stage_seconds_bucket{stage="filter",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="filter"} 3' in text
+    assert 'stage_seconds_bucket{stage="rank",le="0.01"} 1' in text
+    assert 'requests_total{route="/a\\"b"} 2' in text
+    assert 'queue_depth 3' in text
+    assert text.endswith('\n')
+
+
+def test_metrics_endpoint_records_stages_and_routes():
+    runner = app_module.OCR_JOB_RUNNER
+    original = runner.store
+    with tempfile.TemporaryDirectory() as tmp:
+        # The job lookup and the job gauges would otherwise create the default database
+        runner.store = OCRJobStore(os.path.join(tmp, 'jobs.db'))
+        try:
+            client = TestClient(app_module.app)
+            before = app_module.ELIGIBILITY_STAGES.count('rank')
+
+            assert client.post('/api/check-eligibility', json=PROFILE).status_code == 200
+            assert client.get('/api/ocr/jobs/missing').status_code == 404
+            assert app_module.ELIGIBILITY_STAGES.count('rank') == before + 1
+
+            response = client.get('/metrics')
+            assert response.status_code == 200
+            assert response.headers['content-type'].startswith('text/plain')
+            text = response.text
+            for stage in ('filter', 'rank', 'breakdown', 'explanation', 'profile', 'serialize'):
+                assert f'eligibility_stage_duration_seconds_count{{stage="{stage}"}}' in text
+            # Route templates, not raw paths
+            assert 'http_requests_total{method="GET",route="/api/ocr/jobs/{job_id}",status="404"}' in text
+            assert 'http_requests_total{method="POST",route="/api/check-eligibility",status="200"}' in text
+            assert 'ocr_cache_entries{tier="memory"}' in text
+            assert 'ocr_pool_pending 0' in text
+            assert 'scheme_catalog_schemes' in text
+        finally:
+            runner.store.close()
+            runner.store = original
+
+
+if __name__ == "__main__":
+    test_histogram_and_text_format()
+    test_metrics_endpoint_records_stages_and_routes()
+    print("Metrics tests completed successfully!")
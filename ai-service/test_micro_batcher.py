@@ -0,0 +1,77 @@
+"""
+Test file for the micro-batcher and batched /api/check-eligibility scoring
+Covers batch formation, error isolation and byte-identical responses
+"""
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from micro_batcher import MicroBatcher
+
+PROFILES = [
+    {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'},
+    {'age': 67, 'income': 40000, 'category': 'General', 'state': 'Kerala', 'gender': 'Male'},
+    {'age': 22, 'income': 250000, 'category': 'OBC', 'state': 'Punjab', 'gender': None},
+    {'age': 45, 'income': 120000, 'category': 'ST', 'state': 'Odisha', 'gender': 'Female'},
+]
+
+
+def test_batches_by_size_and_window():
+    batches = []
+
+    def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(double, max_batch=4, window=0.01)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        assert results == [i * 2 for i in range(10)]
+        # A lone late item is flushed by the window
+        assert await batcher.submit(7) == 14
+        return batcher
+
+    batcher = asyncio.run(scenario())
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9], [7]]
+    assert (batcher.batches, batcher.items) == (4, 11)
+
+
+def test_failing_item_only_fails_its_caller():
+    def invert(items):
+        return [1 / item for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(invert, max_batch=8, window=0.005)
+        return await asyncio.gather(*(batcher.submit(i) for i in (1, 0, 4)), return_exceptions=True)
+
+    first, failed, last = asyncio.run(scenario())
+    assert first == 1.0 and last == 0.25
+    assert isinstance(failed, ZeroDivisionError)
+
+
+def test_batched_endpoint_matches_inline():
+    client = TestClient(app_module.app)
+    inline = [client.post('/api/check-eligibility', json=profile).content for profile in PROFILES]
+
+    snapshot = app_module.CATALOG.snapshot
+    assert snapshot.service.check_many_json(PROFILES, {"catalogVersion": snapshot.version}) == inline
+
+    original = app_module.ELIGIBILITY_BATCHER
+    app_module.ELIGIBILITY_BATCHER = MicroBatcher(app_module.score_eligibility_batch, max_batch=16, window=0.002)
+    try:
+        batched = [client.post('/api/check-eligibility', json=profile) for profile in PROFILES]
+    finally:
+        app_module.ELIGIBILITY_BATCHER = original
+    assert all(response.status_code == 200 for response in batched)
+    assert [response.content for response in batched] == inline
+
+
+if __name__ == "__main__":
+    test_batches_by_size_and_window()
+    test_failing_item_only_fails_its_caller()
+    test_batched_endpoint_matches_inline()
+    print("Micro-batcher tests completed successfully!")
@@ -0,0 +1,175 @@
+"""
+Test file for the asynchronous OCR job queue
+Covers claiming, lease-based crash recovery, TTL cleanup and the job endpoints
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import sqlite3
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from ocr_jobs import OCRJobRunner, OCRJobStore, RetryLater
+from ocr_pool import OCRWorkerPool
+
+
+def test_store_claims_recovers_and_expires():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = OCRJobStore(os.path.join(tmp, 'jobs.db'), ttl=0.2, lease=0.1, max_attempts=2)
+        first = store.submit(b'first')
+        second = store.submit(b'second')
+
+        assert store.claim() == (first, b'first')
+        assert store.claim() == (second, b'second')
+        assert store.claim() is None
+        store.complete(second, {'raw_text': 'ok'})
+        assert store.get(second)['data'] == {'raw_text': 'ok'}
+
+        # The first worker "crashed": after the lease the job is handed out again,
+        # and once it has died max_attempts times it is failed instead
+        time.sleep(0.15)
+        assert store.claim() == (first, b'first')
+        assert store.get(first)['attempts'] == 2
+        time.sleep(0.15)
+        assert store.claim() is None
+        assert store.get(first)['status'] == 'failed'
+
+        # A crash reported by the process function counts as an attempt too
+        third = store.submit(b'third')
+        assert store.claim() == (third, b'third')
+        store.requeue(third, count_attempt=True)
+        assert store.claim() == (third, b'third')
+        store.requeue(third, count_attempt=True)
+        assert store.claim() is None
+        assert store.get(third)['status'] == 'failed'
+
+        # A store reopened on the same file (service restart) sees the jobs
+        store.close()
+        reopened = OCRJobStore(os.path.join(tmp, 'jobs.db'), ttl=0.2)
+        assert reopened.counts()['failed'] == 2
+        time.sleep(0.25)
+        assert reopened.get(second) is None
+        assert reopened.cleanup() == 3
+        reopened.close()
+
+
+def test_job_endpoints_submit_and_long_poll():
+    calls = []
+
+    async def fake_process(contents):
+        calls.append(contents)
+        if len(calls) == 1:
+            raise RetryLater()
+        await asyncio.sleep(0.05)
+        if contents == b'broken':
+            raise ValueError('cannot identify image file')
+        return {'raw_text': contents.decode(), 'email': [], 'phone': [], 'aadhaar': [], 'pan': []}
+
+    runner = app_module.OCR_JOB_RUNNER
+    original = (runner.store, runner.process, runner.POLL_INTERVAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        runner.store = OCRJobStore(os.path.join(tmp, 'jobs.db'))
+        runner.process = fake_process
+        runner.POLL_INTERVAL = 0.05
+        try:
+            with TestClient(app_module.app) as client:
+                submitted = client.post('/api/ocr/jobs', files={'file': ('doc.png', b'scan one', 'image/png')})
+                assert submitted.status_code == 202
+                body = submitted.json()
+                assert body['status'] == 'queued'
+
+                job = client.get(body['statusUrl'], params={'wait': 5}).json()
+                assert job['status'] == 'done'
+                assert job['data']['raw_text'] == 'scan one'
+                assert calls == [b'scan one', b'scan one']
+
+                job_id = client.post('/api/ocr/jobs', files={'file': ('doc.png', b'broken', 'image/png')}).json()['jobId']
+                job = client.get(f'/api/ocr/jobs/{job_id}', params={'wait': 5}).json()
+                assert job['status'] == 'failed' and 'cannot identify' in job['error']
+
+                assert client.get('/api/ocr/jobs/unknown').status_code == 404
+            runner.store.close()
+        finally:
+            runner.store, runner.process, runner.POLL_INTERVAL = original
+
+
+def test_runner_survives_store_errors():
+    class FlakyStore(OCRJobStore):
+        failures = 2
+
+        def claim(self):
+            if self.failures:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return super().claim()
+
+    async def process(contents):
+        return {'raw_text': contents.decode()}
+
+    async def scenario(store):
+        runner = OCRJobRunner(store, process, concurrency=1)
+        runner.POLL_INTERVAL = 0.02
+        runner.start()
+        job_id = store.submit(b'after the lock')
+        runner.notify()
+        try:
+            return await runner.wait(job_id, timeout=5)
+        finally:
+            await runner.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FlakyStore(os.path.join(tmp, 'jobs.db'))
+        job = asyncio.run(scenario(store))
+        assert job['status'] == 'done' and job['data'] == {'raw_text': 'after the lock'}
+        assert store.failures == 0
+        store.close()
+
+
+def crash_once(contents, config=None):
+    """Stand-in for run_ocr whose worker process dies the first time (contents is a marker path)."""
+    marker = contents.decode()
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return {'raw_text': 'recovered'}, {}
+
+
+def test_job_retried_after_worker_crash():
+    async def scenario(store, marker):
+        runner = OCRJobRunner(store, app_module.process_ocr_job, concurrency=1)
+        runner.POLL_INTERVAL = 0.02
+        runner.start()
+        job_id = store.submit(marker.encode())
+        runner.notify()
+        try:
+            return await runner.wait(job_id, timeout=30)
+        finally:
+            await runner.stop()
+
+    original = (app_module.OCR_POOL, app_module.run_ocr)
+    with tempfile.TemporaryDirectory() as tmp:
+        app_module.OCR_POOL = OCRWorkerPool(max_workers=1)
+        app_module.run_ocr = crash_once
+        try:
+            store = OCRJobStore(os.path.join(tmp, 'jobs.db'), max_attempts=3)
+            job = asyncio.run(scenario(store, os.path.join(tmp, 'crashed')))
+            # The first worker died with the job; the retry on a fresh pool succeeds
+            assert job['status'] == 'done' and job['data'] == {'raw_text': 'recovered'}
+            assert job['attempts'] == 2
+            store.close()
+        finally:
+            app_module.OCR_POOL.shutdown()
+            app_module.OCR_POOL, app_module.run_ocr = original
+
+
+if __name__ == "__main__":
+    test_store_claims_recovers_and_expires()
+    test_job_endpoints_submit_and_long_poll()
+    test_runner_survives_store_errors()
+    test_job_retried_after_worker_crash()
+    print("OCR job queue tests completed successfully!")
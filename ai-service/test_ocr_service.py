@@ -0,0 +1,183 @@
+"""
+Test file for the OCR service
+Covers the bounded OCR process pool, the /api/ocr backpressure response
+and multi-page OCR
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import glob
+import io
+import json
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app as app_module
+from ocr_pool import OCRWorkerPool, OCRQueueFull
+from ocr_processing import count_pages, load_page, merge_page_fields
+from image_preprocessing import PreprocessConfig
+
+
+def make_tiff(page_count: int) -> bytes:
+    frames = [Image.new('L', (64, 64), 40 * i) for i in range(page_count)]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, format='TIFF', save_all=True, append_images=frames[1:])
+    return buffer.getvalue()
+
+
+def fake_ocr_page(contents, page, config):
+    """Stands in for run_ocr_page (no tesseract here); runs in the OCR pool."""
+    # The document arrives as the path of the spooled upload, not its bytes
+    with open(contents, 'rb') as f:
+        assert count_pages(f.read()) > page
+    time.sleep(0.2 if page == 0 else 0.01)
+    return {
+        'raw_text': f'page {page + 1}',
+        'email': [],
+        'phone': ['9876543210'],
+        'aadhaar': ['1234 5678 9012' if page % 2 else '123456789012'],
+        'pan': [f'ABCDE{1000 + page}F']
+    }, {'ocr': 1.0}
+
+
+def test_pool_rejects_when_queue_is_full():
+    async def scenario():
+        pool = OCRWorkerPool(max_workers=1, max_pending=2)
+        try:
+            running = [asyncio.ensure_future(pool.run(time.sleep, 0.3)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert pool.pending == 2
+            try:
+                await pool.run(time.sleep, 0)
+                raise AssertionError("expected OCRQueueFull")
+            except OCRQueueFull:
+                pass
+            await asyncio.gather(*running)
+            assert pool.pending == 0
+            assert await pool.run(abs, -3) == 3
+
+            # A caller that stops waiting does not free the slot while its job still runs
+            abandoned = asyncio.ensure_future(pool.run(time.sleep, 0.3))
+            await asyncio.sleep(0.1)
+            abandoned.cancel()
+            await asyncio.sleep(0.05)
+            assert pool.pending == 1
+            await asyncio.sleep(0.3)
+            assert pool.pending == 0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_ocr_endpoint_returns_503_when_busy():
+    client = TestClient(app_module.app)
+    pool = app_module.OCR_POOL
+    pool.pending = pool.max_pending
+    try:
+        response = client.post('/api/ocr', files={'file': ('doc.png', b'not an image', 'image/png')})
+    finally:
+        pool.pending = 0
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == str(app_module.OCR_RETRY_AFTER)
+
+
+def test_ocr_endpoint_serves_identical_uploads_from_cache():
+    client = TestClient(app_module.app)
+    contents = b'previously processed document'
+    cached = {'raw_text': 'ABCDE1234F', 'email': [], 'phone': [], 'aadhaar': [], 'pan': ['ABCDE1234F']}
+    app_module.OCR_CACHE.set(app_module.ocr_cache_key(contents), cached)
+    hits = app_module.OCR_CACHE.memory.hits
+
+    response = client.post('/api/ocr', files={'file': ('doc.png', contents, 'image/png')})
+    assert response.status_code == 200
+    assert response.json()['data'] == cached
+    assert app_module.OCR_CACHE.memory.hits == hits + 1
+
+    stats = client.get('/api/ocr/cache/stats').json()['data']
+    assert stats['memory']['hits'] >= 1
+
+
+def test_pages_are_split_and_merged():
+    tiff = make_tiff(3)
+    assert count_pages(tiff) == 3
+    assert load_page(tiff, 2, PreprocessConfig()).getpixel((0, 0)) == 80
+
+    merged = merge_page_fields([
+        {'raw_text': 'one', 'email': ['a@b.in'], 'phone': [], 'aadhaar': ['1234 5678 9012'], 'pan': []},
+        None,
+        {'raw_text': 'three', 'email': ['a@b.in', 'c@d.in'], 'phone': [], 'aadhaar': ['123456789012'], 'pan': []}
+    ])
+    assert merged['raw_text'] == 'one\f\fthree'
+    assert merged['email'] == ['a@b.in', 'c@d.in']
+    assert merged['aadhaar'] == ['1234 5678 9012']
+
+
+def test_multi_page_endpoint_streams_pages_as_they_finish():
+    original = app_module.run_ocr_page
+    app_module.run_ocr_page = fake_ocr_page
+    try:
+        client = TestClient(app_module.app)
+        response = client.post('/api/ocr/pages', files={'file': ('scan.tiff', make_tiff(4), 'image/tiff')})
+    finally:
+        app_module.run_ocr_page = original
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {'type': 'document', 'pages': 4}
+    page_lines = [line for line in lines if line['type'] == 'page']
+    assert sorted(line['page'] for line in page_lines) == [1, 2, 3, 4]
+    # The slow first page does not hold back the others
+    assert page_lines[0]['page'] != 1
+
+    summary = lines[-1]
+    assert summary['type'] == 'summary' and summary['success'] and summary['failedPages'] == []
+    assert summary['data']['raw_text'] == 'page 1\fpage 2\fpage 3\fpage 4'
+    assert summary['data']['phone'] == ['9876543210']
+    assert summary['data']['aadhaar'] == ['123456789012']
+    assert summary['data']['pan'] == ['ABCDE1000F', 'ABCDE1001F', 'ABCDE1002F', 'ABCDE1003F']
+
+    response = client.post('/api/ocr/pages', files={'file': ('doc.txt', b'not a document', 'text/plain')})
+    assert response.status_code == 415
+
+
+def test_multi_page_endpoint_fails_pages_when_queue_stays_full():
+    class FullPool:
+        pending = 0
+        max_pending = 1
+
+        async def run(self, func, *args):
+            raise OCRQueueFull("OCR queue is full (1 pending)")
+
+    spooled = lambda: set(glob.glob(os.path.join(tempfile.gettempdir(), 'ocr-document-*')))
+    before = spooled()
+    original = (app_module.OCR_POOL, app_module.OCR_PAGE_QUEUE_WAIT)
+    app_module.OCR_POOL, app_module.OCR_PAGE_QUEUE_WAIT = FullPool(), 0.1
+    try:
+        client = TestClient(app_module.app)
+        response = client.post('/api/ocr/pages', files={'file': ('scan.tiff', make_tiff(3), 'image/tiff')})
+    finally:
+        app_module.OCR_POOL, app_module.OCR_PAGE_QUEUE_WAIT = original
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    page_lines = [line for line in lines if line['type'] == 'page']
+    assert len(page_lines) == 3 and not any(line['success'] for line in page_lines)
+    assert all('busy' in line['error'] for line in page_lines)
+    assert lines[-1]['success'] is False and lines[-1]['failedPages'] == [1, 2, 3]
+    # The spooled upload is removed with the response
+    assert spooled() <= before
+
+
+if __name__ == "__main__":
+    test_pool_rejects_when_queue_is_full()
+    test_ocr_endpoint_returns_503_when_busy()
+    test_ocr_endpoint_serves_identical_uploads_from_cache()
+    test_pages_are_split_and_merged()
+    test_multi_page_endpoint_streams_pages_as_they_finish()
+    test_multi_page_endpoint_fails_pages_when_queue_stays_full()
+    print("OCR service tests completed successfully!")
@@ -0,0 +1,91 @@
+"""
+Test file for live request profiling
+Covers header-triggered and sampled profiles, retention and the admin endpoints
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pstats
+import tempfile
+
+from fastapi.testclient import TestClient
+
+import app as app_module
+from profiling import RequestProfiler, run_profiled
+
+PROFILE = {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'}
+
+
+def test_profiler_writes_and_trims():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = RequestProfiler(tmp, keep=2)
+        names = []
+        for _ in range(3):
+            with profiler.profile("check-eligibility") as name:
+                sum(range(1000))
+            names.append(name)
+        listed = profiler.list()
+        assert [profile["name"] for profile in listed] == names[:0:-1]
+        assert listed[0]["endpoint"] == "check-eligibility"
+        pstats.Stats(profiler.path(names[-1]))
+
+        # One in-process profile at a time; nested requests run unprofiled
+        with profiler.profile("ocr") as outer:
+            with profiler.profile("ocr") as inner:
+                assert outer is not None and inner is None
+
+        # Pool variant writes to a path chosen by the caller
+        path = profiler.profile_path("ocr")
+        assert run_profiled(path, max, 3, 7) == 7
+        assert os.path.isfile(path)
+
+        assert profiler.path("../secret.pstats") is None
+        assert profiler.path("missing") is None
+
+        profiler.set_sample_rate(1)
+        assert profiler.sample()
+        profiler.set_sample_rate(0)
+        assert not profiler.sample()
+
+
+def test_profiling_endpoints():
+    with tempfile.TemporaryDirectory() as tmp:
+        original = app_module.PROFILER, app_module.ADMIN_TOKEN
+        app_module.PROFILER = RequestProfiler(tmp)
+        app_module.ADMIN_TOKEN = 'secret'
+        admin = {'X-Admin-Token': 'secret'}
+        try:
+            client = TestClient(app_module.app)
+            plain = client.post('/api/check-eligibility', json=PROFILE)
+            assert 'X-Profile-Id' not in plain.headers
+
+            # The header needs the admin token
+            unauthorized = client.post('/api/check-eligibility', json=PROFILE, headers={'X-Profile': '1'})
+            assert 'X-Profile-Id' not in unauthorized.headers
+
+            profiled = client.post('/api/check-eligibility', json=PROFILE, headers={'X-Profile': '1', **admin})
+            assert profiled.json() == plain.json()
+            name = profiled.headers['X-Profile-Id']
+
+            assert client.get('/api/admin/profiles').status_code == 403
+            listing = client.get('/api/admin/profiles', headers=admin).json()
+            assert [profile['name'] for profile in listing['profiles']] == [name]
+
+            download = client.get(f'/api/admin/profiles/{name}', headers=admin)
+            assert download.status_code == 200 and download.content
+            assert client.get('/api/admin/profiles/other.pstats', headers=admin).status_code == 404
+
+            response = client.post('/api/admin/profiles/sample-rate', json={'sample_rate': 1}, headers=admin)
+            assert response.json()['sampleRate'] == 1
+            assert 'X-Profile-Id' in client.post('/api/check-eligibility', json=PROFILE).headers
+            response = client.post('/api/admin/profiles/sample-rate', json={'sample_rate': 2}, headers=admin)
+            assert response.status_code == 422
+        finally:
+            app_module.PROFILER, app_module.ADMIN_TOKEN = original
+
+
+if __name__ == "__main__":
+    test_profiler_writes_and_trims()
+    test_profiling_endpoints()
+    print("Profiling tests completed successfully!")
@@ -0,0 +1,50 @@
+"""
+Test file for Recommendation Engine ranking
+Checks the streaming TopKRanker against the full sort-and-filter path
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+
+from recommendation_engine import RecommendationEngine, TopKRanker
+
+CATEGORIES = ['Healthcare', 'Education', 'Housing', 'Social Welfare', 'Agriculture', 'Finance']
+
+
+def test_ranker_matches_full_ranking():
+    """Top-K heap, counters and summary should match rank_schemes + filter_top_recommendations"""
+    rng = random.Random(42)
+    user_data = {'age': 30, 'income': 120000, 'category': 'SC'}
+    for trial in range(200):
+        vulnerability = rng.choice([0.2, 0.55, 0.8])
+        schemes = [
+            {
+                'name': f'Scheme {i}',
+                'category': rng.choice(CATEGORIES),
+                # coarse values so ties are common
+                'probabilityScore': rng.choice([0.3, 0.45, 0.6, 0.75, 0.9]),
+                'impactScore': rng.choice([0.7, 0.8, 0.9]),
+            }
+            for i in range(rng.randint(0, 40))
+        ]
+
+        ranker = TopKRanker(max_count=rng.choice([0, 1, 3, 10]))
+        for scheme in schemes:
+            score = RecommendationEngine.calculate_recommendation_score(
+                scheme['probabilityScore'], scheme['category'], vulnerability, scheme['impactScore']
+            )
+            ranker.push(score, scheme['category'], scheme['name'])
+
+        ranked = RecommendationEngine.rank_schemes([dict(s) for s in schemes], vulnerability)
+        expected = RecommendationEngine.filter_top_recommendations(ranked, ranker.max_count)
+
+        assert [(s['recommendationScore'], s['name']) for s in expected] == ranker.results()
+        assert (RecommendationEngine.summarize_ranking(user_data, vulnerability, ranker) ==
+                RecommendationEngine.generate_user_profile_summary(user_data, vulnerability, ranked))
+
+
+if __name__ == "__main__":
+    test_ranker_matches_full_ranking()
+    print("Recommendation engine tests completed successfully!")
@@ -0,0 +1,39 @@
+"""
+Test file for the materialized response table
+Checks that table lookups give exactly the same responses as the index path
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import itertools
+
+from eligibility_service import EligibilityService
+from scheme_catalog import SAMPLE_SCHEMES
+from test_eligibility_index import random_catalog
+
+
+def test_table_responses_match_index_path():
+    for schemes in (SAMPLE_SCHEMES, random_catalog(40, seed=3)):
+        plain = EligibilityService(schemes)
+        tabled = EligibilityService(schemes, precompute=True)
+        assert tabled.response_table is not None
+
+        hits = 0
+        for age, income, category, state, gender in itertools.product(
+            [-1, 0, 5, 18, 21, 30, 60, 99, 120, 121],
+            [-10, 0, 49999, 50000, 50000.5, 100000, 199999, 250000, 500000, 1000000, 1000001],
+            ['General', 'SC', 'OBC', 'Unknown'],
+            ['Bihar', 'Kerala', 'Goa'],
+            [None, 'Female', 'Male', 'Other', 'female', '']
+        ):
+            user = {'age': age, 'income': income, 'category': category, 'state': state, 'gender': gender}
+            if tabled.response_table.lookup(age, income, category, state, gender) is not None:
+                hits += 1
+            assert tabled.check(user) == plain.check(user), user
+        assert hits > 0
+
+
+if __name__ == "__main__":
+    test_table_responses_match_index_path()
+    print("Response table tests completed successfully!")
@@ -0,0 +1,88 @@
+"""
+Test file for compiled scheme kernels
+Checks kernel lookups against the scalar Statistical Engine
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import itertools
+
+from statistical_engine import StatisticalEngine
+from scheme_kernels import MAX_TABLE_AGE, compile_age_tables, compile_scheme_kernels
+from test_batch_scoring import SCHEMES
+
+
+def test_kernels_match_scalar_probability():
+    """Kernel probabilities should be identical to calculate_overall_probability"""
+    kernels = compile_scheme_kernels(SCHEMES)
+    assert len(kernels) == len(SCHEMES)
+
+    for age, income, category, gender in itertools.product(
+        [-1, 0, 5, 18, 21, 45, 60, 100, 120, 130],
+        [0, 50000, 200000, 250001],
+        ['General', 'ST', 'Minority', 'Unknown'],
+        [None, 'Female', 'male', 'Unlisted']
+    ):
+        user = {'age': age, 'income': income, 'category': category, 'gender': gender}
+        category_code = kernels.encode_category(category)
+        gender_code = kernels.encode_gender(gender)
+        universal = kernels.get_universal_probability(category_code)
+        for scheme, kernel in zip(SCHEMES, kernels):
+            expected = StatisticalEngine.calculate_overall_probability(
+                user, scheme['criteria'], scheme['category']
+            )
+            actual = kernel.overall_probability(age, income, category_code, gender_code, universal)
+            assert actual == expected, (user, scheme, actual, expected)
+
+
+def test_kernel_evaluate_matches_scalar_factors():
+    """Fused kernel records should equal the scalar fused evaluation and the old functions"""
+    kernels = compile_scheme_kernels(SCHEMES)
+    for age, income, category, gender in itertools.product(
+        [0, 5, 12, 18, 45, 60, 120],
+        [0, 99999, 124999, 187500, 200000],
+        ['General', 'SC', 'Minority'],
+        [None, 'Female']
+    ):
+        user = {'age': age, 'income': income, 'category': category, 'gender': gender}
+        category_code = kernels.encode_category(category)
+        universal = kernels.get_universal_probability(category_code)
+        for scheme, kernel in zip(SCHEMES, kernels):
+            criteria = scheme['criteria']
+            expected = StatisticalEngine.evaluate_factors(user, criteria, scheme['category'])
+            actual = kernel.evaluate(age, income, category_code, kernels.encode_gender(gender), universal)
+            assert actual == expected, (user, scheme, actual, expected)
+
+            assert expected.probability == StatisticalEngine.calculate_overall_probability(
+                user, criteria, scheme['category']
+            )
+            breakdown = StatisticalEngine.get_statistical_breakdown(
+                user, criteria, scheme['category'], expected.probability
+            )
+            assert StatisticalEngine.breakdown_from_factors(expected) == breakdown
+
+
+def test_kernel_age_table_covers_full_range():
+    kernel = compile_scheme_kernels(SCHEMES)[0]
+    assert len(kernel.age_table) == 121
+    assert kernel.age_table[17] == 0.0
+    assert kernel.age_table[59] == 1.0
+
+
+def test_vectorized_age_tables_match_scalar():
+    """Catalog-wide tables should equal the scalar functions value for value"""
+    ranges = [(lo, hi) for lo in range(0, 121, 7) for hi in range(0, 121, 5)] + [(18.5, 40.25), (60, 60), (0, 120)]
+    age_tables, bonus_tables = compile_age_tables([lo for lo, _ in ranges], [hi for _, hi in ranges])
+    for (lo, hi), age_table, bonus_table in zip(ranges, age_tables.tolist(), bonus_tables.tolist()):
+        for age in range(MAX_TABLE_AGE + 1):
+            assert age_table[age] == StatisticalEngine.calculate_age_probability(age, lo, hi), (lo, hi, age)
+            assert bonus_table[age] == StatisticalEngine.get_age_match_bonus(age, lo, hi), (lo, hi, age)
+
+
+if __name__ == "__main__":
+    test_kernels_match_scalar_probability()
+    test_kernel_evaluate_matches_scalar_factors()
+    test_kernel_age_table_covers_full_range()
+    test_vectorized_age_tables_match_scalar()
+    print("Scheme kernel tests completed successfully!")
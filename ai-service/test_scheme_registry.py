@@ -0,0 +1,114 @@
+"""
+Test file for the compact scheme registry
+Checks records against the catalog and SchemeProfiles, value sharing and memory use
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import copy
+import gc
+import itertools
+import json
+import tracemalloc
+
+from starlette.responses import JSONResponse
+
+from eligibility_service import EligibilityService
+from scheme_catalog import SAMPLE_SCHEMES
+from scheme_profiles import SchemeProfiles
+from scheme_registry import SchemeRegistry
+from test_eligibility_index import random_catalog
+
+
+def _large_catalog(count):
+    """Catalog of `count` schemes decoded separately, as if loaded from a catalog file."""
+    return [json.loads(json.dumps(SAMPLE_SCHEMES[i % len(SAMPLE_SCHEMES)])) for i in range(count)]
+
+
+def test_records_match_catalog_and_profiles():
+    registry = SchemeRegistry(SAMPLE_SCHEMES)
+    assert len(registry) == len(SAMPLE_SCHEMES)
+
+    for scheme_id, scheme in enumerate(SAMPLE_SCHEMES):
+        record = registry[scheme_id]
+        assert record.id == scheme_id and registry.id_of(scheme['name']) == scheme_id
+        assert (record.name, record.description, record.category, record.benefits) == \
+            (scheme['name'], scheme['description'], scheme['category'], scheme['benefits'])
+        assert record.duration == scheme.get('duration', 'Ongoing')
+        assert list(record.requirements) == scheme.get('requirements', [])
+        assert record.criteria == scheme['criteria']
+        assert record.impact_score == SchemeProfiles.get_impact_score(scheme['name'])
+        assert record.expected_benefit == SchemeProfiles.format_expected_benefit(scheme['name'])
+        assert record.target_demographic == SchemeProfiles.get_target_demographic(scheme['name'])
+
+    assert registry.id_of("No Such Scheme") is None
+    assert [record.id for record in registry] == list(range(len(SAMPLE_SCHEMES)))
+
+
+def test_catalog_profile_overrides():
+    scheme = copy.deepcopy(SAMPLE_SCHEMES[0])
+    scheme['profile'] = {
+        'impact_score': 0.5,
+        'expected_benefit': {'min': 1, 'max': 2, 'frequency': 'Monthly'},
+        'target_demographic': {'optimal_age_range': [20, 30], 'success_rate': 0.6}
+    }
+    record = SchemeRegistry([scheme])[0]
+    assert record.impact_score == 0.5
+    assert record.expected_benefit == "₹1 - ₹2 (Monthly)"
+    assert record.target_demographic['success_rate'] == 0.6
+
+
+def test_repeated_values_are_shared():
+    registry = SchemeRegistry(_large_catalog(len(SAMPLE_SCHEMES) * 3))
+    first, repeat = registry[0], registry[len(SAMPLE_SCHEMES)]
+    assert first.name is repeat.name
+    assert first.category is repeat.category
+    assert first.requirements is repeat.requirements
+    assert first.expected_benefit is repeat.expected_benefit
+    assert first.target_demographic is repeat.target_demographic
+    assert first.criteria['states'][0] is repeat.criteria['states'][0]
+    assert not hasattr(first, '__dict__')
+
+
+def test_smaller_than_catalog_dicts():
+    tracemalloc.start()
+    try:
+        schemes = _large_catalog(5000)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        registry = SchemeRegistry(schemes)
+        del schemes
+        gc.collect()
+        registry_bytes = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(registry) == 5000
+    assert registry_bytes < dict_bytes / 4
+
+
+
+def test_encoded_responses_match_json_response():
+    quoted = copy.deepcopy(SAMPLE_SCHEMES)
+    quoted[0]['description'] = 'Says "hello" \\ नमस्ते\n'
+    quoted[0]['requirements'] = ['Aadhaar', 'ज़मीन के कागज़']
+
+    for schemes in (quoted, random_catalog(40, seed=5)):
+        for precompute in (False, True):
+            service = EligibilityService(schemes, precompute=precompute)
+            for age, income, category, gender in itertools.product(
+                [0, 18, 30, 60, 120], [0, 99999, 250000, 1000000], ['General', 'SC', 'EWS'], [None, 'Female']
+            ):
+                user = {'age': age, 'income': income, 'category': category, 'state': 'Bihar', 'gender': gender}
+                expected = JSONResponse({**service.check(user), 'catalogVersion': 'v1'}).body
+                assert service.check_json(user, {'catalogVersion': 'v1'}) == expected, user
+                assert service.check_json(user) == JSONResponse(service.check(user)).body
+
+
+if __name__ == "__main__":
+    test_records_match_catalog_and_profiles()
+    test_catalog_profile_overrides()
+    test_repeated_values_are_shared()
+    test_smaller_than_catalog_dicts()
+    test_encoded_responses_match_json_response()
+    print("Scheme registry tests completed successfully!")
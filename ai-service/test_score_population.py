@@ -0,0 +1,150 @@
+"""
+Test file for offline population scoring
+Checks CLI output against the API scoring path and checkpoint resume
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import csv
+import json
+import tempfile
+
+import score_population
+from eligibility_service import EligibilityService
+from scheme_catalog import SAMPLE_SCHEMES
+
+
+def write_profiles(path, count):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'age', 'income', 'category', 'state', 'gender'])
+        writer.writeheader()
+        for i in range(count):
+            writer.writerow({
+                'id': f'H{i}',
+                'age': 'unknown' if i == 13 else (i * 7) % 90,
+                'income': (i * 15731) % 550000,
+                'category': ['General', 'SC', 'ST', 'OBC', 'EWS'][i % 5],
+                'state': 'Bihar',
+                'gender': ['', 'Female', 'Male'][i % 3],
+            })
+
+
+def test_cli_matches_service_and_resumes():
+    service = EligibilityService(SAMPLE_SCHEMES)
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'profiles.csv')
+        output_path = os.path.join(tmp, 'results.ndjson')
+        write_profiles(input_path, 60)
+
+        assert score_population.main([input_path, output_path, '--workers', '2', '--chunk-size', '7']) == 0
+        with open(output_path, 'rb') as f:
+            full_output = f.read()
+
+        lines = [json.loads(line) for line in full_output.splitlines()]
+        assert [line['row'] for line in lines] == list(range(60))
+        assert lines[13]['success'] is False and lines[13]['id'] == 'H13'
+
+        with open(input_path, newline='') as f:
+            for line, record in zip(lines, csv.DictReader(f)):
+                if line['row'] == 13:
+                    continue
+                expected = json.loads(json.dumps(service.check(score_population.parse_profile(record))))
+                assert {k: v for k, v in line.items() if k not in ('row', 'id')} == expected
+
+        # Simulate a crash after 3 chunks with a partially written 4th chunk
+        checkpoint_path = output_path + '.checkpoint'
+        offset = len(b''.join(full_output.splitlines(keepends=True)[:21]))
+        with open(checkpoint_path, 'w') as f:
+            json.dump({'input': os.path.abspath(input_path), 'chunk_size': 7,
+                       'chunks_done': 3, 'rows_done': 21, 'output_bytes': offset}, f)
+        with open(output_path, 'r+b') as f:
+            f.truncate(offset)
+            f.seek(offset)
+            f.write(b'{"row": 21, "partial')
+
+        score_population.main([input_path, output_path, '--workers', '0', '--chunk-size', '7', '--resume'])
+        with open(output_path, 'rb') as f:
+            assert f.read() == full_output
+        with open(checkpoint_path) as f:
+            assert json.load(f)['rows_done'] == 60
+
+
+def test_resume_seeks_past_committed_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'profiles.csv')
+        write_profiles(csv_path, 30)
+        with open(csv_path, newline='') as f:
+            records = list(csv.DictReader(f))
+        # A quoted newline makes one CSV record span two lines
+        records[4]['id'] = 'H4\nannex'
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+        ndjson_path = os.path.join(tmp, 'profiles.ndjson')
+        with open(ndjson_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n\n')
+
+        for input_path in (csv_path, ndjson_path):
+            output_path = input_path + '.results'
+            checkpoint_path = output_path + '.checkpoint'
+            score_population.main([input_path, output_path, '--workers', '0', '--chunk-size', '8'])
+            with open(output_path, 'rb') as f:
+                full_output = f.read()
+            input_format = 'csv' if input_path == csv_path else 'ndjson'
+            positions = [end for _, end in score_population.read_records(input_path, input_format)]
+            with open(checkpoint_path) as f:
+                assert json.load(f)['input_bytes'] == positions[-1]
+
+            # Crash after the first chunk, then garble the committed rows: resuming
+            # must seek past them rather than read them again
+            assert [record for record, _ in score_population.read_records(input_path, input_format, positions[7])] \
+                == [record for record, _ in score_population.read_records(input_path, input_format)][8:]
+            output_bytes = len(b''.join(full_output.splitlines(keepends=True)[:8]))
+            state = {'input': os.path.abspath(input_path), 'chunk_size': 8, 'chunks_done': 1,
+                     'rows_done': 8, 'output_bytes': output_bytes, 'input_bytes': positions[7]}
+            with open(checkpoint_path, 'w') as f:
+                json.dump(state, f)
+
+            with open(input_path, 'rb') as f:
+                data = f.read()
+            with open(input_path, 'wb') as f:
+                start = data.index(b'\n') + 1 if input_path == csv_path else 0
+                f.write(data[:start] + b'#' * (state['input_bytes'] - start) + data[state['input_bytes']:])
+
+            score_population.main([input_path, output_path, '--workers', '0', '--chunk-size', '8', '--resume'])
+            with open(output_path, 'rb') as f:
+                assert f.read() == full_output
+
+
+def test_mistyped_records_fail_alone():
+    records = [
+        {'id': 'ok', 'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'},
+        {'id': 'inf-age', 'age': 'inf', 'income': 80000, 'category': 'SC', 'state': 'Bihar'},
+        {'id': 'nan-income', 'age': 30, 'income': float('nan'), 'category': 'SC', 'state': 'Bihar'},
+        {'id': 'int-gender', 'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 1},
+        {'id': 'int-state', 'age': 30, 'income': 80000, 'category': 'SC', 'state': 7},
+        {'id': 'bool-age', 'age': True, 'income': 80000, 'category': 'SC', 'state': 'Bihar'},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'profiles.ndjson')
+        output_path = os.path.join(tmp, 'results.ndjson')
+        with open(input_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+        assert score_population.main([input_path, output_path, '--workers', '2', '--chunk-size', '3']) == 0
+        with open(output_path) as f:
+            lines = [json.loads(line) for line in f]
+        assert [line['id'] for line in lines] == [record['id'] for record in records]
+        assert lines[0]['success'] is True
+        assert all(line['success'] is False and 'Invalid record' in line['error'] for line in lines[1:])
+
+
+if __name__ == "__main__":
+    test_cli_matches_service_and_resumes()
+    test_resume_seeks_past_committed_rows()
+    test_mistyped_records_fail_alone()
+    print("Population scoring tests completed successfully!")
@@ -0,0 +1,174 @@
+"""
+Test file for the shared compiled catalog
+Covers export/attach, identical responses from mapped tables, the catalog
+manager attaching exports and per-process memory of an attached catalog
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import copy
+import tempfile
+import threading
+import tracemalloc
+
+import numpy as np
+
+import catalog_manager
+from catalog_manager import CatalogManager, CatalogNotReady, catalog_version, write_catalog
+from eligibility_service import EligibilityService
+from scheme_catalog import SAMPLE_SCHEMES
+from scheme_kernels import compile_scheme_kernels
+from shared_catalog import attach_catalog, export_catalog, prune_catalogs
+
+PROFILES = [
+    {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'},
+    {'age': 67, 'income': 40000, 'category': 'General', 'state': 'Kerala', 'gender': 'Male'},
+    {'age': 22, 'income': 250000, 'category': 'OBC', 'state': 'Punjab', 'gender': None},
+    {'age': 150, 'income': 10000, 'category': 'Unknown', 'state': 'Goa', 'gender': 'Other'},
+]
+
+
+def make_schemes(copies):
+    """SAMPLE_SCHEMES repeated with distinct names and shifted age ranges."""
+    schemes = []
+    for i in range(copies):
+        for scheme in SAMPLE_SCHEMES:
+            scheme = copy.deepcopy(scheme)
+            scheme['name'] = f"{scheme['name']} {i}"
+            scheme['criteria']['min_age'] = min(scheme['criteria']['min_age'] + i % 7, scheme['criteria']['max_age'])
+            schemes.append(scheme)
+    return schemes
+
+
+def test_attached_service_matches_compiled():
+    schemes = make_schemes(3)
+    version = catalog_version(schemes)
+    with tempfile.TemporaryDirectory() as tmp:
+        for precompute in (False, True):
+            compiled = EligibilityService(schemes, precompute=precompute)
+            directory = os.path.join(tmp, f"precompute-{precompute}")
+            export_catalog(compiled, version, directory)
+
+            attached = attach_catalog(directory, version, schemes, precompute=precompute)
+            assert attached is not None
+            # Tables are read from the mapped files, not copied
+            assert isinstance(attached.kernels.matrix.min_age, np.memmap)
+            assert isinstance(attached.kernels[0].age_table, memoryview)
+            if precompute:
+                assert isinstance(attached.response_table.cells, np.memmap)
+
+            for profile in PROFILES:
+                assert attached.check_json(profile) == compiled.check_json(profile)
+                assert attached.check(profile) == compiled.check(profile)
+            assert attached.check_many(PROFILES) == compiled.check_many(PROFILES)
+
+        # Unknown versions and other catalogs are compiled by the caller instead
+        assert attach_catalog(tmp, 'missing', schemes) is None
+        assert attach_catalog(os.path.join(tmp, 'precompute-False'), version, schemes[:-1]) is None
+
+        # Only exports (and leftover temporary exports) are pruned, not other entries
+        shared_dir = os.path.join(tmp, 'precompute-True')
+        os.makedirs(os.path.join(shared_dir, 'unrelated', 'data'))
+        os.makedirs(os.path.join(shared_dir, f'.{version}-k3x9_a1q'))
+        with open(os.path.join(shared_dir, 'notes.txt'), 'w') as f:
+            f.write('not an export')
+        prune_catalogs(shared_dir, keep=[])
+        assert sorted(os.listdir(shared_dir)) == ['notes.txt', 'unrelated']
+        assert os.listdir(os.path.join(shared_dir, 'unrelated')) == ['data']
+
+
+def test_catalog_manager_attaches_exports():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schemes.json')
+        shared_dir = os.path.join(tmp, 'shared')
+        write_catalog(SAMPLE_SCHEMES, path)
+
+        parent = CatalogManager(path)
+        export_catalog(parent.snapshot.service, parent.snapshot.version, shared_dir)
+
+        worker = CatalogManager(path, shared_dir=shared_dir)
+        assert worker.snapshot.shared and worker.info()['shared']
+        assert worker.snapshot.version == parent.snapshot.version
+        for profile in PROFILES:
+            assert worker.snapshot.service.check_json(profile) == parent.snapshot.service.check_json(profile)
+
+
+def test_worker_waits_for_delayed_export():
+    def export(schemes, shared_dir):
+        # What the serve.py parent does once it has compiled a version
+        export_catalog(EligibilityService(schemes), catalog_version(schemes), shared_dir)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schemes.json')
+        shared_dir = os.path.join(tmp, 'shared')
+        write_catalog(SAMPLE_SCHEMES, path)
+        export(SAMPLE_SCHEMES, shared_dir)
+
+        # Workers never compile a catalog themselves
+        original_service = catalog_manager.EligibilityService
+        catalog_manager.EligibilityService = None
+        try:
+            worker = CatalogManager(path, shared_dir=shared_dir)
+
+            # The worker sees the change before the parent has exported it
+            schemes = copy.deepcopy(SAMPLE_SCHEMES)
+            schemes[0]['benefits'] = 'Updated benefits'
+            write_catalog(schemes, path)
+            try:
+                worker.reload()
+                raise AssertionError("expected CatalogNotReady")
+            except CatalogNotReady:
+                pass
+            assert worker.snapshot.version == catalog_version(SAMPLE_SCHEMES)
+            assert worker.source_changed() and worker.info()['exportPending']
+
+            export(schemes, shared_dir)
+            snapshot, changed = worker.reload()
+            assert changed and snapshot.shared and snapshot.version == catalog_version(schemes)
+            assert not worker.source_changed() and not worker.info()['exportPending']
+
+            # A worker starting before the export exists waits for it
+            write_catalog(SAMPLE_SCHEMES[:3], path)
+            try:
+                CatalogManager(path, shared_dir=shared_dir, attach_timeout=0)
+                raise AssertionError("expected CatalogNotReady")
+            except CatalogNotReady:
+                pass
+            timer = threading.Timer(0.3, export, (SAMPLE_SCHEMES[:3], shared_dir))
+            timer.start()
+            late = CatalogManager(path, shared_dir=shared_dir, attach_timeout=10)
+            timer.join()
+            assert late.snapshot.shared and late.snapshot.version == catalog_version(SAMPLE_SCHEMES[:3])
+        finally:
+            catalog_manager.EligibilityService = original_service
+
+
+def test_attached_kernels_use_little_memory():
+    schemes = make_schemes(20)
+    version = catalog_version(schemes)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = export_catalog(EligibilityService(schemes), version, tmp)
+        tables = {name[:-len('.npy')]: np.load(os.path.join(path, name), mmap_mode="r")
+                  for name in os.listdir(path) if name.endswith('.npy')}
+
+        tracemalloc.start()
+        compiled = compile_scheme_kernels(schemes)
+        compiled_size = tracemalloc.get_traced_memory()[0]
+        del compiled
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        attached = compile_scheme_kernels(schemes, tables)
+        attached_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(attached) == len(schemes)
+        assert attached_size < compiled_size / 4, (attached_size, compiled_size)
+
+
+if __name__ == "__main__":
+    test_attached_service_matches_compiled()
+    test_catalog_manager_attaches_exports()
+    test_worker_waits_for_delayed_export()
+    test_attached_kernels_use_little_memory()
+    print("Shared catalog tests completed successfully!")
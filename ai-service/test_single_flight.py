@@ -0,0 +1,98 @@
+"""
+Test file for request coalescing
+Covers shared flights, error propagation, caller cancellation and the
+coalesced /api/check-eligibility path
+"""
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+import app as app_module
+from single_flight import SingleFlight
+
+PROFILE = {'age': 30, 'income': 80000, 'category': 'SC', 'state': 'Bihar', 'gender': 'Female'}
+OTHER_PROFILE = {'age': 67, 'income': 40000, 'category': 'General', 'state': 'Kerala', 'gender': 'Male'}
+
+
+def test_concurrent_calls_share_one_flight():
+    started = []
+
+    async def compute(key):
+        started.append(key)
+        await asyncio.sleep(0.02)
+        return f"result-{key}"
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(
+            *(flights.do("a", lambda: compute("a")) for _ in range(5)),
+            flights.do("b", lambda: compute("b"))
+        )
+        assert flights.in_flight == 0
+        # Finished flights are not reused
+        assert await flights.do("a", lambda: compute("a")) == "result-a"
+        return flights, results
+
+    flights, results = asyncio.run(scenario())
+    assert results == ["result-a"] * 5 + ["result-b"]
+    assert started == ["a", "b", "a"]
+    assert (flights.calls, flights.shared) == (3, 4)
+
+
+def test_errors_and_cancellation():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("scoring failed")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def scenario():
+        flights = SingleFlight()
+        errors = await asyncio.gather(*(flights.do("x", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(error, ValueError) for error in errors)
+
+        # The caller that started the flight goes away; the others still get the result
+        leader = asyncio.ensure_future(flights.do("y", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("y", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == 42
+
+    asyncio.run(scenario())
+
+
+def test_coalesced_endpoint_matches_inline():
+    async def scenario():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            inline = (await client.post('/api/check-eligibility', json=PROFILE)).content
+            other = (await client.post('/api/check-eligibility', json=OTHER_PROFILE)).content
+
+            original = app_module.ELIGIBILITY_COALESCER
+            coalescer = app_module.ELIGIBILITY_COALESCER = SingleFlight()
+            try:
+                responses = await asyncio.gather(
+                    *(client.post('/api/check-eligibility', json=PROFILE) for _ in range(8)),
+                    client.post('/api/check-eligibility', json=OTHER_PROFILE)
+                )
+            finally:
+                app_module.ELIGIBILITY_COALESCER = original
+        return inline, other, responses, coalescer
+
+    inline, other, responses, coalescer = asyncio.run(scenario())
+    assert [response.content for response in responses] == [inline] * 8 + [other]
+    assert coalescer.calls + coalescer.shared == 9
+    assert coalescer.calls >= 2 and coalescer.shared >= 1
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_flight()
+    test_errors_and_cancellation()
+    test_coalesced_endpoint_matches_inline()
+    print("Single flight tests completed successfully!")
@@ -2,8 +2,9 @@
 Test file for Statistical Engine
 Tests probability calculations and statistical analysis
 """
+import os
 import sys
-sys.path.append('/Users/satyamkrkesarwani/Desktop/CODING/JanSahyog/ai-service')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from statistical_engine import StatisticalEngine
 from recommendation_engine import RecommendationEngine
@@ -67,6 +67,20 @@ router.post('/ocr', async (req, res) => {
 
     console.log('Processing OCR for:', req.file.originalname);
 
+    // ?async=true queues the document and returns a job ID to poll instead
+    // of holding this connection open while Tesseract runs
+    if (req.query.async === 'true' || req.query.async === '1') {
+      const job = await axios.post(`${AI_SERVICE_URL}/api/ocr/jobs`, formData, {
+        headers: formData.getHeaders()
+      });
+
+      return res.status(202).json({
+        success: true,
+        jobId: job.data.jobId,
+        status: job.data.status
+      });
+    }
+
     // Call AI service OCR endpoint
     const response = await axios.post(`${AI_SERVICE_URL}/api/ocr`, formData, {
       headers: formData.getHeaders()
@@ -87,4 +101,38 @@ router.post('/ocr', async (req, res) => {
   }
 });
 
+// Poll an asynchronous OCR job (?wait=N long-polls for up to N seconds)
+router.get('/ocr/jobs/:jobId', async (req, res) => {
+  try {
+    const wait = Math.min(parseFloat(req.query.wait) || 0, 30);
+
+    const response = await axios.get(
+      `${AI_SERVICE_URL}/api/ocr/jobs/${encodeURIComponent(req.params.jobId)}`,
+      { params: { wait }, timeout: (wait + 10) * 1000 }
+    );
+
+    res.json({
+      success: true,
+      jobId: response.data.jobId,
+      status: response.data.status,
+      data: response.data.data,
+      error: response.data.error
+    });
+
+  } catch (error) {
+    if (error.response?.status === 404) {
+      return res.status(404).json({
+        success: false,
+        message: 'OCR job not found or expired'
+      });
+    }
+    console.error('OCR job status error:', error.message);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to fetch OCR job status. Please try again.',
+      error: error.response?.data?.detail || error.message
+    });
+  }
+});
+
 module.exports = router;
\ No newline at end of file